@@ -0,0 +1,312 @@
+"""Benchmarks dos caminhos ontologia → formulário.
+
+Mede as funções de o_parse_back_end e os endpoints do Flask (via test client) para todas as
+classes de cada ontologia, e compara o resultado com um baseline salvo anteriormente. Com --synthetic,
+mede também ontologias geradas por synthetic_ontology.py e mostra a curva de escala de cada caso.
+
+    python back_end/benchmarks/bench_ontology.py --output resultados.json
+    python back_end/benchmarks/bench_ontology.py --baseline resultados.json
+    python back_end/benchmarks/bench_ontology.py --synthetic 1000,10000,100000 --sample 200 --no-endpoints
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from urllib.parse import quote
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+# O app abre o banco de submissões ao ser importado: os envios de /save_form_data vão para um arquivo temporário
+os.environ.setdefault('SUBMISSIONS_DB', os.path.join(tempfile.mkdtemp(prefix='bench_ontology_'), 'submissions.sqlite3'))
+
+from rdflib import RDF, OWL, URIRef  # noqa: E402
+
+import o_parse_back_end as op  # noqa: E402
+import prompt as pr  # noqa: E402
+from class_hierarchy import ClassHierarchy  # noqa: E402
+from form_bundle import FormBundle  # noqa: E402
+from ontology_store import OntologyStore  # noqa: E402
+from search_index import OntologySearch  # noqa: E402
+from synthetic_ontology import generate_ontology  # noqa: E402
+
+# Ontologias medidas por padrão
+ONTOLOGIES = {
+    'Onto_aldeias': os.path.join(SRC_DIR, 'OWL', 'Onto_aldeias.owl'),
+    'docs_sesai': os.path.join(SRC_DIR, 'OWL', 'docs_sesai.owl'),
+}
+
+# Aumento relativo do p50 (em relação ao baseline) considerado regressão
+DEFAULT_THRESHOLD = 0.20
+
+
+# Percentil por interpolação linear sobre amostras ordenadas
+def percentile(sorted_samples, fraction):
+    if len(sorted_samples) == 1:
+        return sorted_samples[0]
+    position = (len(sorted_samples) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+
+# Resume as amostras (em segundos) em latências (ms), vazão e memória de pico
+def summarize(samples, peak_memory):
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        'calls': len(ordered),
+        'p50_ms': percentile(ordered, 0.50) * 1000,
+        'p95_ms': percentile(ordered, 0.95) * 1000,
+        'p99_ms': percentile(ordered, 0.99) * 1000,
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'throughput_per_s': len(ordered) / total if total else float('inf'),
+        'peak_memory_kb': peak_memory / 1024,
+    }
+
+
+# Executa func(*args) para cada conjunto de argumentos: primeiro medindo tempo, depois memória de pico
+def run_case(func, args_list, repeat):
+    samples = []
+    gc.collect()
+    for _ in range(repeat):
+        for args in args_list:
+            start = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - start)
+
+    # tracemalloc distorce o tempo, por isso a memória é medida em uma passada separada
+    tracemalloc.start()
+    try:
+        for args in args_list:
+            func(*args)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return summarize(samples, peak_memory)
+
+
+# Classes nomeadas de uma ontologia
+def ontology_classes(g):
+    return sorted({str(cls) for cls in g.subjects(RDF.type, OWL.Class) if isinstance(cls, URIRef)})
+
+
+# Casos de benchmark de uma ontologia: (nome, função, lista de argumentos, repetições).
+# Com sample, os casos por classe usam uma amostra fixa (semente 0) de classes.
+def ontology_cases(name, path, repeat, language='pt', sample=None):
+    snapshot = OntologyStore(path).get()
+    g = snapshot.graph
+    classes = ontology_classes(g)
+    if sample is not None and sample < len(classes):
+        classes = sorted(random.Random(0).sample(classes, sample))
+    labels, labels_to_uris, descriptions = snapshot.labels(language)
+    hierarchy = snapshot.hierarchy()
+    data_properties = snapshot.data_properties()
+    options = snapshot.options(language).options_by_class
+    restriction_cache = snapshot.restrictions()
+    # Buscas sem o cache de consultas, pelas três primeiras letras e pela primeira palavra de cada label
+    search = OntologySearch(g, cache_size=0)
+    class_labels = [labels.get(URIRef(cls), '') for cls in classes]
+    queries = [query for label in class_labels for query in (label[:3], label.split(' ')[0]) if query.strip()]
+
+    def details(class_uri):
+        op.list_restrictions_and_data_properties(g, class_uri, labels, labels_to_uris, descriptions,
+                                                 data_properties, hierarchy, language=language,
+                                                 selectable_instances_map=options, restriction_cache=restriction_cache)
+
+    return classes, [
+        (f'{name}.load_ontology', op.load_ontology, [(path,)], 1),
+        (f'{name}.extract_labels', op.extract_labels, [(g, language)], repeat),
+        (f'{name}.ClassHierarchy', ClassHierarchy, [(g,)], repeat),
+        (f'{name}.build_data_property_index', op.build_data_property_index, [(g, hierarchy)], repeat),
+        (f'{name}.list_restrictions_and_data_properties', details, [(cls,) for cls in classes], repeat),
+        (f'{name}.list_subclasses', op.list_subclasses,
+         [(g, cls, labels, data_properties, hierarchy, restriction_cache) for cls in classes], repeat),
+        (f'{name}.prompt.list_subclasses', pr.list_subclasses,
+         [(g, cls, labels, hierarchy) for cls in classes], repeat),
+        (f'{name}.find_data_properties_for_related_classes', op.find_data_properties_for_related_classes,
+         [(g, cls, data_properties) for cls in classes], repeat),
+        (f'{name}.FormBundle', FormBundle, [(snapshot, language)], repeat),
+        (f'{name}.OntologySearch', OntologySearch, [(g,)], repeat),
+        (f'{name}.search', search.search, [(query, language) for query in queries], repeat),
+    ]
+
+
+# Valores de exemplo por tipo de dado dos campos (texto para os demais tipos)
+SAMPLE_VALUES = {
+    'integer': '3', 'int': '3', 'long': '3', 'short': '3', 'nonNegativeInteger': '3', 'positiveInteger': '3',
+    'decimal': '3.5', 'float': '3.5', 'double': '3.5', 'boolean': 'true',
+    'date': '2024-01-31', 'time': '12:30:00', 'dateTime': '2024-01-31T12:30:00',
+}
+
+
+# Submissão com todos os campos do formulário da classe (seleções pelo label da primeira opção)
+def form_submission(snapshot, class_uri, language):
+    data = {}
+    for field in snapshot.form_bundle(language).details(class_uri).payload:
+        data_type = (field.get("dataType") or [''])[0]
+        if "options" in field:
+            value = field["options"][0]["label"]
+        else:
+            value = SAMPLE_VALUES.get(data_type.rpartition('#')[2], 'texto')
+        data[f'{field["relatedClass"]}-{field["property"]}'] = value
+    return data
+
+
+# Casos dos endpoints Flask, servidos pela ontologia do caminho dado
+def endpoint_cases(name, path, classes, repeat, language='pt'):
+    import app as app_module
+
+    # Os logs estruturados de cada requisição distorceriam os tempos
+    logging.getLogger('aui.requests').setLevel(logging.WARNING)
+    snapshot = app_module.registry.register(name, path).get()
+    snapshot.warm((language,))
+    client = app_module.app.test_client()
+
+    def get(url):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url}: HTTP {response.status_code}')
+
+    def post(url, body):
+        response = client.post(url, json=body)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url}: HTTP {response.status_code}')
+
+    query = f'lang={language}&ontology={name}'
+    labels = snapshot.labels(language)[0]
+    searches = [label[:3] for label in (labels.get(URIRef(cls), '') for cls in classes) if label[:3].strip()]
+    tree_roots = [cls for cls in classes if cls in snapshot.hierarchy().class_uris]
+    select_classes = [cls for cls in classes if snapshot.options(language).get(cls) is not None]
+    # Envios validados de cada formulário (exceto os que os valores de exemplo não satisfazem, ex.: facetas)
+    validators = snapshot.validators()
+    submissions = [(cls, form_submission(snapshot, cls, language)) for cls in classes if validators.get(cls) is not None]
+    submissions = [(cls, data) for cls, data in submissions if not validators.get(cls).validate(data)]
+    batch_size = 50
+    batches = [classes[i:i + batch_size] for i in range(0, len(classes), batch_size)]
+
+    cases = [
+        (f'{name}.GET /get_subclasses', get, [(f'/get_subclasses?class={cls}&{query}',) for cls in classes], repeat),
+        (f'{name}.GET /get_class_details', get, [(f'/get_class_details?class={cls}&{query}',) for cls in classes], repeat),
+        (f'{name}.GET /get_class_tree', get, [(f'/get_class_tree?root={cls}&{query}',) for cls in tree_roots], repeat),
+        (f'{name}.GET /get_options', get, [(f'/get_options?class={cls}&{query}',) for cls in select_classes], repeat),
+        (f'{name}.GET /search', get, [(f'/search?q={quote(search)}&{query}',) for search in searches], repeat),
+        (f'{name}.POST /batch', post,
+         [(f'/batch?{query}', {'classes': batch}) for batch in batches], repeat),
+        (f'{name}.POST /save_form_data', post,
+         [(f'/save_form_data?class={cls}&{query}', data) for cls, data in submissions], repeat),
+    ]
+    # Ontologias sem classes select ou sem formulários não têm os casos correspondentes
+    return [case for case in cases if case[2]]
+
+
+# Compara com o baseline; retorna a lista de casos cujo p50 piorou além do limite
+def compare(results, baseline, threshold):
+    regressions = []
+    for case, result in results.items():
+        previous = baseline.get(case)
+        if not previous or not previous['p50_ms']:
+            continue
+        ratio = result['p50_ms'] / previous['p50_ms']
+        result['baseline_p50_ms'] = previous['p50_ms']
+        result['p50_ratio'] = ratio
+        if ratio > 1 + threshold:
+            regressions.append(case)
+    return regressions
+
+
+# Curva de escala: p50 de cada caso em cada tamanho de ontologia sintética
+def scaling_curves(results, sizes):
+    curves = {}
+    for size in sizes:
+        prefix = f'synthetic-{size}.'
+        for case, result in results.items():
+            if case.startswith(prefix):
+                curves.setdefault(case[len(prefix):], {})[size] = result['p50_ms']
+    return curves
+
+
+def print_scaling(curves, sizes):
+    header = f"{'caso (p50 ms)':<46}" + ''.join(f"{size:>14}" for size in sizes)
+    print(header)
+    print('-' * len(header))
+    for case, points in curves.items():
+        print(f"{case:<46}" + ''.join(f"{points.get(size, float('nan')):>14.3f}" for size in sizes))
+
+
+def print_table(results):
+    header = f"{'caso':<62} {'chamadas':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'op/s':>10} {'pico KB':>9}"
+    print(header)
+    print('-' * len(header))
+    for case, r in results.items():
+        line = (f"{case:<62} {r['calls']:>8} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} "
+                f"{r['throughput_per_s']:>10.1f} {r['peak_memory_kb']:>9.1f}")
+        if 'p50_ratio' in r:
+            line += f"  ({r['p50_ratio']:.2f}x baseline)"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks dos caminhos ontologia → formulário.')
+    parser.add_argument('--ontology', action='append', choices=sorted(ONTOLOGIES),
+                        help='ontologia a medir (padrão: todas)')
+    parser.add_argument('--repeat', type=int, default=3, help='repetições de cada caso')
+    parser.add_argument('--language', default='pt', choices=op.SUPPORTED_LANGUAGES)
+    parser.add_argument('--no-endpoints', action='store_true', help='mede só as funções')
+    parser.add_argument('--synthetic', help='tamanhos (em classes) de ontologias sintéticas, separados por vírgula')
+    parser.add_argument('--sample', type=int, help='quantidade de classes medidas nos casos por classe')
+    parser.add_argument('--output', help='grava os resultados em JSON (para usar como baseline)')
+    parser.add_argument('--baseline', help='JSON de uma execução anterior para comparação')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='aumento relativo do p50 considerado regressão (padrão 0.20)')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.synthetic.split(',')] if args.synthetic else []
+    if args.ontology or not sizes:
+        ontologies = [(name, ONTOLOGIES[name]) for name in args.ontology or sorted(ONTOLOGIES)]
+    else:
+        ontologies = []
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f'synthetic-{size}.owl')
+            generate_ontology(path, classes=size)
+            ontologies.append((f'synthetic-{size}', path))
+
+        for name, path in ontologies:
+            classes, cases = ontology_cases(name, path, args.repeat, args.language, args.sample)
+            if not args.no_endpoints:
+                cases += endpoint_cases(name, path, classes, args.repeat, args.language)
+            for case, func, args_list, repeat in cases:
+                results[case] = run_case(func, args_list, repeat)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f)['results'], args.threshold)
+
+    print_table(results)
+    output = {'created_at': time.time(), 'results': results}
+    if sizes:
+        output['scaling'] = scaling_curves(results, sizes)
+        print()
+        print_scaling(output['scaling'], sizes)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+    if regressions:
+        print(f"\nRegressões (p50 > {1 + args.threshold:.2f}x baseline): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
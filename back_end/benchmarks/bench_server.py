@@ -0,0 +1,85 @@
+"""Vazão de um servidor em execução (gunicorn/uvicorn/Flask) em /get_subclasses e /get_class_details.
+
+Cada cliente mantém uma conexão keep-alive e percorre as classes da ontologia; ao final são informadas
+as requisições por segundo e a latência. Com --target, termina com código 1 se a vazão ficar abaixo da meta.
+
+    gunicorn -c src/gunicorn.conf.py --chdir src wsgi:application &
+    python back_end/benchmarks/bench_server.py --url http://127.0.0.1:5000 --clients 16 --duration 20
+"""
+import argparse
+import http.client
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from ontology_store import DEFAULT_ONTOLOGY_PATH, OntologyStore  # noqa: E402
+from bench_ontology import ontology_classes, percentile  # noqa: E402
+
+
+def run_client(url, paths, deadline, latencies, errors, seed):
+    parts = urlsplit(url)
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    while time.perf_counter() < deadline:
+        path = rng.choice(paths)
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as error:
+            errors.append(type(error).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mede a vazão de um servidor em execução.')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--ontology', default=DEFAULT_ONTOLOGY_PATH, help='ontologia servida (para listar as classes)')
+    parser.add_argument('--clients', type=int, default=16, help='clientes simultâneos')
+    parser.add_argument('--duration', type=float, default=10.0, help='duração em segundos')
+    parser.add_argument('--language', default='pt')
+    parser.add_argument('--target', type=float, help='vazão mínima (req/s); a meta de produção está no README')
+    args = parser.parse_args(argv)
+
+    classes = ontology_classes(OntologyStore(args.ontology).get().graph)
+    paths = [f'/{endpoint}?class={quote(cls, safe="")}&lang={args.language}'
+             for cls in classes for endpoint in ('get_subclasses', 'get_class_details')]
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=run_client, args=(args.url, paths, deadline, latencies, errors, seed))
+               for seed in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    throughput = len(ordered) / elapsed
+    print(f"{len(ordered)} requisições em {elapsed:.1f}s: {throughput:.1f} req/s, {len(errors)} erros")
+    if ordered:
+        print(f"latência p50 {percentile(ordered, 0.5) * 1000:.2f} ms, p95 {percentile(ordered, 0.95) * 1000:.2f} ms, "
+              f"p99 {percentile(ordered, 0.99) * 1000:.2f} ms")
+    if args.target is not None and throughput < args.target:
+        print(f"Abaixo da meta de {args.target:.0f} req/s")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""Teste de carga que reproduz a navegação do front-end contra um servidor local.
+
+Cada usuário simulado repete sessões como as do App (front_end/src/components/App): GET /get_language,
+/get_subclasses na classe raiz e em cada nível escolhido, /get_class_details na classe final e
+POST /save_form_data com o formulário preenchido. As sessões são sorteadas a partir da árvore de classes da
+ontologia (as mesmas respostas que o servidor dá), com idioma pt ou en por sessão. Ao final são informadas a
+vazão, a latência (p50/p95/p99/máx) e a taxa de erros por endpoint.
+
+    # Inicia o gunicorn localmente (com um banco de submissões temporário) e o encerra ao final
+    python back_end/benchmarks/load_test.py --start --users 32 --duration 30 --en-ratio 0.3
+
+    # Contra um servidor já em execução
+    python back_end/benchmarks/load_test.py --url http://127.0.0.1:5000 --users 16
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from ontology_store import registry  # noqa: E402
+from bench_ontology import percentile  # noqa: E402
+
+# Endpoints na ordem em que aparecem em uma sessão
+ENDPOINTS = ('get_language', 'get_subclasses', 'get_class_details', 'save_form_data')
+
+# Tempo máximo para o servidor iniciado com --start responder (o parse da ontologia acontece antes)
+STARTUP_TIMEOUT = 120
+
+
+# Valor de exemplo para um campo do formulário, no formato que o front-end envia (DynamicForm.js):
+# labels das opções (lista nos campos de múltipla escolha) ou texto no tipo de dados do campo
+def field_value(field, rng):
+    options = field.get("options")
+    if options:
+        if field.get("cardinality") in ('some', 'min 1'):
+            return [option["label"] for option in rng.sample(options, min(len(options), rng.randint(1, 2)))]
+        return rng.choice(options)["label"]
+    data_type = (field.get("dataType") or [''])[0].rpartition('#')[2]
+    if data_type in ('integer', 'int', 'long', 'short', 'nonNegativeInteger', 'positiveInteger'):
+        return str(rng.randint(1, 500))
+    if data_type in ('decimal', 'float', 'double'):
+        return f'{rng.uniform(-60, 10):.4f}'
+    if data_type == 'boolean':
+        return rng.choice(('true', 'false'))
+    if data_type == 'date':
+        return f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'
+    if data_type == 'time':
+        return f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}'
+    if data_type == 'dateTime':
+        return f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:00:00'
+    max_length = int(field.get("restrictions", {}).get("xsd:maxLength", 50))
+    return f'teste {rng.randint(1, 10 ** 6)}'[:max_length]
+
+
+# Formulário preenchido como o front-end envia: chaves "label da classe relacionada-URI da propriedade"
+def form_data(fields, rng):
+    data = {}
+    for field in fields:
+        if field.get("status") == "em construção":
+            continue
+        data.setdefault(f'{field["relatedClass"]}-{field["property"]}', field_value(field, rng))
+    return data
+
+
+# Sessão de navegação: passos (endpoint, método, caminho, corpo JSON ou None). A partir da raiz, escolhe uma
+# subclasse por nível até chegar a uma classe sem subclasses (ou a max_depth) e preenche o formulário dela.
+def plan_session(snapshot, root_uri, language, rng, max_depth=None, validate=True, ontology=None):
+    extra = f'&ontology={quote(ontology)}' if ontology else ''
+    bundle = snapshot.form_bundle(language)
+    steps = [('get_language', 'GET', '/get_language', None)]
+    uri, depth = root_uri, 0
+    while True:
+        steps.append(('get_subclasses', 'GET', f'/get_subclasses?class={quote(uri, safe="")}&lang={language}{extra}', None))
+        subclasses = bundle.subclasses(uri).payload["subclasses"]
+        if not subclasses or (max_depth is not None and depth >= max_depth):
+            break
+        uri = rng.choice(subclasses)["uri"]
+        depth += 1
+    steps.append(('get_class_details', 'GET', f'/get_class_details?class={quote(uri, safe="")}&lang={language}{extra}', None))
+    # Como o front-end, envia a classe para o servidor validar a submissão contra o formulário
+    save_path = f'/save_form_data?class={quote(uri, safe="")}{extra}' if validate else '/save_form_data'
+    steps.append(('save_form_data', 'POST', save_path, form_data(bundle.details(uri).payload, rng)))
+    return steps
+
+
+# Usuário simulado: uma conexão keep-alive, sessões em sequência até o prazo; resultados em stats (por thread)
+def run_user(url, plan, deadline, think_time, stats, seed):
+    parts = urlsplit(url)
+    rng = random.Random(seed)
+
+    def connect():
+        return http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+
+    conn = connect()
+    while time.perf_counter() < deadline:
+        language, steps = plan(rng)
+        completed = True
+        for endpoint, method, path, body in steps:
+            headers = {'Accept-Encoding': 'gzip', 'Accept-Language': language}
+            payload = None
+            if body is not None:
+                payload = json.dumps(body).encode('utf-8')
+                headers['Content-Type'] = 'application/json'
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                error = None if 200 <= response.status < 300 else str(response.status)
+            except (OSError, http.client.HTTPException) as exception:
+                error = type(exception).__name__
+                conn.close()
+                conn = connect()
+            entry = stats[endpoint]
+            entry['latencies'].append(time.perf_counter() - start)
+            if error is not None:
+                entry['errors'][error] = entry['errors'].get(error, 0) + 1
+                completed = False
+                break
+            if think_time:
+                time.sleep(rng.expovariate(1 / think_time))
+        if completed:
+            stats['sessions'] += 1
+    conn.close()
+
+
+# Junta os resultados das threads e resume por endpoint
+def summarize_results(per_user, elapsed):
+    report = {"elapsed_seconds": round(elapsed, 2), "sessions": sum(stats['sessions'] for stats in per_user),
+              "endpoints": {}}
+    report["sessions_per_second"] = round(report["sessions"] / elapsed, 2)
+    for endpoint in ENDPOINTS:
+        latencies = sorted(l for stats in per_user for l in stats[endpoint]['latencies'])
+        errors = {}
+        for stats in per_user:
+            for error, count in stats[endpoint]['errors'].items():
+                errors[error] = errors.get(error, 0) + count
+        failed = sum(errors.values())
+        entry = {"requests": len(latencies), "throughput": round(len(latencies) / elapsed, 1),
+                 "errors": errors, "error_rate": round(failed / len(latencies), 4) if latencies else 0.0}
+        if latencies:
+            entry.update({f"p{int(q * 100)}_ms": round(percentile(latencies, q) * 1000, 2) for q in (0.5, 0.95, 0.99)})
+            entry["max_ms"] = round(latencies[-1] * 1000, 2)
+        report["endpoints"][endpoint] = entry
+    return report
+
+
+def print_report(report):
+    print(f'{report["sessions"]} sessões em {report["elapsed_seconds"]:.1f}s ({report["sessions_per_second"]:.1f}/s)')
+    print(f'{"endpoint":<20}{"reqs":>8}{"req/s":>9}{"erros":>8}{"taxa":>8}{"p50":>9}{"p95":>9}{"p99":>9}{"máx":>9}')
+    for endpoint, entry in report["endpoints"].items():
+        failed = sum(entry["errors"].values())
+        latency = ''.join(f'{entry.get(key, 0):>9.2f}' for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+        print(f'{endpoint:<20}{entry["requests"]:>8}{entry["throughput"]:>9.1f}{failed:>8}'
+              f'{entry["error_rate"] * 100:>7.2f}%{latency}')
+        if entry["errors"]:
+            print(f'{"":<20}erros: {entry["errors"]}')
+
+
+# Inicia o gunicorn com a configuração de produção no endereço de url, com um banco de submissões temporário
+def start_server(url, server_workers, ontology):
+    parts = urlsplit(url)
+    env = dict(os.environ, BIND=f'{parts.hostname}:{parts.port or 80}',
+               SUBMISSIONS_DB=os.path.join(tempfile.mkdtemp(prefix='load_test_'), 'submissions.sqlite3'))
+    if server_workers:
+        env['WEB_CONCURRENCY'] = str(server_workers)
+    if ontology:
+        env['PRELOAD_ONTOLOGIES'] = ontology
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application'],
+                               cwd=SRC_DIR, env=env)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'o servidor terminou com código {process.returncode}')
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=5)
+            conn.request('GET', '/get_language')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError('o servidor não respondeu a tempo')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Reproduz sessões de navegação do front-end contra o servidor.')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--start', action='store_true', help='inicia o gunicorn localmente e o encerra ao final')
+    parser.add_argument('--server-workers', type=int, help='workers do gunicorn iniciado com --start')
+    parser.add_argument('--ontology', choices=registry.names(), help='ontologia navegada (padrão: a padrão do servidor)')
+    parser.add_argument('--root', help='classe raiz da navegação (padrão: a raiz da ontologia)')
+    parser.add_argument('--users', type=int, default=16, help='usuários simultâneos')
+    parser.add_argument('--duration', type=float, default=20.0, help='duração em segundos')
+    parser.add_argument('--en-ratio', type=float, default=0.3, help='fração das sessões em inglês')
+    parser.add_argument('--think', type=float, default=0.0, help='pausa média entre requisições de uma sessão (s)')
+    parser.add_argument('--max-depth', type=int, help='níveis máximos de subclasses escolhidos por sessão')
+    parser.add_argument('--no-validate', dest='validate', action='store_false',
+                        help='não envia ?class= em /save_form_data (grava sem validação no servidor)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='grava o relatório em JSON')
+    parser.add_argument('--max-error-rate', type=float, help='termina com código 1 se algum endpoint passar desta taxa')
+    parser.add_argument('--max-p99', type=float, help='termina com código 1 se o p99 de algum endpoint passar disto (ms)')
+    args = parser.parse_args(argv)
+
+    snapshot = registry.store(args.ontology).get()
+    root_uri = args.root or snapshot.root_uri
+
+    def plan(rng):
+        language = 'en' if rng.random() < args.en_ratio else 'pt'
+        return language, plan_session(snapshot, root_uri, language, rng, args.max_depth, args.validate, args.ontology)
+
+    # As sessões usam os esquemas compilados dos dois idiomas (compilados antes de começar a medir)
+    snapshot.warm()
+    server = start_server(args.url, args.server_workers, args.ontology) if args.start else None
+    try:
+        per_user = [{'sessions': 0, **{endpoint: {'latencies': [], 'errors': {}} for endpoint in ENDPOINTS}}
+                    for _ in range(args.users)]
+        deadline = time.perf_counter() + args.duration
+        threads = [threading.Thread(target=run_user, args=(args.url, plan, deadline, args.think, stats, args.seed + i))
+                   for i, stats in enumerate(per_user)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = summarize_results(per_user, elapsed)
+    report.update({"users": args.users, "en_ratio": args.en_ratio, "think_seconds": args.think})
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    failed = False
+    for endpoint, entry in report["endpoints"].items():
+        if args.max_error_rate is not None and entry["error_rate"] > args.max_error_rate:
+            print(f'{endpoint}: taxa de erros {entry["error_rate"]:.2%} acima de {args.max_error_rate:.2%}')
+            failed = True
+        if args.max_p99 is not None and entry.get("p99_ms", 0) > args.max_p99:
+            print(f'{endpoint}: p99 {entry["p99_ms"]:.1f} ms acima de {args.max_p99:.1f} ms')
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""Gerador de ontologias sintéticas para testes de escala.
+
+Produz um arquivo RDF/XML com os mesmos padrões que o o_parse_back_end entende (cadeias de subClassOf,
+restrições com someValuesFrom/allValuesFrom, cardinalidades qualificadas, owl:intersectionOf/owl:unionOf,
+facetas owl:withRestrictions e classes "é select" com indivíduos), no tamanho pedido.
+
+    python back_end/benchmarks/synthetic_ontology.py --classes 10000 --output /tmp/sintetica.owl
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+import o_parse_back_end as op  # noqa: E402
+
+# Namespace das entidades geradas
+SYNTHETIC_NS = 'http://www.semanticweb.org/ontologias/sintetica/'
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+# Palavras usadas para montar labels (com acentos, como nas ontologias reais)
+WORDS_PT = ['Avaliação', 'Saúde', 'Educação', 'Território', 'Aldeia', 'Vigilância', 'População', 'Água',
+            'Distrito', 'Atenção', 'Indígena', 'Registro', 'Notificação', 'Família', 'Criança', 'Vacinação']
+WORDS_EN = ['Assessment', 'Health', 'Education', 'Territory', 'Village', 'Surveillance', 'Population', 'Water',
+            'District', 'Care', 'Indigenous', 'Record', 'Notification', 'Family', 'Child', 'Vaccination']
+
+DATA_TYPES = ['string', 'date', 'time', 'integer', 'decimal', 'boolean']
+
+# Tipos de restrição gerados, em rodízio
+RESTRICTION_KINDS = ('some', 'exactly', 'min', 'max', 'intersection', 'union', 'only')
+
+_HEADER = """<?xml version="1.0"?>
+<rdf:RDF xmlns="{ns}"
+     xml:base="{ns}"
+     xmlns:obo="http://purl.obolibrary.org/obo/"
+     xmlns:owl="http://www.w3.org/2002/07/owl#"
+     xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+     xmlns:xsd="http://www.w3.org/2001/XMLSchema#"
+     xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#">
+    <owl:Ontology rdf:about="{ns}"/>
+"""
+
+
+def entity_uri(prefix, index):
+    return f'{SYNTHETIC_NS}{prefix}_{index:07d}'
+
+
+def class_uri(index):
+    # A classe 0 é a raiz dos formulários, para que a herança de restrições pare nela como na ontologia real
+    return op.ROOT_CLASS_URI if index == 0 else entity_uri('classe', index)
+
+
+def labels_xml(pt, en, indent='        '):
+    return (f'{indent}<rdfs:label xml:lang="pt">{escape(pt)}</rdfs:label>\n'
+            f'{indent}<rdfs:label xml:lang="en">{escape(en)}</rdfs:label>\n')
+
+
+def resource(tag, uri, indent):
+    return f'{indent}<{tag} rdf:resource={quoteattr(uri)}/>\n'
+
+
+# Restrição owl:Restriction (sem o subClassOf em volta)
+def restriction_xml(kind, property_uri, targets, indent):
+    inner = indent + '    '
+    lines = [f'{indent}<owl:Restriction>\n', resource('owl:onProperty', property_uri, inner)]
+    if kind in ('exactly', 'min', 'max'):
+        tag = {'exactly': 'owl:qualifiedCardinality', 'min': 'owl:minQualifiedCardinality',
+               'max': 'owl:maxQualifiedCardinality'}[kind]
+        lines.append(f'{inner}<{tag} rdf:datatype="{XSD}nonNegativeInteger">1</{tag}>\n')
+        lines.append(resource('owl:onClass', targets[0], inner))
+    elif kind == 'union':
+        lines.append(f'{inner}<owl:someValuesFrom>\n{inner}    <owl:Class>\n'
+                     f'{inner}        <owl:unionOf rdf:parseType="Collection">\n')
+        lines.extend(f'{inner}            <rdf:Description rdf:about={quoteattr(t)}/>\n' for t in targets)
+        lines.append(f'{inner}        </owl:unionOf>\n{inner}    </owl:Class>\n{inner}</owl:someValuesFrom>\n')
+    else:
+        tag = 'owl:allValuesFrom' if kind == 'only' else 'owl:someValuesFrom'
+        lines.append(resource(tag, targets[0], inner))
+    lines.append(f'{indent}</owl:Restriction>\n')
+    return ''.join(lines)
+
+
+# Superclasse anônima do tipo "pai and (propriedade some alvo)", como as geradas pelo Protégé
+def intersection_xml(parent_uri, property_uri, target, indent):
+    inner = indent + '        '
+    return (f'{indent}<owl:Class>\n{indent}    <owl:intersectionOf rdf:parseType="Collection">\n'
+            f'{inner}<rdf:Description rdf:about={quoteattr(parent_uri)}/>\n'
+            + restriction_xml('some', property_uri, [target], inner)
+            + f'{indent}    </owl:intersectionOf>\n{indent}</owl:Class>\n')
+
+
+# Gera a ontologia em path e retorna contagens das entidades geradas
+def generate_ontology(path, classes=1000, branching=8, data_properties=None, object_properties=None,
+                      restrictions_per_class=3, domain_ratio=0.3, select_ratio=0.05, individuals_per_select=5,
+                      seed=0):
+    rng = random.Random(seed)
+    data_properties = data_properties or max(11, classes // 50)
+    object_properties = object_properties or max(5, classes // 200)
+
+    def label(index):
+        pt = f'{WORDS_PT[index % len(WORDS_PT)]} {WORDS_PT[index // len(WORDS_PT) % len(WORDS_PT)]} {index}'
+        en = f'{WORDS_EN[index % len(WORDS_EN)]} {WORDS_EN[index // len(WORDS_EN) % len(WORDS_EN)]} {index}'
+        return pt, en
+
+    # Domínios das data properties e classes "é select"
+    domains = {p: [] for p in range(data_properties)}
+    for index in range(1, classes):
+        if rng.random() < domain_ratio:
+            domains[rng.randrange(data_properties)].append(index)
+    selectable = [index for index in range(1, classes) if rng.random() < select_ratio]
+
+    stats = {'classes': classes, 'data_properties': data_properties, 'object_properties': object_properties,
+             'restrictions': 0, 'select_classes': len(selectable), 'individuals': 0}
+
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write(_HEADER.format(ns=SYNTHETIC_NS))
+
+        for index in range(object_properties):
+            out.write(f'    <owl:ObjectProperty rdf:about={quoteattr(entity_uri("tem", index))}>\n'
+                      + labels_xml(f'tem parte {index}', f'has part {index}') + '    </owl:ObjectProperty>\n')
+
+        for index in range(data_properties):
+            out.write(f'    <owl:DatatypeProperty rdf:about={quoteattr(entity_uri("dado", index))}>\n')
+            for domain in domains[index]:
+                out.write(resource('rdfs:domain', class_uri(domain), '        '))
+            data_type = DATA_TYPES[index % len(DATA_TYPES)]
+            if data_type == 'string' and index % 2:
+                out.write('        <rdfs:range>\n            <rdfs:Datatype>\n'
+                          + resource('owl:onDatatype', XSD + 'string', '                ')
+                          + '                <owl:withRestrictions rdf:parseType="Collection">\n'
+                          + f'                    <rdf:Description>\n'
+                          + f'                        <xsd:maxLength>{50 * (1 + index % 5)}</xsd:maxLength>\n'
+                          + '                    </rdf:Description>\n                </owl:withRestrictions>\n'
+                          + '            </rdfs:Datatype>\n        </rdfs:range>\n')
+            else:
+                out.write(resource('rdfs:range', XSD + data_type, '        '))
+            out.write(labels_xml(f'é {data_type} {index}', f'is {data_type} {index}') + '    </owl:DatatypeProperty>\n')
+
+        out.write(f'    <owl:DatatypeProperty rdf:about={quoteattr(str(op.SELECT_DP_URI))}>\n')
+        for index in selectable:
+            out.write(resource('rdfs:domain', class_uri(index), '        '))
+        out.write(labels_xml('é select', 'is select') + '    </owl:DatatypeProperty>\n')
+
+        # Árvore de classes: cada classe tem como pai (index - 1) // branching, formando cadeias de subClassOf
+        for index in range(classes):
+            pt, en = label(index)
+            out.write(f'    <owl:Class rdf:about={quoteattr(class_uri(index))}>\n')
+            if index:
+                parent_uri = class_uri((index - 1) // branching)
+                out.write(resource('rdfs:subClassOf', parent_uri, '        '))
+                for position in range(restrictions_per_class):
+                    kind = RESTRICTION_KINDS[(index + position) % len(RESTRICTION_KINDS)]
+                    property_uri = entity_uri('tem', rng.randrange(object_properties))
+                    targets = [class_uri(rng.randrange(1, classes)) for _ in range(2 if kind == 'union' else 1)]
+                    out.write('        <rdfs:subClassOf>\n')
+                    if kind == 'intersection':
+                        out.write(intersection_xml(parent_uri, property_uri, targets[0], '            '))
+                    else:
+                        out.write(restriction_xml(kind, property_uri, targets, '            '))
+                    out.write('        </rdfs:subClassOf>\n')
+                    stats['restrictions'] += 1
+            out.write(labels_xml(pt, en)
+                      + f'        <obo:IAO_0000115 xml:lang="pt">Definição sintética de {escape(pt)}.</obo:IAO_0000115>\n'
+                      + '    </owl:Class>\n')
+
+        for index in selectable:
+            for position in range(individuals_per_select):
+                individual = entity_uri('individuo', index * individuals_per_select + position)
+                out.write(f'    <owl:NamedIndividual rdf:about={quoteattr(individual)}>\n'
+                          + resource('rdf:type', class_uri(index), '        ')
+                          + labels_xml(f'Opção {position} de {index}', f'Option {position} of {index}')
+                          + '    </owl:NamedIndividual>\n')
+                stats['individuals'] += 1
+
+        out.write('</rdf:RDF>\n')
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera uma ontologia sintética para testes de escala.')
+    parser.add_argument('--classes', type=int, default=10000, help='quantidade de classes')
+    parser.add_argument('--branching', type=int, default=8, help='subclasses diretas por classe')
+    parser.add_argument('--data-properties', type=int, help='quantidade de data properties (padrão: classes/50)')
+    parser.add_argument('--restrictions', type=int, default=3, help='restrições por classe')
+    parser.add_argument('--select-ratio', type=float, default=0.05, help='fração de classes "é select"')
+    parser.add_argument('--individuals', type=int, default=5, help='indivíduos por classe "é select"')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True, help='arquivo OWL de saída')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    stats = generate_ontology(args.output, args.classes, args.branching, args.data_properties,
+                              restrictions_per_class=args.restrictions, select_ratio=args.select_ratio,
+                              individuals_per_select=args.individuals, seed=args.seed)
+    print(f"{args.output}: {stats} em {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,40 +1,171 @@
 import json
-from flask import Flask, Response, jsonify, request
+import os
+from flask import Flask, Response, abort, g, jsonify, make_response, request, stream_with_context
 from flask_cors import CORS
 import o_parse_back_end as op 
 import prompt as pr
+from ontology_store import registry
+from http_cache import cached_response, compressed_response
+from instrumentation import init_app as init_instrumentation, span
+from form_bundle import FormSchemaEntry
+from search_index import SEARCH_KINDS
+from submission_store import SubmissionStore
+from submission_export import EXPORT_FORMATS, FieldResolver, export_lines
+from submission_import import IMPORT_FORMATS, IMPORT_WORKERS, READERS, ColumnMapper, import_records, open_text
 
 app = Flask(__name__)
 CORS(app)
 
-# Variável global de idioma, com valor padrão como 'pt'
-current_language = 'pt'
+# Tempos por fase (Server-Timing), logs estruturados e /metrics
+init_instrumentation(app)
 
-# Função para alterar o idioma global
+# Armazenamento das submissões de formulários
+submissions = SubmissionStore()
+
+# Tamanho máximo de página em /submissions
+MAX_SUBMISSIONS_PAGE = 500
+
+# Erros por linha devolvidos na resposta de /submissions/import (a contagem inclui todos)
+MAX_IMPORT_ERRORS = 1000
+
+# Idioma usado quando a requisição não indica nenhum
+DEFAULT_LANGUAGE = os.environ.get('DEFAULT_LANGUAGE', 'pt')
+
+# Nome do cookie que guarda a preferência de idioma do cliente
+LANGUAGE_COOKIE = 'language'
+
+# Cabeçalhos que mudam a resposta de endpoints que dependem do idioma
+LANGUAGE_VARY = ('Accept-Language', 'Cookie')
+
+# Idioma da requisição: parâmetro ?lang=, cookie de preferência, Accept-Language e, por fim, o padrão
+def request_language():
+    for language in (request.args.get('lang'), request.cookies.get(LANGUAGE_COOKIE)):
+        if language in op.SUPPORTED_LANGUAGES:
+            break
+    else:
+        language = request.accept_languages.best_match(op.SUPPORTED_LANGUAGES, default=DEFAULT_LANGUAGE)
+    g.language = language  # registrado no log da requisição
+    return language
+
+# Store da ontologia pedida em ?ontology= (a padrão se ausente); responde 404 se ela não existir
+def request_store():
+    name = request.args.get('ontology')
+    try:
+        return registry.store(name)
+    except KeyError:
+        abort(make_response(jsonify({"error": f"unknown ontology: {name}", "ontologies": registry.names()}), 404))
+
+# Função para alterar o idioma do cliente (guardado em cookie, sem afetar outros usuários)
 @app.route('/set_language', methods=['POST'])
 def set_language():
-    global current_language
     data = request.get_json()
     new_language = data.get('language')
-    if new_language not in ['pt', 'en']:
+    if new_language not in op.SUPPORTED_LANGUAGES:
         return jsonify({"error": "Idioma não suportado"}), 400
 
-    current_language = new_language
-    return jsonify({"message": f"Idioma alterado para {new_language}"}), 200
+    response = jsonify({"message": f"Idioma alterado para {new_language}"})
+    response.set_cookie(LANGUAGE_COOKIE, new_language, max_age=365 * 24 * 3600, samesite='Lax')
+    return response, 200
 
-# Função para retornar o idioma atual
+# Função para retornar o idioma da requisição
 @app.route('/get_language', methods=['GET'])
 def get_language():
-    return jsonify({'language': current_language})
+    response = jsonify({'language': request_language()})
+    response.vary.update(LANGUAGE_VARY)
+    return response
 
 @app.route('/save_form_data', methods=['POST'])
 def save_form_data():
     data = request.get_json()  # Recebe os dados do formulário
-    print(data)  # Verifique os dados no console
-    # Salva os dados do formulário em um arquivo JSON
-    with open('form_data.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
-    return jsonify({"message": "Formulário recebido com sucesso!"}), 200
+    if not isinstance(data, dict):
+        return jsonify({"error": "form data must be a JSON object"}), 400
+
+    # Com a classe do formulário, a submissão é validada contra as cardinalidades, tipos e facetas dos campos
+    class_uri = request.args.get('class')
+    if class_uri:
+        with span('validate'):
+            validator = request_store().get().validators().get(class_uri)
+            if validator is None:
+                return jsonify({"error": f"unknown class: {class_uri}"}), 400
+            errors = validator.validate(data)
+        if errors:
+            return jsonify({"error": "invalid form data", "fields": errors}), 422
+
+    # Acrescenta a submissão ao armazenamento (gravada em lote por uma thread, sem bloquear a requisição)
+    submission_id = submissions.save(data, class_uri)
+    return jsonify({"message": "Formulário recebido com sucesso!", "id": submission_id}), 200
+
+# Lista as submissões em ordem de chegada, paginadas pelo cursor "after"
+@app.route('/submissions', methods=['GET'])
+def list_submissions():
+    try:
+        limit = int(request.args.get('limit', 50))
+        after = int(request.args.get('after', 0))
+    except ValueError:
+        return jsonify({"error": "limit and after must be integers"}), 400
+    if not 1 <= limit <= MAX_SUBMISSIONS_PAGE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_SUBMISSIONS_PAGE}"}), 400
+
+    page = submissions.list(limit, after, request.args.get('class'))
+    next_cursor = page[-1]["seq"] if len(page) == limit else None
+    return jsonify({"submissions": page, "next": next_cursor})
+
+# Exporta as submissões como indivíduos RDF (N-Triples ou Turtle), em streaming
+@app.route('/submissions/export', methods=['GET'])
+def export_submissions():
+    export_format = request.args.get('format', 'nt')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {list(EXPORT_FORMATS)}"}), 400
+
+    resolver = FieldResolver(request_store().get())
+    lines = export_lines(submissions.iter_all(request.args.get('class')), resolver, export_format)
+    content_type = 'text/turtle' if export_format == 'ttl' else 'application/n-triples'
+    return Response(stream_with_context(lines), content_type=f'{content_type}; charset=utf-8')
+
+# Importa em lote um arquivo CSV ou JSONL de submissões de uma classe (corpo da requisição ou campo "file"
+# de um formulário multipart), lido em streaming; grava só os registros válidos
+@app.route('/submissions/import', methods=['POST'])
+def import_submissions():
+    import_format = request.args.get('format', 'csv')
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {list(IMPORT_FORMATS)}"}), 400
+    class_uri = request.args.get('class')
+    if not class_uri:
+        return jsonify({"error": "class parameter is required"}), 400
+    snapshot = request_store().get()
+    validator = snapshot.validators().get(class_uri)
+    if validator is None:
+        return jsonify({"error": f"unknown class: {class_uri}"}), 400
+
+    upload = request.files.get('file')
+    source = upload.stream if upload is not None else request.stream
+    errors = []
+
+    def on_error(line, row_errors):
+        if len(errors) < MAX_IMPORT_ERRORS:
+            errors.append({"row": line, "errors": row_errors})
+
+    with span('import'):
+        try:
+            mapper = ColumnMapper(snapshot, class_uri, request_language(), validator)
+            records = READERS[import_format](open_text(source), mapper)
+            stats = import_records(records, submissions, validator, class_uri, request.args.get('ontology'),
+                                   IMPORT_WORKERS, on_error=on_error)
+        except (ValueError, UnicodeDecodeError) as error:
+            return jsonify({"error": str(error)}), 400
+    return jsonify({**stats, "errors": errors, "errors_truncated": stats["invalid"] > len(errors)})
+
+# Retorna uma submissão pelo identificador
+@app.route('/submissions/<submission_id>', methods=['GET'])
+def get_submission(submission_id):
+    submission = submissions.get(submission_id)
+    if submission is None:
+        return jsonify({"error": "submission not found"}), 404
+    return jsonify(submission)
+
+# Monta a resposta a partir de uma entrada pré-serializada do pacote de formulários
+def form_schema_response(entry):
+    return cached_response(entry.body, entry.etag, vary=LANGUAGE_VARY)
 
 # Função para buscar subclasses
 @app.route('/get_subclasses', methods=['GET'])
@@ -43,18 +174,15 @@ def get_subclasses():
     if not class_uri:
         return jsonify({"error": "class parameter is required"}), 400
 
-    # Carrega a ontologia e extrai as subclasses
-    g = op.load_ontology('back_end/src/OWL/Onto_aldeias.owl')
-    labels, labels_to_uris, descriptions = op.extract_labels(g, current_language)
-    subclasses = pr.list_subclasses(g, class_uri, labels)
-
-    # Adicionar a descrição ao JSON de subclasses
-    for subclass in subclasses:
-        related_class_uri = subclass.get("uri")
-        if related_class_uri in descriptions:
-            subclass["definition"] = descriptions[related_class_uri]  # Adiciona a definição (se disponível)
-
-    return jsonify({"subclasses": subclasses})
+    # Subclasses (com definições) já compiladas para a versão atual da ontologia
+    with span('ontology'):
+        snapshot = request_store().get()
+    with span('bundle'):
+        bundle = snapshot.form_bundle(request_language())
+    with span('schema'):
+        entry = bundle.subclasses(class_uri)
+    with span('response'):
+        return form_schema_response(entry)
 
 # Função para buscar os detalhes de uma classe
 @app.route('/get_class_details', methods=['GET'])
@@ -63,13 +191,149 @@ def get_class_details():
     if not class_uri:
         return jsonify({"error": "class parameter is required"}), 400
 
-    # Carrega a ontologia e extrai os detalhes da classe
-    g = op.load_ontology('back_end/src/OWL/Onto_aldeias.owl')
-    labels, labels_to_uris, descriptions = op.extract_labels(g, current_language)
-    details = op.list_restrictions_and_data_properties(g, class_uri, labels, labels_to_uris, descriptions)
-    response = json.dumps(details, ensure_ascii=False)
-    return Response(response, content_type='application/json; charset=utf-8')
+    # Detalhes da classe já compilados para a versão atual da ontologia
+    with span('ontology'):
+        snapshot = request_store().get()
+    with span('bundle'):
+        bundle = snapshot.form_bundle(request_language())
+    with span('schema'):
+        entry = bundle.details(class_uri)
+    with span('response'):
+        return form_schema_response(entry)
+
+# Função para buscar as opções (indivíduos) de uma classe "é select", com busca opcional por prefixo
+@app.route('/get_options', methods=['GET'])
+def get_options():
+    class_uri = request.args.get('class')
+    if not class_uri:
+        return jsonify({"error": "class parameter is required"}), 400
+    try:
+        limit = int(request.args.get('limit', 0))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    select_options = request_store().get().options(request_language())
+    query = request.args.get('q', '')
+    options = select_options.search(class_uri, query) if query else select_options.get(class_uri)
+    if options is None:
+        return jsonify({"error": "class is not a select class"}), 404
+
+    total = len(options)
+    if limit > 0:
+        options = options[:limit]
+    response = jsonify({"class": class_uri, "options": options, "total": total})
+    response.vary.update(LANGUAGE_VARY)
+    return response
+
+# Limite de resultados por requisição em /search
+MAX_SEARCH_RESULTS = 50
+
+# Busca (autocomplete) por labels e definições de classes, propriedades e indivíduos
+@app.route('/search', methods=['GET'])
+def search():
+    query = request.args.get('q', '')
+    if not query.strip():
+        return jsonify({"error": "q parameter is required"}), 400
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= MAX_SEARCH_RESULTS:
+        return jsonify({"error": f"limit must be between 1 and {MAX_SEARCH_RESULTS}"}), 400
+    kinds = request.args.getlist('kind')
+    unknown = [kind for kind in kinds if kind not in SEARCH_KINDS.values()]
+    if unknown:
+        return jsonify({"error": f"kind must be one of {list(SEARCH_KINDS.values())}"}), 400
+
+    language = request_language()
+    snapshot = request_store().get()
+    with span('search'):
+        results = snapshot.search().search(query, language, limit, kinds)
+    response = jsonify({"query": query, "results": results})
+    response.vary.update(LANGUAGE_VARY)
+    return response
+
+# Profundidade máxima aceita por /get_class_tree
+MAX_TREE_DEPTH = 50
+
+# Função para buscar a árvore completa de subclasses a partir de uma raiz
+@app.route('/get_class_tree', methods=['GET'])
+def get_class_tree():
+    depth = request.args.get('depth', MAX_TREE_DEPTH)
+    try:
+        depth = int(depth)
+    except ValueError:
+        return jsonify({"error": "depth must be an integer"}), 400
+    if depth < 0:
+        return jsonify({"error": "depth must be zero or positive"}), 400
+    depth = min(depth, MAX_TREE_DEPTH)
+
+    # A árvore é calculada uma vez por versão da ontologia, idioma, raiz e profundidade
+    def build_tree(snapshot):
+        labels, labels_to_uris, descriptions = snapshot.labels(language)
+        tree = pr.build_class_tree(snapshot.graph, root_uri, labels, descriptions, snapshot.hierarchy(), depth)
+        return FormSchemaEntry(tree, snapshot.version)
+
+    language = request_language()
+    snapshot = request_store().get()
+    root_uri = request.args.get('root', snapshot.root_uri)
+    if root_uri not in snapshot.hierarchy().class_uris:
+        return jsonify({"error": f"unknown class: {root_uri}"}), 404
+    entry = snapshot.index(('class_tree', language, root_uri, depth), build_tree)
+    return cached_response(entry.body, entry.etag, vary=LANGUAGE_VARY)
+
+# Operações aceitas por /batch e o método do pacote de formulários que responde a cada uma
+BATCH_OPERATIONS = {'subclasses': 'subclasses', 'details': 'details'}
+
+# Limite de classes por requisição em /batch
+MAX_BATCH_CLASSES = 500
+
+# Função para buscar subclasses e detalhes de várias classes em uma única requisição
+@app.route('/batch', methods=['POST'])
+def batch():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "request body must be a JSON object"}), 400
+    classes = data.get('classes')
+    operations = data.get('operations') or list(BATCH_OPERATIONS)
+    if not isinstance(classes, list) or not classes or not all(isinstance(uri, str) and uri for uri in classes):
+        return jsonify({"error": "classes must be a non-empty list of class URIs"}), 400
+    if len(classes) > MAX_BATCH_CLASSES:
+        return jsonify({"error": f"at most {MAX_BATCH_CLASSES} classes per batch"}), 400
+    if not isinstance(operations, list) or any(op_name not in BATCH_OPERATIONS for op_name in operations):
+        return jsonify({"error": f"operations must be a list of {sorted(BATCH_OPERATIONS)}"}), 400
+
+    # Todas as classes são respondidas pelo mesmo snapshot, mesmo que a ontologia seja recarregada no meio
+    snapshot = request_store().get()
+    bundle = snapshot.form_bundle(request_language())
+
+    # Junta os corpos já serializados do pacote, sem serializar o JSON de novo
+    results = []
+    for class_uri in dict.fromkeys(classes):
+        parts = [
+            json.dumps(op_name).encode('utf-8') + b': ' + getattr(bundle, BATCH_OPERATIONS[op_name])(class_uri).body
+            for op_name in operations
+        ]
+        results.append(json.dumps(class_uri, ensure_ascii=False).encode('utf-8') + b': {' + b', '.join(parts) + b'}')
+    body = (b'{"version": ' + json.dumps(snapshot.version).encode('utf-8') +
+            b', "language": ' + json.dumps(bundle.language).encode('utf-8') +
+            b', "results": {' + b', '.join(results) + b'}}')
+    return compressed_response(body, vary=LANGUAGE_VARY)
+
+# Força o recarregamento da ontologia (uso operacional após editar o arquivo OWL); reaproveita da versão
+# anterior o que não mudou (?full=1 recompila tudo)
+@app.route('/reload_ontology', methods=['POST'])
+def reload_ontology():
+    snapshot = request_store().reload(full=request.args.get('full') == '1')
+    return jsonify({"message": "Ontologia recarregada", "version": snapshot.version, "reload": snapshot.reload}), 200
+
+# Lista as ontologias servidas, com a situação de carga e a memória aproximada de cada uma
+@app.route('/ontologies', methods=['GET'])
+def list_ontologies():
+    return jsonify(registry.stats())
 
 
+# Servidor de desenvolvimento; em produção use wsgi.py (gunicorn) ou asgi.py
 if __name__ == '__main__':
-    app.run(debug=True)
+    registry.store().get().warm()  # Faz o parse e compila os formulários antes de aceitar requisições
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1')
@@ -0,0 +1,8 @@
+# Entrada ASGI (ex.: uvicorn asgi:application). Requer o asgiref (em requirements.txt).
+# Os handlers do Flask rodam em um pool de threads; as gravações de submissões não bloqueiam a
+# requisição, pois entram na fila da thread de gravação do SubmissionStore.
+from asgiref.wsgi import WsgiToAsgi
+
+from wsgi import application as wsgi_application
+
+application = WsgiToAsgi(wsgi_application)
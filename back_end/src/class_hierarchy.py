@@ -0,0 +1,88 @@
+from collections import deque
+
+from rdflib import BNode, URIRef, RDFS
+
+
+# Hierarquia de classes materializada a partir de rdfs:subClassOf, calculada uma vez por carga da ontologia.
+# As listas preservam a ordem em que o rdflib devolve os triplos, para que as respostas não mudem.
+class ClassHierarchy:
+    def __init__(self, g):
+        # Todas as expressões de superclasse (URIs e BNodes de restrição) de cada classe
+        self.superclass_expressions = {}
+        for s in g.subjects(RDFS.subClassOf, None, unique=True):
+            self.superclass_expressions[s] = list(g.objects(s, RDFS.subClassOf))
+
+        # Pais e filhos diretos (somente classes nomeadas como pais)
+        self.parents = {}
+        self.children = {}
+        for s, expressions in self.superclass_expressions.items():
+            parents = [o for o in expressions if isinstance(o, URIRef)]
+            if parents:
+                self.parents[s] = parents
+            for parent in parents:
+                if parent not in self.children:
+                    self.children[parent] = list(g.subjects(RDFS.subClassOf, parent))
+
+        self.classes = set(self.parents) | set(self.children)
+        # URIs das classes como texto, para reconhecer prefixos de chaves sem criar um URIRef para cada um
+        self.class_uris = frozenset(str(cls) for cls in self.classes if isinstance(cls, URIRef))
+        self.ancestors = {cls: self._collect(cls, self.parents) for cls in self.classes}
+        self.topological_order, self.cycles = self._sort()
+
+    # Superclasses diretas (URIs e restrições anônimas) de uma classe
+    def superclasses_of(self, uri):
+        return self.superclass_expressions.get(URIRef(uri), [])
+
+    # Pais nomeados diretos de uma classe
+    def parents_of(self, uri):
+        return self.parents.get(URIRef(uri), [])
+
+    # Subclasses diretas de uma classe
+    def children_of(self, uri):
+        return self.children.get(URIRef(uri), [])
+
+    # Conjunto de todos os ancestrais de uma classe (sem incluir a própria classe)
+    def ancestors_of(self, uri):
+        uri = URIRef(uri)
+        if uri in self.ancestors:
+            return self.ancestors[uri]
+        return frozenset()
+
+    # Conjunto de todos os descendentes de uma classe (sem incluir a própria classe)
+    def descendants_of(self, uri):
+        return self._collect(URIRef(uri), self.children)
+
+    # Verifica se uma classe é igual ou descende de outra
+    def is_subclass_of(self, uri, ancestor_uri):
+        return URIRef(uri) == URIRef(ancestor_uri) or URIRef(ancestor_uri) in self.ancestors_of(uri)
+
+    # Percorre a partir de uma classe seguindo as arestas dadas, com conjunto de visitados (seguro para ciclos)
+    @staticmethod
+    def _collect(start, edges):
+        found = set()
+        stack = list(edges.get(start, ()))
+        while stack:
+            node = stack.pop()
+            if node in found or isinstance(node, BNode):
+                continue
+            found.add(node)
+            stack.extend(edges.get(node, ()))
+        found.discard(start)
+        return frozenset(found)
+
+    # Ordenação topológica (pais antes dos filhos); classes presas em ciclos ficam no final
+    def _sort(self):
+        pending = {cls: len(self.parents.get(cls, ())) for cls in self.classes}
+        ready = deque(sorted(cls for cls in self.classes if pending[cls] == 0))
+        order = []
+        while ready:
+            cls = ready.popleft()
+            order.append(cls)
+            for child in self.children.get(cls, ()):
+                if child not in pending:
+                    continue
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready.append(child)
+        cycles = sorted(cls for cls, count in pending.items() if count > 0)
+        return order + cycles, cycles
@@ -0,0 +1,178 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from rdflib import RDF, OWL, URIRef
+
+import o_parse_back_end as op
+import prompt as pr
+from instrumentation import record_cache, span
+
+# Diretório opcional com pacotes pré-compilados (gerados pela linha de comando deste módulo)
+FORM_BUNDLE_DIR = os.environ.get('FORM_BUNDLE_DIR')
+
+
+# Monta o JSON de /get_subclasses: subclasses diretas com label e definição
+def build_subclasses_payload(snapshot, class_uri, language):
+    labels, labels_to_uris, descriptions = snapshot.labels(language)
+    subclasses = pr.list_subclasses(snapshot.graph, class_uri, labels, snapshot.hierarchy())
+
+    # Adicionar a descrição ao JSON de subclasses
+    for subclass in subclasses:
+        related_class_uri = subclass.get("uri")
+        if related_class_uri in descriptions:
+            subclass["definition"] = descriptions[related_class_uri]  # Adiciona a definição (se disponível)
+
+    return {"subclasses": subclasses}
+
+
+# Monta o JSON de /get_class_details: campos do formulário da classe
+def build_details_payload(snapshot, class_uri, language):
+    labels, labels_to_uris, descriptions = snapshot.labels(language)
+    options = snapshot.options(language).options_by_class
+    return op.list_restrictions_and_data_properties(snapshot.graph, class_uri, labels, labels_to_uris, descriptions,
+                                                    snapshot.data_properties(), snapshot.hierarchy(),
+                                                    root_uri=snapshot.root_uri, language=language,
+                                                    selectable_instances_map=options,
+                                                    restriction_cache=snapshot.restrictions())
+
+
+# Resposta já serializada, com ETag calculado na compilação
+class FormSchemaEntry:
+    __slots__ = ('payload', 'body', 'etag')
+
+    def __init__(self, payload, version):
+        self.payload = payload
+        self.body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.etag = f"{version[:16]}-{hashlib.sha1(self.body).hexdigest()[:16]}"
+
+    # Mesma resposta em outra versão da ontologia: reaproveita o JSON serializado e troca só o prefixo do ETag
+    def with_version(self, version):
+        entry = FormSchemaEntry.__new__(FormSchemaEntry)
+        entry.payload = self.payload
+        entry.body = self.body
+        entry.etag = f"{version[:16]}-{self.etag.rpartition('-')[2]}"
+        return entry
+
+
+# Esquemas de formulário de todas as classes da ontologia, em um idioma
+class FormBundle:
+    def __init__(self, snapshot, language, classes=None):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.language = language
+        self._subclasses = {}
+        self._details = {}
+        if classes is None:
+            classes = {
+                class_uri: {
+                    "subclasses": build_subclasses_payload(snapshot, class_uri, language),
+                    "details": build_details_payload(snapshot, class_uri, language),
+                }
+                for class_uri in bundle_classes(snapshot)
+            }
+        for class_uri, schema in classes.items():
+            self._subclasses[class_uri] = FormSchemaEntry(schema["subclasses"], self.version)
+            self._details[class_uri] = FormSchemaEntry(schema["details"], self.version)
+
+    # Pacote de uma nova versão a partir do pacote da versão anterior: recompila só as classes em affected e as
+    # que não existiam; as demais reaproveitam as respostas já serializadas
+    @classmethod
+    def updated(cls, snapshot, language, previous, affected):
+        bundle = cls(snapshot, language, classes={})
+        for class_uri in bundle_classes(snapshot):
+            if class_uri in affected or class_uri not in previous._details:
+                bundle._subclasses[class_uri] = FormSchemaEntry(
+                    build_subclasses_payload(snapshot, class_uri, language), bundle.version)
+                bundle._details[class_uri] = FormSchemaEntry(
+                    build_details_payload(snapshot, class_uri, language), bundle.version)
+            else:
+                bundle._subclasses[class_uri] = previous._subclasses[class_uri].with_version(bundle.version)
+                bundle._details[class_uri] = previous._details[class_uri].with_version(bundle.version)
+        return bundle
+
+    # Resposta de /get_subclasses para a classe (calculada na hora se a classe não está no pacote)
+    def subclasses(self, class_uri):
+        entry = self._subclasses.get(class_uri)
+        record_cache('form_bundle', entry is not None)
+        if entry is None:
+            with span('schema.build'):
+                entry = FormSchemaEntry(build_subclasses_payload(self.snapshot, class_uri, self.language), self.version)
+        return entry
+
+    # Resposta de /get_class_details para a classe (calculada na hora se a classe não está no pacote)
+    def details(self, class_uri):
+        entry = self._details.get(class_uri)
+        record_cache('form_bundle', entry is not None)
+        if entry is None:
+            with span('schema.build'):
+                entry = FormSchemaEntry(build_details_payload(self.snapshot, class_uri, self.language), self.version)
+        return entry
+
+    def to_dict(self):
+        return {
+            "version": self.version,
+            "language": self.language,
+            "classes": {
+                class_uri: {
+                    "subclasses": self._subclasses[class_uri].payload,
+                    "details": self._details[class_uri].payload,
+                }
+                for class_uri in sorted(self._subclasses)
+            },
+        }
+
+
+# Classes nomeadas que entram no pacote
+def bundle_classes(snapshot):
+    classes = {str(cls) for cls in snapshot.hierarchy().classes if isinstance(cls, URIRef)}
+    classes.update(str(cls) for cls in snapshot.graph.subjects(RDF.type, OWL.Class) if isinstance(cls, URIRef))
+    return sorted(classes)
+
+
+def bundle_file_name(language, ontology_path):
+    ontology_name = os.path.splitext(os.path.basename(ontology_path))[0]
+    return f'form_schemas.{ontology_name}.{language}.json'
+
+
+# Carrega o pacote do idioma: usa o arquivo pré-compilado se for da mesma versão da ontologia, senão compila
+def load_form_bundle(snapshot, language, bundle_dir=FORM_BUNDLE_DIR):
+    if bundle_dir:
+        path = os.path.join(bundle_dir, bundle_file_name(language, snapshot.path))
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == snapshot.version and data.get("language") == language:
+                return FormBundle(snapshot, language, data["classes"])
+    return FormBundle(snapshot, language)
+
+
+# Linha de comando: compila cada ontologia em um pacote JSON por idioma
+def main(argv=None):
+    from ontology_store import registry
+
+    parser = argparse.ArgumentParser(description='Compila as ontologias em esquemas de formulário por idioma.')
+    parser.add_argument('--ontology', action='append', choices=registry.names(),
+                        help='ontologia a compilar (padrão: todas)')
+    parser.add_argument('--output', required=True, help='diretório de saída dos pacotes')
+    parser.add_argument('--language', action='append', choices=op.SUPPORTED_LANGUAGES,
+                        help='idioma a compilar (padrão: todos)')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    for name in args.ontology or registry.names():
+        snapshot = registry.store(name).get()
+        for language in args.language or op.SUPPORTED_LANGUAGES:
+            start = time.perf_counter()
+            bundle = FormBundle(snapshot, language)
+            path = os.path.join(args.output, bundle_file_name(language, snapshot.path))
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(bundle.to_dict(), f, ensure_ascii=False)
+            print(f"{path}: {len(bundle._subclasses)} classes em {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,363 @@
+import argparse
+import datetime
+import json
+import math
+import re
+import sys
+import time
+
+from rdflib import XSD
+
+import o_parse_back_end as op
+from form_bundle import bundle_classes
+
+# Cardinalidades em que o formulário exige o campo, como no front-end (DynamicForm.js)
+REQUIRED_CARDINALITIES = ('some', 'only')
+
+_INTEGER = re.compile(r'[+-]?\d+')
+_DECIMAL = re.compile(r'[+-]?(\d+(\.\d*)?|\.\d+)')
+_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+_TIME = re.compile(r'\d{2}:\d{2}(:\d{2}(\.\d+)?)?')
+
+
+def _check_integer(value):
+    if not _INTEGER.fullmatch(value):
+        return 'must be an integer'
+
+
+def _check_non_negative_integer(value):
+    if not _INTEGER.fullmatch(value) or int(value) < 0:
+        return 'must be a non-negative integer'
+
+
+def _check_positive_integer(value):
+    if not _INTEGER.fullmatch(value) or int(value) <= 0:
+        return 'must be a positive integer'
+
+
+def _check_decimal(value):
+    if not _DECIMAL.fullmatch(value):
+        return 'must be a decimal number'
+
+
+def _check_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        return 'must be a number'
+    if math.isnan(number):
+        return 'must be a number'
+
+
+def _check_boolean(value):
+    if value not in ('true', 'false', '1', '0'):
+        return 'must be true or false'
+
+
+def _check_date(value):
+    try:
+        if _DATE.fullmatch(value):
+            datetime.date.fromisoformat(value)
+            return None
+    except ValueError:
+        pass
+    return 'must be a date (YYYY-MM-DD)'
+
+
+def _check_time(value):
+    try:
+        if _TIME.fullmatch(value):
+            datetime.time.fromisoformat(value)
+            return None
+    except ValueError:
+        pass
+    return 'must be a time (HH:MM or HH:MM:SS)'
+
+
+def _check_date_time(value):
+    try:
+        datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return 'must be a date and time (YYYY-MM-DDTHH:MM:SS)'
+
+
+# Verificação do texto de um valor por tipo de dados (os tipos ausentes, como xsd:string, aceitam qualquer texto)
+DATATYPE_CHECKS = {
+    str(XSD.integer): _check_integer,
+    str(XSD.int): _check_integer,
+    str(XSD.long): _check_integer,
+    str(XSD.short): _check_integer,
+    str(XSD.nonNegativeInteger): _check_non_negative_integer,
+    str(XSD.positiveInteger): _check_positive_integer,
+    str(XSD.decimal): _check_decimal,
+    str(XSD.float): _check_float,
+    str(XSD.double): _check_float,
+    str(XSD.boolean): _check_boolean,
+    str(XSD.date): _check_date,
+    str(XSD.time): _check_time,
+    str(XSD.dateTime): _check_date_time,
+}
+
+
+# Verificações das facetas de owl:withRestrictions (chaves como em parse_data_property_range: "xsd:maxLength")
+def _facet_checks(restrictions):
+    checks = []
+    for facet, limit in restrictions.items():
+        name = facet.rpartition(':')[2]
+        try:
+            if name == 'maxLength':
+                size = int(limit)
+                checks.append(lambda value, size=size: f'must have at most {size} characters' if len(value) > size else None)
+            elif name == 'minLength':
+                size = int(limit)
+                checks.append(lambda value, size=size: f'must have at least {size} characters' if len(value) < size else None)
+            elif name == 'length':
+                size = int(limit)
+                checks.append(lambda value, size=size: f'must have exactly {size} characters' if len(value) != size else None)
+            elif name == 'pattern':
+                pattern = re.compile(limit)
+                checks.append(lambda value, pattern=pattern: None if pattern.fullmatch(value) else f'must match {pattern.pattern}')
+            elif name in _BOUNDS:
+                checks.append(_bound_check(name, float(limit)))
+        except (ValueError, re.error):
+            # Faceta malformada na ontologia: ignorada, como o front-end faz
+            continue
+    return checks
+
+
+_BOUNDS = {
+    'minInclusive': (lambda number, limit: number >= limit, 'at least'),
+    'maxInclusive': (lambda number, limit: number <= limit, 'at most'),
+    'minExclusive': (lambda number, limit: number > limit, 'greater than'),
+    'maxExclusive': (lambda number, limit: number < limit, 'less than'),
+}
+
+
+def _bound_check(name, limit):
+    accepts, text = _BOUNDS[name]
+
+    def check(value):
+        try:
+            if accepts(float(value), limit):
+                return None
+        except ValueError:
+            pass
+        return f'must be {text} {limit:g}'
+    return check
+
+
+# Limites de quantidade de valores de uma cardinalidade ("some", "exactly 1", "min 2", "max 1"...): (mínimo, máximo)
+def cardinality_bounds(cardinality):
+    if cardinality in REQUIRED_CARDINALITIES:
+        return 1, None
+    kind, _, count = (cardinality or '').partition(' ')
+    if not count.isdigit():
+        return 0, None
+    count = int(count)
+    if kind == 'exactly':
+        return count, count
+    if kind == 'min':
+        return count, None
+    if kind == 'max':
+        return 0, count
+    return 0, None
+
+
+# Valores de um campo como textos (listas para campos de múltipla escolha); None se algum valor não for escalar
+def _field_values(value):
+    items = value if isinstance(value, list) else [value]
+    values = []
+    for item in items:
+        if item is None or item == '':
+            continue
+        if isinstance(item, bool):
+            values.append('true' if item else 'false')
+        elif isinstance(item, (str, int, float)):
+            values.append(str(item))
+        else:
+            return None
+    return values
+
+
+# Regras de um campo do formulário, compiladas a partir dos esquemas da classe nos dois idiomas.
+# As chaves do campo ("label da classe relacionada-URI da propriedade") mudam com o idioma do formulário.
+class FieldRule:
+    __slots__ = ('keys', 'min_count', 'max_count', 'checks', 'options')
+
+    def __init__(self):
+        self.keys = []
+        self.min_count = 0
+        self.max_count = None
+        self.checks = []
+        self.options = None
+
+    def add(self, key, field):
+        # Tipo de dados, facetas e opções são os mesmos nos dois idiomas: compilados na primeira vez
+        first = not self.keys
+        if key not in self.keys:
+            self.keys.append(key)
+        if field.get("status") != "em construção":
+            # Cardinalidades repetidas do mesmo campo se acumulam: vale o limite mais restrito
+            min_count, max_count = cardinality_bounds(field.get("cardinality"))
+            self.min_count = max(self.min_count, min_count)
+            if max_count is not None:
+                self.max_count = max_count if self.max_count is None else min(self.max_count, max_count)
+        if "options" in field:
+            # Opção escolhida pela URI do indivíduo ou pelo label em qualquer idioma (o front-end envia o label):
+            # valor aceito → URI do indivíduo
+            if self.options is None:
+                self.options = {}
+            for option in field["options"]:
+                self.options[option["uri"]] = option["uri"]
+                self.options.setdefault(option["label"], option["uri"])
+        elif first:
+            check = DATATYPE_CHECKS.get((field.get("dataType") or [None])[0])
+            if check is not None:
+                self.checks.append(check)
+            facets = {name: value for name, value in field.get("restrictions", {}).items() if name != 'type'}
+            self.checks.extend(_facet_checks(facets))
+
+    # Erros do campo para os valores enviados em data (lista vazia se o campo é válido)
+    def validate(self, data):
+        values = []
+        for key in self.keys:
+            if key in data:
+                value = data[key]
+                if type(value) is str:
+                    # Caso mais comum (campo de texto ou seleção única), sem passar por _field_values
+                    if value:
+                        values.append(value)
+                    continue
+                field_values = _field_values(value)
+                if field_values is None:
+                    return ['must be a string, a number, a boolean or a list of them']
+                values.extend(field_values)
+
+        errors = []
+        if len(values) < self.min_count:
+            errors.append('is required' if self.min_count == 1 else f'requires at least {self.min_count} values')
+        elif self.max_count is not None and len(values) > self.max_count:
+            errors.append(f'accepts at most {self.max_count} value' + ('s' if self.max_count != 1 else ''))
+        for value in values:
+            if self.options is not None:
+                if value not in self.options:
+                    errors.append(f'{value!r} is not one of the options')
+                continue
+            for check in self.checks:
+                message = check(value)
+                if message is not None:
+                    errors.append(message if len(values) == 1 else f'{value!r} {message}')
+        return errors
+
+
+# Validador de submissões de uma classe: as regras de todos os campos do formulário, compiladas uma vez
+class FormValidator:
+    def __init__(self, snapshot, class_uri):
+        self.class_uri = class_uri
+        self.hierarchy = snapshot.hierarchy()
+        rules = {}
+        for language in op.SUPPORTED_LANGUAGES:
+            for field in snapshot.form_bundle(language).details(class_uri).payload:
+                key = f'{field["relatedClass"]}-{field["property"]}'
+                identity = (field["property"], field["relatedClassUri"])
+                rules.setdefault(identity, FieldRule()).add(key, field)
+        self.rules = list(rules.values())
+        self._rules_by_key = {key: rule for rule in self.rules for key in rule.keys}
+
+    # Campo dinâmico do front-end para uma subclasse escolhida: "URI da subclasse-label"
+    def is_dynamic_key(self, key):
+        class_uris = self.hierarchy.class_uris
+        position = key.find('-')
+        while position != -1:
+            if key[:position] in class_uris:
+                return True
+            position = key.find('-', position + 1)
+        return False
+
+    # Opções de um campo de seleção: label (pt ou en) ou URI → URI do indivíduo (None se o campo não tem opções)
+    def options(self, key):
+        rule = self._rules_by_key.get(key)
+        return rule.options if rule is not None else None
+
+    # Erros por campo ({chave: [mensagens]}); vazio se a submissão é válida
+    def validate(self, data):
+        errors = {}
+        for rule in self.rules:
+            messages = rule.validate(data)
+            if messages:
+                # O erro é informado na chave enviada ou, se nenhuma foi enviada, na primeira (idioma padrão)
+                key = next((key for key in rule.keys if key in data), rule.keys[0])
+                errors[key] = messages
+        for key in data:
+            if key not in self._rules_by_key and not self.is_dynamic_key(key):
+                errors[key] = ['is not a field of this form']
+        return errors
+
+
+# Validadores de todas as classes de uma versão da ontologia (cada um compilado no primeiro uso)
+class FormValidators:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.classes = set(bundle_classes(snapshot))
+        self._validators = {}
+
+    # Validador da classe (None se a classe não tem formulário)
+    def get(self, class_uri):
+        validator = self._validators.get(class_uri)
+        if validator is None and class_uri in self.classes:
+            validator = self._validators[class_uri] = FormValidator(self.snapshot, class_uri)
+        return validator
+
+    # Valida submissões armazenadas; gera (submissão, erros) e conta os resultados em stats
+    def validate_all(self, submissions, stats=None):
+        stats = stats if stats is not None else {}
+        for submission in submissions:
+            stats['checked'] = stats.get('checked', 0) + 1
+            validator = self.get(submission.get("class"))
+            if validator is None:
+                stats['unchecked'] = stats.get('unchecked', 0) + 1
+                continue
+            if isinstance(submission["data"], dict):
+                errors = validator.validate(submission["data"])
+            else:
+                errors = {'': ['form data must be a JSON object']}
+            if errors:
+                stats['invalid'] = stats.get('invalid', 0) + 1
+            yield submission, errors
+
+
+# Linha de comando: valida as submissões armazenadas e lista as inválidas (uma linha JSON por submissão)
+def main(argv=None):
+    from ontology_store import registry
+    from submission_store import SubmissionStore, DEFAULT_SUBMISSIONS_PATH
+
+    parser = argparse.ArgumentParser(description='Valida as submissões armazenadas contra os formulários da ontologia.')
+    parser.add_argument('--db', default=DEFAULT_SUBMISSIONS_PATH, help='arquivo SQLite das submissões')
+    parser.add_argument('--class', dest='class_uri', help='valida só as submissões desta classe')
+    parser.add_argument('--ontology', choices=registry.names(), help='ontologia dos formulários (padrão: a padrão do servidor)')
+    parser.add_argument('--output', help='arquivo com as submissões inválidas (padrão: saída padrão)')
+    args = parser.parse_args(argv)
+
+    validators = registry.store(args.ontology).get().validators()
+    submissions = SubmissionStore(args.db).iter_all(args.class_uri)
+    stats = {}
+    start = time.perf_counter()
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for submission, errors in validators.validate_all(submissions, stats):
+            if errors:
+                out.write(json.dumps({"id": submission["id"], "class": submission["class"], "errors": errors},
+                                     ensure_ascii=False) + '\n')
+    finally:
+        if args.output:
+            out.close()
+    elapsed = time.perf_counter() - start
+    checked = stats.get('checked', 0)
+    print(f"{checked} submissões em {elapsed:.2f}s ({checked / elapsed if elapsed else 0:.0f}/s): "
+          f"{stats.get('invalid', 0)} inválidas, {stats.get('unchecked', 0)} sem formulário conhecido",
+          file=sys.stderr)
+    return 1 if stats.get('invalid') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
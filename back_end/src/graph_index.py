@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from rdflib import OWL, RDF, RDFS
+
+import o_parse_back_end as op
+
+# Predicados consultados pelo parser; os triplos deles são indexados em dicionários simples
+INDEXED_PREDICATES = frozenset([
+    RDF.type, RDF.first, RDF.rest,
+    RDFS.subClassOf, RDFS.label, RDFS.comment, RDFS.domain, RDFS.range, op.DEFINITION_URI,
+    OWL.onProperty, OWL.onClass, OWL.someValuesFrom, OWL.allValuesFrom,
+    OWL.minQualifiedCardinality, OWL.minCardinality, OWL.maxQualifiedCardinality, OWL.maxCardinality,
+    OWL.qualifiedCardinality, OWL.cardinality,
+    OWL.intersectionOf, OWL.unionOf, OWL.withRestrictions,
+])
+
+# Predicados cujo objeto é o início de uma lista RDF (achatada na compilação)
+LIST_PREDICATES = (OWL.intersectionOf, OWL.unionOf, OWL.withRestrictions)
+
+
+# Grafo compilado para as consultas do parser: consultas ao grafo do rdflib montam de uma vez, para cada predicado
+# indexado, as tabelas sujeito → objetos e objeto → sujeitos, e as listas RDF já ficam achatadas.
+# Responde value/objects/subjects/triples/"in" como o rdflib e na mesma ordem (a de inserção dos triplos);
+# consultas sobre outros predicados e os demais métodos são repassados ao grafo original.
+class IndexedGraph:
+    def __init__(self, graph, predicates=INDEXED_PREDICATES):
+        self.graph = graph
+        self.predicates = frozenset(predicates)
+        # Só a API pública do rdflib: uma consulta por predicado monta a tabela objeto → sujeitos (na ordem de
+        # graph.subjects) e uma consulta por sujeito encontrado monta as tabelas sujeito → objetos (na ordem de
+        # graph.objects). A iteração de todos os triplos não serve: o store em memória a responde a partir de
+        # um conjunto, sem ordem definida.
+        self._objects = {predicate: {} for predicate in self.predicates}
+        self._subjects = {}
+        for predicate in self.predicates:
+            by_object = self._subjects[predicate] = {}
+            for s, o in graph.subject_objects(predicate):
+                if o in by_object:
+                    by_object[o].append(s)
+                else:
+                    by_object[o] = [s]
+        subjects = dict.fromkeys(s for by_object in self._subjects.values() for ss in by_object.values() for s in ss)
+        for s in subjects:
+            for _, p, o in graph.triples((s, None, None)):
+                by_subject = self._objects.get(p)
+                if by_subject is not None:
+                    if s in by_subject:
+                        by_subject[s].append(o)
+                    else:
+                        by_subject[s] = [o]
+
+        # Listas RDF achatadas por op.process_collection (que passa a consultá-las)
+        self.flattened_lists = {}
+        for predicate in LIST_PREDICATES:
+            for head in self._subjects[predicate]:
+                self.flattened_lists[head] = tuple(op.process_collection(self, head))
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+    def __len__(self):
+        return len(self.graph)
+
+    def __iter__(self):
+        return iter(self.graph)
+
+    def __contains__(self, triple):
+        s, p, o = triple
+        if s is not None and p in self.predicates:
+            objects = self._objects[p].get(s)
+            if not objects:
+                return False
+            return o is None or o in objects
+        return triple in self.graph
+
+    def value(self, subject=None, predicate=RDF.value, object=None, default=None, any=True):
+        if subject is not None and object is None and predicate in self.predicates and any:
+            objects = self._objects[predicate].get(subject)
+            return objects[0] if objects else default
+        return self.graph.value(subject, predicate, object, default, any)
+
+    def objects(self, subject=None, predicate=None, unique=False):
+        if subject is not None and predicate in self.predicates:
+            objects = self._objects[predicate].get(subject, ())
+            return iter(dict.fromkeys(objects) if unique else objects)
+        return self.graph.objects(subject, predicate, unique)
+
+    def subjects(self, predicate=None, object=None, unique=False):
+        if predicate in self.predicates:
+            by_object = self._subjects[predicate]
+            if object is not None:
+                subjects = by_object.get(object, ())
+            else:
+                subjects = [s for subjects in by_object.values() for s in subjects]
+            return iter(dict.fromkeys(subjects) if unique else subjects)
+        return self.graph.subjects(predicate, object, unique)
+
+    def triples(self, triple):
+        s, p, o = triple
+        if s is not None and p in self.predicates:
+            return iter([(s, p, obj) for obj in self._objects[p].get(s, ()) if o is None or obj == o])
+        return self.graph.triples(triple)
+
+
+# Resultados derivados de um snapshot, serializados na ordem em que são produzidos
+def _derived_outputs(snapshot):
+    from form_bundle import FormBundle
+    import prompt as pr
+
+    hierarchy = snapshot.hierarchy()
+    classes = sorted(str(cls) for cls in hierarchy.classes)
+    outputs = {
+        'hierarchy': [(str(cls), [str(o) for o in hierarchy.superclasses_of(cls)], [str(c) for c in hierarchy.children_of(cls)])
+                      for cls in classes],
+        'data_properties': snapshot.data_properties(),
+    }
+    for language in op.SUPPORTED_LANGUAGES:
+        labels, labels_to_uris, descriptions = snapshot.labels(language)
+        outputs[f'labels.{language}'] = (labels, labels_to_uris, descriptions)
+        outputs[f'options.{language}'] = snapshot.options(language).options_by_class
+        outputs[f'form_bundle.{language}'] = FormBundle(snapshot, language).to_dict()
+        outputs[f'list_subclasses.{language}'] = [
+            op.list_subclasses(snapshot.graph, cls, labels, snapshot.data_properties(), hierarchy, snapshot.restrictions())
+            for cls in classes
+        ]
+        outputs[f'class_tree.{language}'] = pr.build_class_tree(snapshot.graph, op.ROOT_CLASS_URI, labels,
+                                                                descriptions, hierarchy)
+    return {name: json.dumps(value, default=str, ensure_ascii=False) for name, value in outputs.items()}
+
+
+# Compara todos os resultados do parser com o grafo do rdflib e com o grafo compilado; retorna as diferenças
+def check_parity(path):
+    from ontology_store import OntologySnapshot
+
+    graph = op.load_ontology(path)
+    timings = {}
+    results = {}
+    for name, compile_graph in (('rdflib', lambda g: g), ('indexed', IndexedGraph)):
+        start = time.perf_counter()
+        snapshot = OntologySnapshot(compile_graph(graph), path, 'parity', os.path.getmtime(path))
+        results[name] = _derived_outputs(snapshot)
+        timings[name] = time.perf_counter() - start
+    differences = [output for output in results['rdflib'] if results['rdflib'][output] != results['indexed'][output]]
+    return differences, results['rdflib'].keys(), timings
+
+
+# Linha de comando: verifica que o grafo compilado produz exatamente as mesmas respostas que o rdflib
+def main(argv=None):
+    from ontology_store import DEFAULT_ONTOLOGY_PATH
+
+    parser = argparse.ArgumentParser(description='Verifica a paridade entre o grafo compilado e o rdflib.')
+    parser.add_argument('ontologies', nargs='*', default=[DEFAULT_ONTOLOGY_PATH], help='arquivos OWL')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in args.ontologies:
+        differences, outputs, timings = check_parity(path)
+        status = 'OK' if not differences else 'DIFERENTE: ' + ', '.join(differences)
+        print(f"{path}: {len(outputs)} resultados, {status} "
+              f"(rdflib {timings['rdflib']:.2f}s, compilado {timings['indexed']:.2f}s)")
+        failed = failed or bool(differences)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+import multiprocessing
+import os
+
+# Configuração de produção do gunicorn: gunicorn -c gunicorn.conf.py wsgi:application
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+
+# Carrega o app (e a ontologia, em wsgi.py) no processo mestre antes do fork
+preload_app = True
+
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# Threads por worker: as requisições de leitura não disputam o GIL por muito tempo (respostas pré-serializadas)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Reinicia workers periodicamente para limitar o crescimento de memória dos caches por processo
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = max_requests // 10
+
+timeout = 30
+keepalive = 5
+accesslog = None  # o app já registra cada requisição (logger aui.requests)
+
+
+# As gravações de /save_form_data são feitas em segundo plano: antes de o worker sair (reciclagem por
+# max_requests ou SIGTERM), grava as submissões que ainda estão na fila
+def worker_exit(server, worker):
+    from app import submissions
+    submissions.flush()
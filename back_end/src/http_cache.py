@@ -0,0 +1,95 @@
+import gzip
+import os
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+from instrumentation import record_cache, span
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele as respostas usam apenas gzip
+    brotli = None
+
+# Cabeçalho Cache-Control das respostas da ontologia (padrão: o cliente sempre revalida com o ETag)
+CACHE_CONTROL = os.environ.get('CACHE_CONTROL', 'public, no-cache')
+
+# Corpos menores que isso não compensam a compressão
+MIN_COMPRESS_SIZE = 512
+
+# Quantidade máxima de corpos comprimidos mantidos em memória
+MAX_COMPRESSED_ENTRIES = 2048
+
+_compressed = OrderedDict()
+_compressed_lock = threading.Lock()
+
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+# Retorna o corpo comprimido, reaproveitando o resultado para o mesmo ETag
+def compressed_body(body, etag, encoding):
+    key = (etag, encoding)
+    with _compressed_lock:
+        if key in _compressed:
+            _compressed.move_to_end(key)
+            record_cache('compressed', True)
+            return _compressed[key]
+    record_cache('compressed', False)
+    with span('compress'):
+        data = _compress(body, encoding)
+    with _compressed_lock:
+        _compressed[key] = data
+        while len(_compressed) > MAX_COMPRESSED_ENTRIES:
+            _compressed.popitem(last=False)
+    return data
+
+
+# Escolhe a codificação aceita pelo cliente (brotli se disponível, depois gzip)
+def negotiate_encoding(body):
+    if len(body) < MIN_COMPRESS_SIZE:
+        return None
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+# Resposta com ETag forte, Cache-Control, GET condicional (If-None-Match → 304) e compressão
+def cached_response(body, etag, content_type='application/json; charset=utf-8', vary=()):
+    encoding = negotiate_encoding(body)
+    if encoding:
+        # Cada codificação é uma representação diferente e precisa de um ETag forte próprio
+        etag = f"{etag}-{encoding}"
+        body = compressed_body(body, etag, encoding)
+
+    response = Response(body, content_type=content_type)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    response.vary.update(vary)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response.make_conditional(request)
+
+
+# Resposta comprimida sem ETag nem Cache-Control, para POSTs (que não são reaproveitados por caches nem
+# revalidados com If-None-Match); o corpo é comprimido a cada chamada, sem passar pelo cache de corpos
+def compressed_response(body, content_type='application/json; charset=utf-8', vary=()):
+    encoding = negotiate_encoding(body)
+    if encoding:
+        with span('compress'):
+            body = _compress(body, encoding)
+
+    response = Response(body, content_type=content_type)
+    response.vary.add('Accept-Encoding')
+    response.vary.update(vary)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
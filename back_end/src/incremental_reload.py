@@ -0,0 +1,292 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from rdflib import RDF, BNode, Literal, URIRef
+
+import o_parse_back_end as op
+from form_bundle import FormBundle, bundle_classes
+
+# Recarga incremental ligada por padrão (INCREMENTAL_RELOAD=0 recompila tudo a cada mudança do arquivo)
+INCREMENTAL_RELOAD = os.environ.get('INCREMENTAL_RELOAD', '1') != '0'
+
+# Tamanho mínimo do grafo (em triplos) para a recarga incremental. Abaixo disso, comparar as duas versões custa
+# mais do que recompilar tudo: no Onto_aldeias.owl (5 mil triplos) a incremental leva 0,3 s e a completa 0,15 s;
+# a incremental passa a compensar entre 25 mil e 75 mil triplos (ontologias sintéticas de 1 a 3 mil classes).
+INCREMENTAL_MIN_TRIPLES = int(os.environ.get('INCREMENTAL_MIN_TRIPLES', '50000'))
+
+# Acima desta fração de classes afetadas, os formulários são recompilados por inteiro (sem reaproveitamento)
+MAX_AFFECTED_FRACTION = float(os.environ.get('INCREMENTAL_MAX_AFFECTED', '0.5'))
+
+
+# Todos os triplos do grafo com os termos trocados por chaves simples (URIs como texto, BNodes como "_:id",
+# literais como tupla): a comparação de termos do rdflib é feita em Python e dominaria o tempo da diferença.
+def _plain_triples(graph):
+    keys = {}
+    for s, p, o in getattr(graph, 'graph', graph).triples((None, None, None)):
+        yield (keys.get(s) or keys.setdefault(s, _plain(s)), keys.get(p) or keys.setdefault(p, _plain(p)),
+               keys.get(o) or keys.setdefault(o, _plain(o)))
+
+
+def _plain(term):
+    if isinstance(term, BNode):
+        return '_:' + str(term)
+    if isinstance(term, Literal):
+        return ('"', str(term), term.language, str(term.datatype) if term.datatype else None)
+    return str(term)
+
+
+def _is_bnode(key):
+    return type(key) is str and key.startswith('_:')
+
+
+# Assinatura estrutural de cada BNode: hash dos seus predicados e objetos, com os BNodes aninhados trocados pelas
+# suas assinaturas. Os identificadores dos BNodes mudam a cada parse; as assinaturas só mudam se o conteúdo mudar.
+def bnode_signatures(triples):
+    outgoing = {}
+    for s, p, o in triples:
+        if _is_bnode(s):
+            outgoing.setdefault(s, []).append((p, o))
+
+    signatures = {}
+    in_progress = set()
+    for root in outgoing:
+        # Pós-ordem iterativa (listas RDF longas estourariam a recursão)
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in signatures:
+                continue
+            if expanded:
+                # BNode em um ciclo de BNodes: recebe uma assinatura fixa
+                parts = sorted((p, signatures.get(o, '_:ciclo') if _is_bnode(o) else o)
+                               for p, o in outgoing.get(node, ()))
+                signatures[node] = '_:' + hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+                in_progress.discard(node)
+                continue
+            in_progress.add(node)
+            stack.append((node, True))
+            for p, o in outgoing.get(node, ()):
+                if _is_bnode(o) and o not in signatures and o not in in_progress:
+                    stack.append((o, False))
+    return signatures
+
+
+# Triplos com os BNodes trocados pelas assinaturas estruturais
+def canonical_triples(triples, signatures):
+    return {(signatures.get(s, s), p, signatures.get(o, o) if type(o) is str else o) for s, p, o in triples}
+
+
+# Entidades nomeadas que contêm cada BNode (subindo pelos triplos até um sujeito com URI), por assinatura
+def _bnode_owners(triples, signatures):
+    parents = {}
+    for s, p, o in triples:
+        if _is_bnode(o):
+            parents.setdefault(o, []).append(s)
+    owners = {}
+    for node, signature in signatures.items():
+        found = owners.setdefault(signature, set())
+        stack, seen = [node], {node}
+        while stack:
+            for parent in parents.get(stack.pop(), ()):
+                if not _is_bnode(parent):
+                    found.add(URIRef(parent))
+                elif parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+    return owners
+
+
+# Diferença entre duas versões da ontologia: (triplos removidos, triplos adicionados, entidades nomeadas alteradas).
+# Uma entidade é alterada se aparece em um triplo que mudou ou contém um BNode que mudou; os tipos (rdf:type)
+# de cada entidade alterada também entram, para que as listas de opções das classes dos indivíduos sejam refeitas.
+def diff_graphs(old_graph, new_graph):
+    versions = []
+    for graph in (old_graph, new_graph):
+        triples = list(_plain_triples(graph))
+        signatures = bnode_signatures(triples)
+        versions.append((graph, triples, signatures, canonical_triples(triples, signatures)))
+    removed = versions[0][3] - versions[1][3]
+    added = versions[1][3] - versions[0][3]
+
+    changed = set()
+    for difference, (graph, triples, signatures, canonical) in ((removed, versions[0]), (added, versions[1])):
+        owners = None
+        for s, p, o in difference:
+            for term in (s, o):
+                if type(term) is not str:
+                    continue
+                if _is_bnode(term):
+                    if owners is None:
+                        owners = _bnode_owners(triples, signatures)
+                    changed.update(owners.get(term, ()))
+                else:
+                    changed.add(URIRef(term))
+    for graph in (old_graph, new_graph):
+        for entity in list(changed):
+            changed.update(o for o in graph.objects(entity, RDF.type) if isinstance(o, URIRef))
+    return removed, added, changed
+
+
+# URIs nomeadas dentro de uma classe decodificada (URIs, listas e restrições aninhadas)
+def _named(decoded):
+    if isinstance(decoded, URIRef):
+        yield decoded
+    elif isinstance(decoded, (tuple, list)):
+        for part in decoded:
+            yield from _named(part)
+
+
+# Classes cujos esquemas de formulário (/get_subclasses e /get_class_details) dependem de alguma entidade alterada.
+# O esquema de uma classe depende dela mesma e das subclasses diretas, das superclasses e das suas restrições
+# (propriedades e classes relacionadas) e, de cada classe relacionada, das superclasses e das data properties
+# herdadas. A busca parte das entidades alteradas: cada classe da hierarquia é examinada uma vez.
+def affected_classes(snapshot, classes, changed):
+    hierarchy = snapshot.hierarchy()
+    restrictions = snapshot.restrictions()
+    data_properties = snapshot.data_properties()
+    # O parser volta do label da classe relacionada para a URI por labels_to_uris, que pode apontar outra entidade
+    label_maps = [snapshot.labels(language)[:2] for language in op.SUPPORTED_LANGUAGES]
+
+    related_cache = {}
+
+    def related_changed(cls):
+        result = related_cache.get(cls)
+        if result is None:
+            result = related_cache[cls] = (
+                cls in changed or not changed.isdisjoint(hierarchy.ancestors.get(cls, ()))
+                or any(property_uri in changed for property_uri, restriction in data_properties.get(str(cls), ())))
+        return result
+
+    local_cache = {}
+
+    def local_changed(cls):
+        result = local_cache.get(cls)
+        if result is None:
+            result = cls in changed
+            for expression in hierarchy.superclasses_of(cls) if not result else ():
+                if not isinstance(expression, (BNode, URIRef)):
+                    continue
+                for record in restrictions.expand(expression):
+                    if record.on_property in changed:
+                        result = True
+                    for target in _named(record.targets):
+                        if related_changed(target) or any(
+                                related_changed(labels_to_uris[labels[target]])
+                                for labels, labels_to_uris in label_maps if labels.get(target) in labels_to_uris):
+                            result = True
+            local_cache[cls] = result
+        return result
+
+    affected = set()
+    for class_uri in classes:
+        cls = URIRef(class_uri)
+        if (local_changed(cls) or not changed.isdisjoint(hierarchy.children_of(cls))
+                or any(local_changed(ancestor) for ancestor in hierarchy.ancestors.get(cls, ()))):
+            affected.add(class_uri)
+    return affected
+
+
+# Prepara o novo snapshot a partir do anterior: relê só os labels e definições das entidades alteradas,
+# refaz só as listas de opções e os esquemas de formulário das classes afetadas e reaproveita o resto.
+# Os índices ficam prontos antes de o snapshot ser publicado, então requisições em andamento continuam
+# com a versão anterior inteira. Retorna um resumo da recarga.
+def apply_incremental(previous, snapshot):
+    from ontology_store import SelectOptions
+
+    start = time.perf_counter()
+    removed, added, changed = diff_graphs(previous.graph, snapshot.graph)
+    stats = {"mode": "incremental", "removed_triples": len(removed), "added_triples": len(added)}
+
+    if previous.built('labels'):
+        old_labels = previous.index('labels', None)
+        new_labels = snapshot.index('labels', lambda s: op.build_label_index(s.graph, previous=old_labels,
+                                                                             changed=changed))
+        # Um label que passou a apontar outra entidade em labels_to_uris muda os esquemas que o usam
+        for language in op.SUPPORTED_LANGUAGES:
+            old_map, new_map = old_labels[language][1], new_labels[language][1]
+            for label in old_map.keys() | new_map.keys():
+                if old_map.get(label) != new_map.get(label):
+                    changed.update(uri for uri in (old_map.get(label), new_map.get(label)) if isinstance(uri, URIRef))
+    stats["changed_entities"] = len(changed)
+
+    selectable = op.get_selectable_classes(snapshot.graph)
+    for language in op.SUPPORTED_LANGUAGES:
+        if previous.built(('options', language)):
+            old_options = previous.options(language).options_by_class
+            options = {}
+            for cls in selectable:
+                if cls in changed or str(cls) not in old_options:
+                    options[str(cls)] = op.build_selectable_options(snapshot.graph, cls, language)
+                else:
+                    options[str(cls)] = old_options[str(cls)]
+            snapshot.index(('options', language), lambda s, options=options: SelectOptions(options))
+
+    languages = [language for language in op.SUPPORTED_LANGUAGES if previous.built(('form_bundle', language))]
+    classes = bundle_classes(snapshot)
+    if languages:
+        old_classes = set(previous.form_bundle(languages[0])._details)
+        # Basta procurar na nova versão: as duas pontas de um triplo removido ficam em changed, então uma
+        # dependência que deixou de existir passa por uma entidade alterada que a classe ainda alcança
+        affected = affected_classes(snapshot, classes, changed)
+        affected.update(cls for cls in classes if cls not in old_classes)
+        stats["affected_classes"] = len(affected & set(classes))
+        if len(affected) > MAX_AFFECTED_FRACTION * max(len(classes), 1):
+            stats["mode"] = "full"
+        else:
+            for language in languages:
+                snapshot.index(('form_bundle', language), lambda s, language=language:
+                               FormBundle.updated(s, language, previous.form_bundle(language), affected))
+            stats["reused_classes"] = len(classes) - stats["affected_classes"]
+    stats["seconds"] = round(time.perf_counter() - start, 4)
+    return stats
+
+
+# Resultados comparados na verificação: labels, opções e esquemas de formulário dos dois idiomas
+def _outputs(snapshot):
+    outputs = {}
+    for language in op.SUPPORTED_LANGUAGES:
+        labels, labels_to_uris, descriptions = snapshot.labels(language)
+        outputs[f'labels.{language}'] = [list(labels.items()), list(labels_to_uris.items()), list(descriptions.items())]
+        outputs[f'options.{language}'] = snapshot.options(language).options_by_class
+        outputs[f'form_bundle.{language}'] = snapshot.form_bundle(language).to_dict()["classes"]
+    return {name: json.dumps(value, default=str, ensure_ascii=False, sort_keys=True) for name, value in outputs.items()}
+
+
+# Linha de comando: recarrega incrementalmente de uma versão da ontologia para outra e compara com a
+# compilação completa da nova versão
+def main(argv=None):
+    from ontology_store import OntologySnapshot
+    from graph_index import IndexedGraph
+
+    parser = argparse.ArgumentParser(description='Verifica a recarga incremental entre duas versões da ontologia.')
+    parser.add_argument('old', help='arquivo OWL da versão anterior')
+    parser.add_argument('new', help='arquivo OWL da nova versão')
+    args = parser.parse_args(argv)
+
+    previous = OntologySnapshot(IndexedGraph(op.load_ontology(args.old)), args.old, 'anterior', 0).warm()
+    graph = IndexedGraph(op.load_ontology(args.new))
+
+    start = time.perf_counter()
+    incremental = OntologySnapshot(graph, args.new, 'nova', 0)
+    stats = apply_incremental(previous, incremental)
+    incremental.warm()
+    incremental_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full = OntologySnapshot(graph, args.new, 'nova', 0).warm()
+    full_seconds = time.perf_counter() - start
+
+    expected, actual = _outputs(full), _outputs(incremental)
+    differences = [name for name in expected if expected[name] != actual[name]]
+    print(json.dumps(stats, ensure_ascii=False))
+    print(f"incremental {incremental_seconds:.3f}s, completa {full_seconds:.3f}s: "
+          + ('OK' if not differences else 'DIFERENTE: ' + ', '.join(differences)))
+    return 1 if differences else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
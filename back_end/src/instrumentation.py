@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+
+# Logger dos registros estruturados (uma linha JSON por requisição)
+logger = logging.getLogger('aui.requests')
+
+# Nível dos logs estruturados (variável de ambiente LOG_LEVEL)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for position, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[position] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+_LABEL_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+
+def _labels_text(labels):
+    if not labels:
+        return ''
+    escaped = (f'{name}="{str(value).translate(_LABEL_ESCAPES)}"' for name, value in labels)
+    return '{' + ','.join(escaped) + '}'
+
+
+# Contadores e histogramas do processo, exportados no formato texto do Prometheus.
+# Cada processo (worker) tem os seus; o Prometheus soma as séries de todos.
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def inc(self, name, labels=(), amount=1):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, labels=()):
+        key = (name, tuple(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    # Proporção de acertos de cada cache: hits / (hits + misses)
+    def cache_hit_ratios(self):
+        totals = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                if name == 'cache_requests_total':
+                    labels = dict(labels)
+                    hits, lookups = totals.get(labels['cache'], (0, 0))
+                    totals[labels['cache']] = (hits + (value if labels['result'] == 'hit' else 0), lookups + value)
+        return {cache: hits / lookups for cache, (hits, lookups) in totals.items() if lookups}
+
+    def render(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, (list(h.counts), h.total, h.count)) for key, h in self._histograms.items())
+
+        described = set()
+
+        def header(name):
+            if name not in described and name in self._help:
+                kind, text = self._help[name]
+                lines.append(f'# HELP {name} {text}')
+                lines.append(f'# TYPE {name} {kind}')
+            described.add(name)
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append(f'{name}{_labels_text(labels)} {value}')
+        for (name, labels), (counts, total, count) in histograms:
+            header(name)
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_labels_text(labels + (("le", repr(bound)),))} {cumulative}')
+            lines.append(f'{name}_bucket{_labels_text(labels + (("le", "+Inf"),))} {count}')
+            lines.append(f'{name}_sum{_labels_text(labels)} {total}')
+            lines.append(f'{name}_count{_labels_text(labels)} {count}')
+
+        header('cache_hit_ratio')
+        for cache, ratio in sorted(self.cache_hit_ratios().items()):
+            lines.append(f'cache_hit_ratio{_labels_text((("cache", cache),))} {ratio}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+metrics.describe('http_requests_total', 'counter', 'Requisições atendidas, por endpoint, método e status.')
+metrics.describe('http_request_duration_seconds', 'histogram', 'Latência das requisições, por endpoint.')
+metrics.describe('phase_duration_seconds', 'histogram', 'Duração das fases (spans) do processamento.')
+metrics.describe('cache_requests_total', 'counter', 'Consultas aos caches, por cache e resultado (hit/miss).')
+metrics.describe('cache_hit_ratio', 'gauge', 'Proporção de acertos de cada cache desde o início do processo.')
+
+
+# Registra uma consulta a um cache (index, form_bundle, compressed, search, etag)
+def record_cache(cache, hit):
+    metrics.inc('cache_requests_total', (('cache', cache), ('result', 'hit' if hit else 'miss')))
+
+
+# Mede a duração de uma fase; dentro de uma requisição ela também entra no cabeçalho Server-Timing
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe('phase_duration_seconds', elapsed, (('phase', name),))
+        if has_request_context():
+            spans = g.setdefault('spans', [])
+            spans.append((name, elapsed))
+
+
+def _server_timing(spans, total):
+    parts = [f'{name};dur={elapsed * 1000:.3f}' for name, elapsed in spans]
+    parts.append(f'total;dur={total * 1000:.3f}')
+    return ', '.join(parts)
+
+
+def _before_request():
+    g.request_start = time.perf_counter()
+    g.spans = []
+
+
+def _after_request(response):
+    total = time.perf_counter() - g.get('request_start', time.perf_counter())
+    spans = g.get('spans', [])
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+    response.headers['Server-Timing'] = _server_timing(spans, total)
+    metrics.inc('http_requests_total', (('endpoint', endpoint), ('method', request.method),
+                                        ('status', str(response.status_code))))
+    metrics.observe('http_request_duration_seconds', total, (('endpoint', endpoint),))
+    if response.headers.get('ETag'):
+        record_cache('etag', response.status_code == 304)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            'event': 'request',
+            'method': request.method,
+            'endpoint': endpoint,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 3),
+            'spans': {name: round(elapsed * 1000, 3) for name, elapsed in spans},
+            'language': g.get('language'),
+            'bytes': response.calculate_content_length(),
+        }, ensure_ascii=False))
+    return response
+
+
+def metrics_response():
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Liga a instrumentação ao app: tempos por requisição, Server-Timing, logs estruturados e /metrics
+def init_app(app):
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(LOG_LEVEL)
+        logger.propagate = False
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_response, methods=['GET'])
@@ -1,14 +1,29 @@
+import os
+
 from flask import json
 from rdflib import BNode, Graph, URIRef, RDFS, OWL, RDF
 
-# Variável global de idioma (inicializando como 'pt' para Português)
-LANGUAGE = 'pt'
+from class_hierarchy import ClassHierarchy
+from ontology_snapshot import file_sha256, read_snapshot
 
 # URI da propriedade "é select"
 SELECT_DP_URI = URIRef("http://www.semanticweb.org/ontologias/SESAI/ontoAldeias_00000613")
 
-# Carregar a ontologia OWL
-def load_ontology(file_path):
+# URI da anotação de definição (obo:IAO_0000115)
+DEFINITION_URI = URIRef("http://purl.obolibrary.org/obo/IAO_0000115")
+
+# Classe raiz dos formulários: a herança de restrições para nela (configurável por variável de ambiente)
+ROOT_CLASS_URI = os.environ.get('ONTOLOGY_ROOT_URI', 'http://www.semanticweb.org/ontologias/SESAI/ontoAldeias_00000557')
+
+# Idiomas atendidos pelos formulários
+SUPPORTED_LANGUAGES = ('pt', 'en')
+
+# Carregar a ontologia OWL (do snapshot compacto, se existir e estiver atualizado)
+def load_ontology(file_path, snapshot_path=None, version=None):
+    if snapshot_path:
+        g = read_snapshot(snapshot_path, version or file_sha256(file_path))
+        if g is not None:
+            return g
     g = Graph()
     g.parse(file_path, format='xml')
     return g
@@ -18,53 +33,66 @@ def get_selectable_classes(g):
     return set(g.objects(SELECT_DP_URI, RDFS.domain))
 # No topo do arquivo (logo após os imports)
 def get_label(g, entity, language='pt'):
-    for label in g.objects(entity, RDFS.label):
+    return pick_label(list(g.objects(entity, RDFS.label)), entity, language)
+
+# Escolhe, entre os labels já lidos de uma entidade, o do idioma pedido (ou o primeiro disponível)
+def pick_label(entity_labels, entity, language='pt'):
+    for label in entity_labels:
         if label.language and label.language.startswith(language):
             return str(label)
-    for label in g.objects(entity, RDFS.label):
+    for label in entity_labels:
         return str(label)
     return str(entity)
 
+# Pegar definição (annotation obo:IAO_0000115 ou rdfs:comment)
+def get_definition(g, entity):
+    for defn in g.objects(entity, DEFINITION_URI):
+        return str(defn)
+    for comment in g.objects(entity, RDFS.comment):
+        return str(comment)
+    return None
+
 # Extrair labels de classes e propriedades com preferência para o idioma definido
 def extract_labels(g, language='pt'):
-    labels = {}
-    labels_to_uris = {}
-    descriptions = {}
-    
-    # Função para pegar definição (annotation obo:IAO_0000115 ou rdfs:comment)
-    def get_definition(entity):
-        for defn in g.objects(entity, URIRef("http://purl.obolibrary.org/obo/IAO_0000115")):
-            return str(defn)
-        for comment in g.objects(entity, RDFS.comment):
-            return str(comment)
-        return None
+    return build_label_index(g, (language,))[language]
+
+# Construir, em uma única varredura do grafo, labels e definições de todos os idiomas pedidos.
+# Retorna {idioma: (labels, labels_to_uris, descriptions)}, no mesmo formato de extract_labels.
+# Com previous (o índice de uma versão anterior), só as entidades em changed (e as anônimas, cujos
+# identificadores mudam a cada parse) têm labels e definições relidos; as demais reaproveitam os de previous,
+# e o resultado é igual ao de uma varredura completa.
+def build_label_index(g, languages=SUPPORTED_LANGUAGES, previous=None, changed=frozenset()):
+    index = {language: ({}, {}, {}) for language in languages}
 
     # Iterar sobre classes, propriedades de objeto e propriedades de dados para extrair labels
-    for entity in g.subjects(RDF.type, OWL.Class):
-        label = get_label(g, entity, language)
-        definition = get_definition(entity)
-        if label:
-            labels[entity] = label
-            labels_to_uris[label] = entity
-            if definition:
-                descriptions[str(entity)] = definition
-
-    for entity in g.subjects(RDF.type, OWL.ObjectProperty):
-        label = get_label(g, entity, language)
-        if label:
-            labels[entity] = label
-            labels_to_uris[label] = entity
-
-    for entity in g.subjects(RDF.type, OWL.DatatypeProperty):
-        label = get_label(g, entity, language)
-        if label:
-            labels[entity] = label
-            labels_to_uris[label] = entity
-    
-    return labels, labels_to_uris, descriptions
+    for entity_type in (OWL.Class, OWL.ObjectProperty, OWL.DatatypeProperty):
+        for entity in g.subjects(RDF.type, entity_type):
+            reuse = previous is not None and isinstance(entity, URIRef) and entity not in changed
+            if not reuse:
+                entity_labels = list(g.objects(entity, RDFS.label))
+                definition = get_definition(g, entity) if entity_type == OWL.Class else None
+            for language in languages:
+                labels, labels_to_uris, descriptions = index[language]
+                if reuse:
+                    previous_labels, previous_labels_to_uris, previous_descriptions = previous[language]
+                    label = previous_labels.get(entity)
+                    definition = previous_descriptions.get(str(entity)) if entity_type == OWL.Class else None
+                else:
+                    label = pick_label(entity_labels, entity, language)
+                if label:
+                    labels[entity] = label
+                    labels_to_uris[label] = entity
+                    if definition:
+                        descriptions[str(entity)] = definition
+
+    return index
 
 # Processar coleções RDF (intersectionOf, unionOf)
 def process_collection(g, collection):
+    # Grafo compilado (graph_index.IndexedGraph): a lista já foi achatada
+    flattened = getattr(g, 'flattened_lists', None)
+    if flattened is not None and collection in flattened:
+        return list(flattened[collection])
     items = []
     while collection and collection != RDF.nil:
         item = g.value(collection, RDF.first)
@@ -83,24 +111,56 @@ def process_boolean_restrictions(g, restriction):
             classes.extend(items)
     return classes
 
-# Função para extrair labels de uma classe ou restrição que pode incluir BNodes complexos
-def extract_labels_from_complex_class(g, complex_class, labels):
+# Decodificar uma classe ou restrição que pode incluir BNodes complexos, sem aplicar labels:
+# URIs ficam como estão, coleções viram ('list', itens) e restrições viram ('restriction', propriedade, alvo)
+def decode_complex_class(g, complex_class):
     if isinstance(complex_class, BNode):
         if (complex_class, OWL.intersectionOf, None) in g:
             items = process_collection(g, g.value(complex_class, OWL.intersectionOf))
-            return [extract_labels_from_complex_class(g, item, labels) for item in items]
+            return ('list', tuple(decode_complex_class(g, item) for item in items))
         elif (complex_class, OWL.unionOf, None) in g:
             items = process_collection(g, g.value(complex_class, OWL.unionOf))
-            return [extract_labels_from_complex_class(g, item, labels) for item in items]
+            return ('list', tuple(decode_complex_class(g, item) for item in items))
         elif (complex_class, OWL.onProperty, None) in g:
             property_uri = g.value(complex_class, OWL.onProperty)
             range_class = g.value(complex_class, OWL.allValuesFrom) or g.value(complex_class, OWL.someValuesFrom)
-            return [(labels.get(property_uri, str(property_uri)), extract_labels_from_complex_class(g, range_class, labels))]
-    else:
-        return labels.get(complex_class, str(complex_class))
+            return ('restriction', property_uri, decode_complex_class(g, range_class))
+        return ('none',)
+    return complex_class
+
+# Aplicar os labels a uma classe decodificada por decode_complex_class
+def render_complex_class(decoded, labels):
+    if isinstance(decoded, tuple):
+        if decoded[0] == 'list':
+            return [render_complex_class(item, labels) for item in decoded[1]]
+        elif decoded[0] == 'restriction':
+            return [(labels.get(decoded[1], str(decoded[1])), render_complex_class(decoded[2], labels))]
+        return None
+    return labels.get(decoded, str(decoded))
 
-# Processar restrições com propriedades e cardinalidades
-def process_restriction(g, restriction, labels):
+# Função para extrair labels de uma classe ou restrição que pode incluir BNodes complexos
+def extract_labels_from_complex_class(g, complex_class, labels):
+    return render_complex_class(decode_complex_class(g, complex_class), labels)
+
+# Restrição já decodificada (propriedade, classes relacionadas e cardinalidade), independente do idioma:
+# os labels só são aplicados em render()
+class RestrictionRecord:
+    __slots__ = ('on_property', 'targets', 'cardinality', 'is_union')
+
+    def __init__(self, on_property, targets, cardinality, is_union=False):
+        self.on_property = on_property
+        self.targets = targets
+        self.cardinality = cardinality
+        self.is_union = is_union
+
+    # Mesma tupla (propriedade, labels das classes relacionadas, cardinalidade) de process_restriction
+    def render(self, labels):
+        if self.is_union:
+            return (self.on_property, [labels.get(cls, str(cls)) for cls in self.targets], self.cardinality)
+        return (self.on_property, [render_complex_class(target, labels) for target in self.targets], self.cardinality)
+
+# Decodificar uma restrição com propriedades e cardinalidades
+def decode_restriction(g, restriction):
     on_property = g.value(restriction, OWL.onProperty)
     on_class = (g.value(restriction, OWL.onClass) or 
                 g.value(restriction, OWL.someValuesFrom) or 
@@ -114,13 +174,12 @@ def process_restriction(g, restriction, labels):
         on_class = process_collection(g, g.value(on_class, OWL.intersectionOf))
     elif isinstance(on_class, BNode) and (on_class, OWL.unionOf, None) in g:
         on_class = process_collection(g, g.value(on_class, OWL.unionOf))
-        on_class_labels = [labels.get(cls, str(cls)) for cls in on_class]
-        return (on_property, on_class_labels, "union")
+        return RestrictionRecord(on_property, tuple(on_class), "union", is_union=True)
 
     if not isinstance(on_class, list):
         on_class = [on_class]
 
-    on_class_labels = [extract_labels_from_complex_class(g, cls, labels) for cls in on_class]
+    targets = tuple(decode_complex_class(g, cls) for cls in on_class)
 
     # Verificar cardinalidades
     min_cardinality = g.value(restriction, OWL.minQualifiedCardinality) or g.value(restriction, OWL.minCardinality)
@@ -139,35 +198,75 @@ def process_restriction(g, restriction, labels):
     elif (restriction, OWL.allValuesFrom, None) in g:
         cardinality_str = "only"
 
-    return (on_property, on_class_labels, cardinality_str)
+    return RestrictionRecord(on_property, targets, cardinality_str)
+
+# Processar restrições com propriedades e cardinalidades
+def process_restriction(g, restriction, labels):
+    return decode_restriction(g, restriction).render(labels)
+
+# Restrições decodificadas por nó, calculadas uma vez e compartilhadas por todas as classes que herdam
+# a mesma superclasse. Duas threads podem decodificar o mesmo nó ao mesmo tempo; o resultado é igual.
+class RestrictionCache:
+    def __init__(self, g):
+        self.g = g
+        self._records = {}
+        self._expansions = {}
+
+    def record(self, node):
+        record = self._records.get(node)
+        if record is None:
+            record = self._records[node] = decode_restriction(self.g, node)
+        return record
+
+    # Restrições de uma expressão de superclasse: as de dentro de um owl:intersectionOf, ou a própria expressão
+    def expand(self, node):
+        records = self._expansions.get(node)
+        if records is None:
+            g = self.g
+            if (node, OWL.intersectionOf, None) in g:
+                records = tuple(self.record(item) for item in process_collection(g, g.value(node, OWL.intersectionOf))
+                                if (item, OWL.onProperty, None) in g)
+            else:
+                records = (self.record(node),)
+            self._expansions[node] = records
+        return records
 
 import json
 from rdflib import URIRef, BNode, RDFS, OWL, RDF
 
-def list_restrictions_and_data_properties(g, class_uri, labels, labels_to_uris, descriptions):
+# Construir o índice classe "é select" → indivíduos (uri e label no idioma pedido)
+def build_selectable_options_index(g, language='pt'):
+    return {str(cls): build_selectable_options(g, cls, language) for cls in get_selectable_classes(g)}
+
+# Indivíduos de uma classe "é select", com o label no idioma pedido
+def build_selectable_options(g, cls, language='pt'):
+    return [{"uri": str(ind), "label": get_label(g, ind, language)} for ind in g.subjects(RDF.type, cls)]
+
+def list_restrictions_and_data_properties(g, class_uri, labels, labels_to_uris, descriptions,
+                                          data_property_index=None, hierarchy=None, root_uri=ROOT_CLASS_URI,
+                                          language='pt', selectable_instances_map=None, restriction_cache=None):
+    if hierarchy is None:
+        hierarchy = ClassHierarchy(g)
+    if restriction_cache is None:
+        restriction_cache = RestrictionCache(g)
+    if data_property_index is None:
+        data_property_index = build_data_property_index(g, hierarchy)
+    if selectable_instances_map is None:
+        selectable_instances_map = build_selectable_options_index(g, language)
     restrictions = []
-    selectable = get_selectable_classes(g)
-    selectable_instances_map = {
-        str(cls): [
-            {"uri": str(ind), "label": get_label(g, ind, LANGUAGE)}
-            for ind in g.subjects(RDF.type, cls)
-        ]
-        for cls in selectable
-    }
+
+    visited = set()
 
     def get_restrictions_recursive(uri):
-        if str(uri) == 'http://www.semanticweb.org/ontologias/SESAI/ontoAldeias_00000557':
+        if str(uri) == str(root_uri) or str(uri) in visited:
             return
-        for _, _, o in g.triples((URIRef(uri), RDFS.subClassOf, None)):
+        visited.add(str(uri))
+        for o in hierarchy.superclasses_of(uri):
             if isinstance(o, URIRef):
                 get_restrictions_recursive(o)
             if isinstance(o, (BNode, URIRef)):
-                if (o, OWL.intersectionOf, None) in g:
-                    for item in process_collection(g, g.value(o, OWL.intersectionOf)):
-                        if (item, OWL.onProperty, None) in g:
-                            restrictions.append(process_restriction(g, item, labels))
-                else:
-                    restrictions.append(process_restriction(g, o, labels))
+                for record in restriction_cache.expand(o):
+                    restrictions.append(record.render(labels))
 
     get_restrictions_recursive(class_uri)
 
@@ -184,7 +283,7 @@ def list_restrictions_and_data_properties(g, class_uri, labels, labels_to_uris,
                 related_class_str = labels.get(related_class, str(related_class))
 
             related_class_uri = str(related_class)
-            data_props = find_data_properties_for_related_classes(g, related_class)
+            data_props = find_data_properties_for_related_classes(g, related_class, data_property_index)
             if data_props:
                 for prop_uri, prop_restrictions in data_props:
                     data_fields.append({
@@ -230,18 +329,24 @@ def list_restrictions_and_data_properties(g, class_uri, labels, labels_to_uris,
     return data_fields
 
 # Função para listar subclasses e suas respectivas data properties associadas
-def list_subclasses(g, class_uri, labels):
+def list_subclasses(g, class_uri, labels, data_property_index=None, hierarchy=None, restriction_cache=None):
+    if hierarchy is None:
+        hierarchy = ClassHierarchy(g)
+    if restriction_cache is None:
+        restriction_cache = RestrictionCache(g)
+    if data_property_index is None:
+        data_property_index = build_data_property_index(g, hierarchy)
     subclasses = []
 
     # Itera sobre as subclasses para coletar suas data properties
-    for s in g.subjects(RDFS.subClassOf, URIRef(class_uri)):
-        subclass_data_properties = find_data_properties_for_related_classes(g, s)  # Buscar data properties para cada subclasse
+    for s in hierarchy.children_of(class_uri):
+        subclass_data_properties = find_data_properties_for_related_classes(g, s, data_property_index)  # Buscar data properties para cada subclasse
         subclass_restrictions = []
 
         # Processar restrições associadas à subclasse para verificar cardinalidades
-        for _, p, o in g.triples((s, RDFS.subClassOf, None)):
+        for o in hierarchy.superclasses_of(s):
             if isinstance(o, BNode) or isinstance(o, URIRef):
-                subclass_restrictions.append(process_restriction(g, o, labels))
+                subclass_restrictions.append(restriction_cache.record(o).render(labels))
 
         # Inclui as subclasses que têm propriedades de dados ou restrições de cardinalidade associadas
         if subclass_data_properties or subclass_restrictions:
@@ -267,39 +372,64 @@ def list_subclasses(g, class_uri, labels):
     return None
 
 # Função para encontrar propriedades de dados associadas a uma classe, verificando o domain da propriedade e superclasses
-def find_data_properties_for_related_classes(g, class_uri):
-    data_properties = []
-
-    # Função para buscar recursivamente as propriedades de classes ancestrais
-    def get_properties_recursive(uri):
-        # Verifica as propriedades associadas diretamente a essa classe
-        for property_uri in g.subjects(RDF.type, OWL.DatatypeProperty):
-            for domain_class in g.objects(property_uri, RDFS.domain):
-                if str(domain_class) == str(uri):  # Verifica se a classe está no domínio
-                    range_description = g.value(property_uri, RDFS.range)
-                    restrictions = {}
-
-                    # Verifica se há restrições específicas como xsd:maxLength dentro de owl:withRestrictions
-                    if range_description and (range_description, OWL.withRestrictions, None) in g:
-                        restriction_nodes = process_collection(g, g.value(range_description, OWL.withRestrictions))
-                        for restriction_node in restriction_nodes:
-                            for p, o in g.predicate_objects(restriction_node):
-                                restrictions[g.qname(p)] = str(o)
-
-                    # Caso não haja restrições explícitas, define o tipo de dados como o range padrão
-                    else:
-                        restrictions['type'] = [range_description]
-
-                    data_properties.append((property_uri, restrictions))
-
-        # Recursivamente verificar superclasses
-        for superclass in g.objects(URIRef(uri), RDFS.subClassOf):
-            if isinstance(superclass, URIRef):
-                get_properties_recursive(superclass)
-
-    # Começar a busca pelas propriedades da classe e suas superclasses
-    get_properties_recursive(class_uri)
-
-    return data_properties
-
-
+def find_data_properties_for_related_classes(g, class_uri, data_property_index=None):
+    if data_property_index is None:
+        data_property_index = build_data_property_index(g, ClassHierarchy(g))
+    return data_property_index.get(str(class_uri), [])
+
+# Ler o range de uma data property: facetas de owl:withRestrictions (ex.: xsd:maxLength) ou o tipo de dados
+def parse_data_property_range(g, property_uri):
+    range_description = g.value(property_uri, RDFS.range)
+    restrictions = {}
+
+    # Verifica se há restrições específicas como xsd:maxLength dentro de owl:withRestrictions
+    if range_description and (range_description, OWL.withRestrictions, None) in g:
+        restriction_nodes = process_collection(g, g.value(range_description, OWL.withRestrictions))
+        for restriction_node in restriction_nodes:
+            for p, o in g.predicate_objects(restriction_node):
+                restrictions[g.qname(p)] = str(o)
+
+    # Caso não haja restrições explícitas, define o tipo de dados como o range padrão
+    else:
+        restrictions['type'] = [range_description]
+
+    return restrictions
+
+# Construir o índice invertido classe → data properties (do domain da própria classe e de suas superclasses).
+# Retorna {URI da classe (str): [(property_uri, restrictions), ...]}, na mesma ordem da busca recursiva.
+def build_data_property_index(g, hierarchy=None):
+    if hierarchy is None:
+        hierarchy = ClassHierarchy(g)
+
+    # Data properties declaradas diretamente no domain de cada classe
+    direct = {}
+    for property_uri in g.subjects(RDF.type, OWL.DatatypeProperty):
+        domains = list(g.objects(property_uri, RDFS.domain))
+        if not domains:
+            continue
+        restrictions = parse_data_property_range(g, property_uri)
+        for domain_class in domains:
+            direct.setdefault(str(domain_class), []).append((property_uri, restrictions))
+
+    classes = set(direct)
+    classes.update(str(cls) for cls in hierarchy.classes)
+
+    # Fecho pelos ancestrais: propriedades da classe seguidas das de cada superclasse (sem repetir visitas)
+    index = {}
+    for cls in classes:
+        data_properties = []
+        visited = set()
+
+        def get_properties_recursive(uri):
+            if uri in visited:
+                return
+            visited.add(uri)
+            data_properties.extend(direct.get(uri, ()))
+            for superclass in hierarchy.parents_of(uri):
+                get_properties_recursive(str(superclass))
+
+        get_properties_recursive(cls)
+        if data_properties:
+            index[cls] = data_properties
+
+    return index
@@ -0,0 +1,110 @@
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import time
+
+from rdflib import Graph
+
+logger = logging.getLogger('aui.ontology')
+
+# Versão do formato do snapshot; snapshots de outro formato são ignorados
+SNAPSHOT_FORMAT = 1
+
+
+# Calcula o hash SHA-256 do conteúdo de um arquivo
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Caminho padrão do snapshot: ao lado do arquivo OWL, com extensão .snapshot
+def default_snapshot_path(owl_path):
+    return os.path.splitext(owl_path)[0] + '.snapshot'
+
+
+# Grafo que registra os triplos na ordem em que o parser os adiciona.
+# A ordem de inserção define a ordem de iteração do rdflib (e portanto a ordem de labels e subclasses nas respostas).
+class _RecordingGraph(Graph):
+    def __init__(self):
+        super().__init__()
+        self.added = {}
+
+    def add(self, triple):
+        self.added.setdefault(triple, None)
+        return super().add(triple)
+
+
+# Faz o parse do OWL e grava o snapshot: tabela de termos sem repetição e triplos como índices nessa tabela
+def write_snapshot(owl_path, snapshot_path):
+    source_version = file_sha256(owl_path)
+    g = _RecordingGraph()
+    g.parse(owl_path, format='xml')
+
+    terms = {}
+    triples = [tuple(terms.setdefault(term, len(terms)) for term in triple) for triple in g.added]
+    data = {
+        'format': SNAPSHOT_FORMAT,
+        'source_sha256': source_version,
+        'terms': list(terms),
+        'triples': triples,
+    }
+    tmp_path = snapshot_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+    return len(triples)
+
+
+# Lê o snapshot se ele corresponde à versão do arquivo OWL; retorna None se ausente ou desatualizado.
+# Um snapshot ilegível (corrompido, gravado por outra versão do rdflib ou do Python) também retorna None, com
+# um aviso no log, e a ontologia é lida do arquivo OWL.
+def read_snapshot(snapshot_path, source_version):
+    if not snapshot_path or not os.path.exists(snapshot_path):
+        return None
+    try:
+        with open(snapshot_path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('format') != SNAPSHOT_FORMAT or data.get('source_sha256') != source_version:
+            return None
+        terms = data['terms']
+        g = Graph()
+        g.addN((terms[s], terms[p], terms[o], g) for s, p, o in data['triples'])
+        return g
+    except Exception:
+        logger.warning('ignoring unreadable ontology snapshot %s', snapshot_path, exc_info=True)
+        return None
+
+
+# Linha de comando: gera o snapshot de um arquivo OWL e compara o tempo de carga a frio
+def main(argv=None):
+    import o_parse_back_end as op
+    from ontology_store import DEFAULT_ONTOLOGY_PATH
+
+    parser = argparse.ArgumentParser(description='Gera o snapshot compacto de uma ontologia OWL.')
+    parser.add_argument('--ontology', default=DEFAULT_ONTOLOGY_PATH, help='arquivo OWL de origem')
+    parser.add_argument('--output', help='arquivo de saída (padrão: ao lado do OWL, com extensão .snapshot)')
+    args = parser.parse_args(argv)
+
+    snapshot_path = args.output or default_snapshot_path(args.ontology)
+    write_snapshot(args.ontology, snapshot_path)
+
+    start = time.perf_counter()
+    op.load_ontology(args.ontology, snapshot_path=None)
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = op.load_ontology(args.ontology, snapshot_path=snapshot_path)
+    snapshot_time = time.perf_counter() - start
+
+    print(f"{snapshot_path}: {len(loaded)} triplos, {os.path.getsize(snapshot_path)} bytes", file=sys.stderr)
+    print(f"carga a frio: OWL {parse_time * 1000:.0f} ms, snapshot {snapshot_time * 1000:.0f} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+import os
+import threading
+
+import o_parse_back_end as op
+from class_hierarchy import ClassHierarchy
+from form_bundle import load_form_bundle
+from form_validation import FormValidators
+from graph_index import IndexedGraph
+from incremental_reload import INCREMENTAL_MIN_TRIPLES, INCREMENTAL_RELOAD, apply_incremental
+from instrumentation import record_cache, span
+from ontology_snapshot import default_snapshot_path, file_sha256
+from search_index import OntologySearch
+from text_search import PrefixIndex
+
+OWL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'OWL')
+
+# Caminho padrão da ontologia usada pelos formulários
+DEFAULT_ONTOLOGY_PATH = os.environ.get('ONTOLOGY_PATH', os.path.join(OWL_DIR, 'Onto_aldeias.owl'))
+
+# Classe raiz dos formulários da ontologia SESAI (documentos)
+SESAI_ROOT_URI = 'http://www.semanticweb.org/ontologias/OntoSesai/sesai_00000317'
+
+# Ontologias servidas: nome (parâmetro ?ontology=) → (arquivo OWL, classe raiz dos formulários)
+ONTOLOGIES = {
+    'aldeias': (DEFAULT_ONTOLOGY_PATH, op.ROOT_CLASS_URI),
+    'sesai': (os.environ.get('SESAI_ONTOLOGY_PATH', os.path.join(OWL_DIR, 'docs_sesai.owl')), SESAI_ROOT_URI),
+}
+
+# Ontologia usada quando a requisição não indica nenhuma
+DEFAULT_ONTOLOGY = os.environ.get('DEFAULT_ONTOLOGY', 'aldeias')
+
+
+# Memória residente do processo em bytes (None fora do Linux)
+def _rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Executa func() e retorna (resultado, aumento aproximado da memória residente em bytes)
+def _measure_memory(func):
+    before = _rss_bytes()
+    result = func()
+    after = _rss_bytes()
+    if before is None or after is None:
+        return result, None
+    return result, max(after - before, 0)
+
+
+# Opções (indivíduos) de cada classe "é select", com busca por prefixo sem acentos
+class SelectOptions:
+    def __init__(self, options_by_class):
+        self.options_by_class = options_by_class
+        self._search = {}
+
+    def get(self, class_uri):
+        return self.options_by_class.get(class_uri)
+
+    # Opções da classe cujo label (ou uma palavra dele em diante) começa com a consulta, na ordem original
+    def search(self, class_uri, query):
+        options = self.options_by_class.get(class_uri)
+        if options is None:
+            return None
+        if class_uri not in self._search:
+            self._search[class_uri] = PrefixIndex(enumerate(option["label"] for option in options))
+        return [options[i] for i in sorted(self._search[class_uri].search(query))]
+
+
+# Versão imutável de uma ontologia carregada: o grafo e os índices derivados dele
+class OntologySnapshot:
+    def __init__(self, graph, path, version, mtime, root_uri=op.ROOT_CLASS_URI, load_memory=None):
+        self.graph = graph
+        self.path = path
+        self.version = version
+        self.mtime = mtime
+        self.root_uri = root_uri
+        # Aumento da memória residente ao carregar o grafo e ao construir cada índice (aproximado)
+        self.memory = {'graph': load_memory}
+        # Resumo da recarga que produziu esta versão (incremental_reload.apply_incremental)
+        self.reload = {"mode": "full"}
+        self._indexes = {}
+        self._lock = threading.RLock()
+
+    # Retorna um índice derivado do grafo, construindo-o apenas na primeira chamada
+    def index(self, key, builder):
+        try:
+            value = self._indexes[key]
+        except KeyError:
+            pass
+        else:
+            record_cache('index', True)
+            return value
+        with self._lock:
+            hit = key in self._indexes
+            record_cache('index', hit)
+            if not hit:
+                name = key if isinstance(key, str) else key[0]
+                with span(f"index.{name}"):
+                    self._indexes[key], memory = _measure_memory(lambda: builder(self))
+                if memory is not None:
+                    self.memory[name] = self.memory.get(name, 0) + memory
+            return self._indexes[key]
+
+    # Se o índice já foi construído nesta versão
+    def built(self, key):
+        return key in self._indexes
+
+    # Labels, mapa label→URI e definições de um idioma, calculados uma vez por versão da ontologia
+    def labels(self, language):
+        if language in op.SUPPORTED_LANGUAGES:
+            return self.index('labels', lambda s: op.build_label_index(s.graph))[language]
+        return self.index(('labels', language), lambda s: op.extract_labels(s.graph, language))
+
+    # Hierarquia de classes (pais, filhos, ancestrais e ordem topológica)
+    def hierarchy(self):
+        return self.index('hierarchy', lambda s: ClassHierarchy(s.graph))
+
+    # Restrições decodificadas por nó (compartilhadas entre idiomas e classes)
+    def restrictions(self):
+        return self.index('restrictions', lambda s: op.RestrictionCache(s.graph))
+
+    # Índice classe → data properties (com o fecho pelas superclasses)
+    def data_properties(self):
+        return self.index('data_properties', lambda s: op.build_data_property_index(s.graph, s.hierarchy()))
+
+    # Opções das classes "é select" no idioma pedido, com índice de busca por prefixo
+    def options(self, language):
+        return self.index(('options', language), lambda s: SelectOptions(op.build_selectable_options_index(s.graph, language)))
+
+    # Esquemas de formulário pré-serializados de todas as classes, em um idioma
+    def form_bundle(self, language):
+        return self.index(('form_bundle', language), lambda s: load_form_bundle(s, language))
+
+    # Validadores das submissões de cada classe, compilados a partir dos esquemas de formulário
+    def validators(self):
+        return self.index('validators', lambda s: FormValidators(s))
+
+    # Busca por labels e definições de classes, propriedades e indivíduos (todos os idiomas)
+    def search(self):
+        return self.index('search', lambda s: OntologySearch(s.graph))
+
+    # Compila antecipadamente os índices e pacotes dos idiomas (usado na inicialização do servidor)
+    def warm(self, languages=op.SUPPORTED_LANGUAGES):
+        for language in languages:
+            self.form_bundle(language)
+        self.search()
+        return self
+
+    # Resumo da versão carregada: tamanho, índices já construídos e memória aproximada por componente
+    def stats(self):
+        with self._lock:
+            indexes = sorted({key if isinstance(key, str) else key[0] for key in self._indexes})
+            memory = dict(self.memory)
+        known = [value for value in memory.values() if value is not None]
+        return {
+            "version": self.version,
+            "triples": len(self.graph),
+            "classes": len(self.hierarchy().classes) if 'hierarchy' in indexes else None,
+            "indexes": indexes,
+            "memory_bytes": sum(known) if known else None,
+            "memory_by_index": memory,
+            "reload": self.reload,
+        }
+
+
+# Armazena a ontologia do processo: faz o parse uma vez e recarrega só se o arquivo mudar
+# compile_graph transforma o grafo lido do arquivo no grafo servido (IndexedGraph por padrão; a identidade serve
+# o grafo do rdflib diretamente, como na verificação de paridade)
+class OntologyStore:
+    def __init__(self, path=DEFAULT_ONTOLOGY_PATH, snapshot_path=None, root_uri=op.ROOT_CLASS_URI,
+                 compile_graph=IndexedGraph):
+        self.path = path
+        self.snapshot_path = snapshot_path or default_snapshot_path(path)
+        self.root_uri = root_uri
+        self.compile_graph = compile_graph
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    # Retorna o snapshot atual, recarregando se o mtime e o hash do arquivo mudaram. Enquanto uma recarga está em
+    # andamento em outra thread, as requisições continuam com o snapshot anterior em vez de esperar por ela.
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is not None and os.path.getmtime(self.path) == snapshot.mtime:
+            return snapshot
+        if snapshot is not None and not self._lock.acquire(blocking=False):
+            return snapshot
+        if snapshot is None:
+            self._lock.acquire()
+        try:
+            snapshot = self._snapshot
+            if snapshot is None:
+                self._snapshot = self._load()
+            elif os.path.getmtime(self.path) != snapshot.mtime:
+                version = file_sha256(self.path)
+                if version == snapshot.version:
+                    # Conteúdo igual (ex.: "touch" no arquivo): só atualiza o mtime conhecido
+                    snapshot.mtime = os.path.getmtime(self.path)
+                else:
+                    self._snapshot = self._load(version, previous=snapshot)
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    # Snapshot atual, sem carregar a ontologia (None se ainda não foi usada)
+    def loaded(self):
+        return self._snapshot
+
+    # Força o recarregamento da ontologia a partir do arquivo (full=True recompila tudo, sem reaproveitar
+    # os índices da versão atual)
+    def reload(self, full=False):
+        with self._lock:
+            self._snapshot = self._load(previous=None if full else self._snapshot)
+            return self._snapshot
+
+    # Carrega a versão atual do arquivo. Com previous, os labels, as opções e os esquemas de formulário que
+    # não dependem do que mudou são reaproveitados da versão anterior (preparados antes da publicação)
+    def _load(self, version=None, previous=None):
+        mtime = os.path.getmtime(self.path)
+        if version is None:
+            version = file_sha256(self.path)
+        def load():
+            with span('ontology.load'):
+                graph = op.load_ontology(self.path, self.snapshot_path, version)
+            with span('ontology.index'):
+                return self.compile_graph(graph)
+
+        graph, memory = _measure_memory(load)
+        snapshot = OntologySnapshot(graph, self.path, version, mtime, self.root_uri, memory)
+        if INCREMENTAL_RELOAD and previous is not None and len(graph) >= INCREMENTAL_MIN_TRIPLES:
+            with span('ontology.incremental'):
+                snapshot.reload = apply_incremental(previous, snapshot)
+        return snapshot
+
+
+# Ontologias do processo por nome, cada uma com seu próprio OntologyStore (grafo, índices e caches).
+# Nenhuma é carregada na criação: o parse acontece no primeiro uso de cada uma.
+class OntologyRegistry:
+    def __init__(self, ontologies=ONTOLOGIES, default=DEFAULT_ONTOLOGY):
+        self.default = default
+        self._stores = {}
+        self._lock = threading.Lock()
+        for name, (path, root_uri) in ontologies.items():
+            self.register(name, path, root_uri)
+
+    def register(self, name, path, root_uri=op.ROOT_CLASS_URI, compile_graph=IndexedGraph):
+        with self._lock:
+            self._stores[name] = OntologyStore(path, root_uri=root_uri, compile_graph=compile_graph)
+            return self._stores[name]
+
+    def unregister(self, name):
+        with self._lock:
+            return self._stores.pop(name)
+
+    def names(self):
+        return list(self._stores)
+
+    # OntologyStore da ontologia pedida (a padrão se name for vazio); KeyError se não existir
+    def store(self, name=None):
+        return self._stores[name or self.default]
+
+    # Situação de cada ontologia: arquivo, se já foi carregada e, se sim, o resumo do snapshot
+    def stats(self):
+        result = {}
+        for name, ontology_store in self._stores.items():
+            snapshot = ontology_store.loaded()
+            result[name] = {
+                "path": ontology_store.path,
+                "root": ontology_store.root_uri,
+                "default": name == self.default,
+                "loaded": snapshot is not None,
+                **(snapshot.stats() if snapshot is not None else {}),
+            }
+        return result
+
+
+# Instâncias compartilhadas por todos os handlers do processo (store é a ontologia padrão)
+registry = OntologyRegistry()
+store = registry.store()
@@ -1,11 +1,50 @@
 from rdflib import BNode, Graph, URIRef, RDFS, OWL, RDF
 
-def list_subclasses(g, class_uri, labels):
+def list_subclasses(g, class_uri, labels, hierarchy=None):
     subclasses = []
-    for s in g.subjects(RDFS.subClassOf, URIRef(class_uri)):
+    if hierarchy is not None:
+        children = hierarchy.children_of(class_uri)
+    else:
+        children = g.subjects(RDFS.subClassOf, URIRef(class_uri))
+    for s in children:
         subclass_info = {
             "uri": str(s),  # Convertendo a URIRef para string
             "label": labels.get(s, str(s))  # Usando o label, ou a URI como fallback
         }
         subclasses.append(subclass_info)
-    return subclasses
\ No newline at end of file
+    return subclasses
+
+# Monta a árvore de subclasses a partir de uma raiz, até a profundidade pedida (None = sem limite).
+# As subclasses de cada classe são expandidas uma única vez: quando a classe aparece de novo (tem várias
+# superclasses, formando losangos na hierarquia), o nó vem com "repeated": true e sem "subclasses", então a
+# árvore cresce linearmente com o número de classes. Um filho que já está sendo montado em um nível acima
+# (aresta que fecha um ciclo) é ignorado.
+def build_class_tree(g, root_uri, labels, descriptions, hierarchy, depth=None):
+    root = URIRef(root_uri)
+    expanded = {}  # URI → menor nível em que as subclasses da classe foram expandidas
+    in_progress = set()
+
+    def build_node(uri, label, level):
+        in_progress.add(str(uri))
+        node = {"uri": str(uri), "label": label}
+        if str(uri) in descriptions:
+            node["definition"] = descriptions[str(uri)]
+        children = [
+            child for child in list_subclasses(g, uri, labels, hierarchy)
+            if child["uri"] not in in_progress  # Ignora arestas que fecham um ciclo
+        ]
+        node["leaf"] = not children
+        if children and (depth is None or level < depth):
+            # Já expandida em um nível igual ou mais raso (com pelo menos a mesma profundidade restante)
+            if expanded.get(str(uri), float('inf')) <= level:
+                node["repeated"] = True
+            else:
+                expanded[str(uri)] = level
+                node["subclasses"] = [
+                    build_node(URIRef(child["uri"]), child["label"], level + 1)
+                    for child in children
+                ]
+        in_progress.discard(str(uri))
+        return node
+
+    return build_node(root, labels.get(root, str(root)), 0)
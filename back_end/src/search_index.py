@@ -0,0 +1,123 @@
+import heapq
+import threading
+from collections import OrderedDict
+
+from rdflib import OWL, RDF, RDFS, URIRef
+
+import o_parse_back_end as op
+from instrumentation import record_cache
+from text_search import WordIndex, words
+
+# Tipos de entidade pesquisáveis e o nome de cada um nas respostas de /search
+SEARCH_KINDS = {
+    OWL.Class: 'class',
+    OWL.ObjectProperty: 'object_property',
+    OWL.DatatypeProperty: 'data_property',
+    OWL.NamedIndividual: 'individual',
+}
+
+# Onde o texto foi encontrado, em ordem de preferência no ranking
+LABEL, DEFINITION = 0, 1
+FIELD_NAMES = ('label', 'definition')
+
+# Consultas recentes guardadas com a resposta (o autocomplete repete os mesmos prefixos entre usuários)
+SEARCH_CACHE_SIZE = 2048
+
+
+# Busca por labels e definições (pt/en) de classes, propriedades e indivíduos nomeados, sem acentos,
+# por prefixo e com tolerância a um erro de digitação por palavra. Cada entidade aparece uma vez,
+# mesmo que várias tenham o mesmo label (o que o mapa labels_to_uris não consegue representar).
+class OntologySearch:
+    def __init__(self, g, languages=op.SUPPORTED_LANGUAGES, cache_size=SEARCH_CACHE_SIZE):
+        # (uri, tipo, {idioma: label}, {idioma: definição}) de cada entidade
+        self.entities = []
+        # (posição da entidade, campo, idioma do texto, texto) de cada label e definição indexados
+        self.texts = []
+        seen = set()
+        for entity_type, kind in SEARCH_KINDS.items():
+            for entity in g.subjects(RDF.type, entity_type):
+                if not isinstance(entity, URIRef) or entity in seen:
+                    continue
+                seen.add(entity)
+                entity_labels = list(g.objects(entity, RDFS.label))
+                definitions = list(g.objects(entity, op.DEFINITION_URI)) or list(g.objects(entity, RDFS.comment))
+                position = len(self.entities)
+                self.entities.append((
+                    str(entity), kind,
+                    {language: op.pick_label(entity_labels, entity, language) for language in languages},
+                    {language: op.pick_label(definitions, entity, language) if definitions else None
+                     for language in languages},
+                ))
+                for field, literals in ((LABEL, entity_labels), (DEFINITION, definitions)):
+                    for literal in literals:
+                        self.texts.append((position, field, getattr(literal, 'language', None), str(literal)))
+
+        self._words = WordIndex((text_id, text[3]) for text_id, text in enumerate(self.texts))
+        # Texto normalizado de cada label e definição, com um espaço na frente (para casar a consulta inteira)
+        self._normalized = [' ' + ' '.join(words(text[3])) for text in self.texts]
+        # Ordem de desempate de cada texto por idioma da consulta: campo, idioma do texto, tamanho e ordem original
+        self._order = {}
+        for language in languages:
+            def order(text_id):
+                position, field, text_language, text = self.texts[text_id]
+                return field, not (text_language and text_language.startswith(language)), len(text), text_id
+            ranked = sorted(range(len(self.texts)), key=order)
+            self._order[language] = [0] * len(ranked)
+            for rank, text_id in enumerate(ranked):
+                self._order[language][text_id] = rank
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    # Até limit entidades que casam com a consulta, das mais relevantes para as menos relevantes
+    def search(self, query, language='pt', limit=10, kinds=None):
+        key = (' '.join(words(query)), language, limit, tuple(sorted(kinds)) if kinds else None)
+        with self._cache_lock:
+            results = self._cache.get(key)
+            if results is not None:
+                self._cache.move_to_end(key)
+        record_cache('search', results is not None)
+        if results is None:
+            results = self._search(key[0], language, limit, kinds)
+            with self._cache_lock:
+                self._cache[key] = results
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results
+
+    # Ordem: labels que começam com a consulta inteira, labels que a contêm a partir de uma palavra, demais
+    # labels e por fim definições; depois casamentos exatos antes de prefixos e de erros de digitação,
+    # textos no idioma pedido e textos mais curtos
+    def _search(self, query, language, limit, kinds):
+        costs = self._words.search(query)
+        if not costs:
+            return []
+        phrase = ' ' + query
+        order = self._order.get(language) or self._order[op.SUPPORTED_LANGUAGES[0]]
+        size = len(self.texts)
+        best = {}
+        for text_id, cost in costs.items():
+            position, field = self.texts[text_id][:2]
+            if kinds and self.entities[position][1] not in kinds:
+                continue
+            if field == DEFINITION:
+                tier = 3
+            elif self._normalized[text_id].startswith(phrase):
+                tier = 0
+            else:
+                tier = 1 if phrase in self._normalized[text_id] else 2
+            key = ((tier * 3 + cost) * size + order[text_id], field)
+            if position not in best or key < best[position]:
+                best[position] = key
+
+        results = []
+        for position, (key, field) in heapq.nsmallest(limit, best.items(), key=lambda item: item[1]):
+            uri, kind, labels, definitions = self.entities[position]
+            results.append({
+                "uri": uri,
+                "kind": kind,
+                "label": labels.get(language, uri),
+                "definition": definitions.get(language),
+                "match": FIELD_NAMES[field],
+            })
+        return results
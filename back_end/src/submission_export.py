@@ -0,0 +1,229 @@
+import argparse
+import sys
+
+from rdflib import Graph, Namespace, URIRef, RDF, RDFS, OWL, XSD
+from rdflib.namespace import NamespaceManager
+
+import o_parse_back_end as op
+
+# Namespace dos indivíduos gerados a partir das submissões
+SUBMISSION_NS = Namespace("http://www.semanticweb.org/ontologias/SESAI/submissao/")
+
+# Vocabulário mínimo para os metadados da submissão
+FORM_NS = Namespace("http://www.semanticweb.org/ontologias/SESAI/formulario#")
+
+EXPORT_FORMATS = ('nt', 'ttl')
+
+# Limite de chaves de formulário memorizadas pelo FieldResolver
+MAX_CACHED_KEYS = 100000
+
+
+# Traduz as chaves do formulário ("label da classe relacionada-URI da propriedade" e
+# "URI da subclasse-label") para URIs da ontologia
+class FieldResolver:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.graph = snapshot.graph
+        self.hierarchy = snapshot.hierarchy()
+        self.label_to_uri = {}
+        for language in op.SUPPORTED_LANGUAGES:
+            labels, labels_to_uris, descriptions = snapshot.labels(language)
+            for label, uri in labels_to_uris.items():
+                self.label_to_uri.setdefault(label, uri)
+        # URIs das propriedades como texto: as chaves são conferidas sem criar um URIRef para cada prefixo
+        self.properties = {str(p) for p in self.graph.subjects(RDF.type, OWL.ObjectProperty)}
+        self.properties.update(str(p) for p in self.graph.subjects(RDF.type, OWL.DatatypeProperty))
+        self.entities = {str(s) for s in self.graph.subjects(unique=True) if isinstance(s, URIRef)}
+        self._field_types = {}
+        self._keys = {}
+
+    # Tipos de dados dos campos do formulário de uma classe: {(label da classe relacionada, propriedade): tipo}
+    def field_types(self, class_uri):
+        if class_uri not in self._field_types:
+            types = {}
+            if class_uri:
+                for language in op.SUPPORTED_LANGUAGES:
+                    for field in self.snapshot.form_bundle(language).details(class_uri).payload:
+                        key = (field["relatedClass"], field["property"])
+                        types.setdefault(key, field["dataType"][0])
+            self._field_types[class_uri] = types
+        return self._field_types[class_uri]
+
+    # Opções do campo de seleção de uma classe (label em pt ou en, ou URI → URI do indivíduo), as mesmas aceitas
+    # pela validação; None se o campo não tem opções
+    def field_options(self, class_uri, key):
+        validator = self.snapshot.validators().get(class_uri) if class_uri else None
+        return validator.options(key) if validator is not None else None
+
+    # Decompõe a chave de um campo; retorna (propriedade, classe relacionada, label) ou None se desconhecida
+    def resolve_key(self, key):
+        try:
+            return self._keys[key]
+        except KeyError:
+            pass
+        resolved = self._resolve_key(key)
+        if len(self._keys) < MAX_CACHED_KEYS:
+            self._keys[key] = resolved
+        return resolved
+
+    def _resolve_key(self, key):
+        label, sep, property_uri = key.rpartition('-http')
+        if sep and 'http' + property_uri in self.properties:
+            return URIRef('http' + property_uri), self.label_to_uri.get(label), label
+        # Campo dinâmico: "URI da subclasse-label da subclasse"
+        position = key.find('-')
+        while position != -1:
+            if key[:position] in self.hierarchy.class_uris:
+                return None, URIRef(key[:position]), key[position + 1:]
+            position = key.find('-', position + 1)
+        return None
+
+
+_LITERAL_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r'})
+
+
+# Serializa termos em N-Triples ou Turtle. Os termos da ontologia e os campos de cada formulário
+# são renderizados uma única vez; por submissão só são montadas as strings dos valores.
+class StatementRenderer:
+    def __init__(self, resolver, export_format='nt'):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"formato não suportado: {export_format}")
+        self.resolver = resolver
+        self.namespace_manager = None
+        if export_format == 'ttl':
+            self.namespace_manager = NamespaceManager(Graph(), bind_namespaces='core')
+            self.namespace_manager.bind('submissao', SUBMISSION_NS)
+            self.namespace_manager.bind('formulario', FORM_NS)
+        self._terms = {}
+        self._fields = {}
+        self.rdf_type = self.term(RDF.type)
+        self.named_individual = self.term(OWL.NamedIndividual)
+        self.submitted_at = self.term(FORM_NS.submittedAt)
+        self.xsd_double = self.term(XSD.double)
+
+    # Cabeçalho do arquivo (prefixos, no Turtle)
+    def header(self):
+        if self.namespace_manager is None:
+            return ''
+        prefixes = ''.join(f"@prefix {prefix}: <{namespace}> .\n"
+                           for prefix, namespace in self.namespace_manager.namespaces())
+        return prefixes + '\n'
+
+    # Termo da ontologia serializado (memorizado)
+    def term(self, uri):
+        text = self._terms.get(uri)
+        if text is None:
+            text = self._terms[uri] = URIRef(uri).n3(self.namespace_manager)
+        return text
+
+    @staticmethod
+    def literal(lexical, datatype=None):
+        text = '"' + lexical.translate(_LITERAL_ESCAPES) + '"'
+        return f"{text}^^{datatype}" if datatype else text
+
+    # Partes já serializadas de um campo do formulário de uma classe
+    def field(self, class_uri, key):
+        cache_key = (class_uri, key)
+        if cache_key in self._fields:
+            return self._fields[cache_key]
+        field = None
+        resolved = self.resolver.resolve_key(key)
+        if resolved is not None:
+            property_uri, related_class, label = resolved
+            datatype = None
+            if property_uri is not None:
+                datatype = self.resolver.field_types(class_uri).get((label, str(property_uri)))
+            field = (
+                self.term(property_uri) if property_uri is not None else None,
+                self.term(related_class) if related_class is not None else None,
+                self.literal(label),
+                self.term(datatype) if datatype and URIRef(datatype) != XSD.string else None,
+                self.resolver.field_options(class_uri, key) if property_uri is not None else None,
+            )
+        if len(self._fields) < MAX_CACHED_KEYS:
+            self._fields[cache_key] = field
+        return field
+
+    # Triplos (já serializados) de uma submissão; retorna (triplos, chaves não reconhecidas)
+    def submission(self, submission):
+        # Os identificadores são hexadecimais (uuid), então formam nomes locais válidos sem validação extra
+        subject_uri = f"{SUBMISSION_NS}{submission['id']}"
+        subject = f"submissao:{submission['id']}" if self.namespace_manager else f"<{subject_uri}>"
+        statements = [
+            (subject, self.rdf_type, self.named_individual),
+            (subject, self.submitted_at, self.literal(repr(submission["created_at"]), self.xsd_double)),
+        ]
+        class_uri = submission.get("class")
+        if class_uri:
+            statements.append((subject, self.rdf_type, self.term(class_uri)))
+
+        skipped = []
+        entities = self.resolver.entities
+        for index, (key, value) in enumerate(submission["data"].items()):
+            field = self.field(class_uri, key)
+            if field is None:
+                skipped.append(key)
+                continue
+            property_term, class_term, label_term, datatype_term, options = field
+            items = value if isinstance(value, list) else [value]
+            for item_index, item in enumerate(items):
+                item = str(item)
+                if options is not None and item in options:
+                    item = options[item]
+                if property_term is not None and item in entities:
+                    # Opção selecionada (pela URI ou pelo label, como o front-end envia): liga a submissão
+                    # diretamente ao indivíduo da ontologia
+                    statements.append((subject, property_term, self.term(item)))
+                    continue
+                # Valor textual: vira um indivíduo da classe relacionada, ligado à submissão (um por item da lista)
+                node = f"<{subject_uri}/{index}-{item_index}>" if len(items) > 1 else f"<{subject_uri}/{index}>"
+                statements.append((subject, property_term or self.term(FORM_NS.hasField), node))
+                if class_term is not None:
+                    statements.append((node, self.rdf_type, class_term))
+                statements.append((node, self.term(RDFS.label), label_term))
+                statements.append((node, self.term(RDF.value), self.literal(item, datatype_term)))
+        return statements, skipped
+
+
+# Gera o texto da exportação, uma submissão por vez (sem manter todas na memória)
+def export_lines(submissions, resolver, export_format='nt', stats=None):
+    renderer = StatementRenderer(resolver, export_format)
+    yield renderer.header()
+    for submission in submissions:
+        statements, skipped = renderer.submission(submission)
+        if stats is not None:
+            stats['submissions'] = stats.get('submissions', 0) + 1
+            stats['triples'] = stats.get('triples', 0) + len(statements)
+            stats['skipped_fields'] = stats.get('skipped_fields', 0) + len(skipped)
+        yield ''.join(f"{s} {p} {o} .\n" for s, p, o in statements)
+
+
+# Linha de comando: exporta todas as submissões armazenadas em N-Triples ou Turtle
+def main(argv=None):
+    from ontology_store import registry
+    from submission_store import SubmissionStore, DEFAULT_SUBMISSIONS_PATH
+
+    parser = argparse.ArgumentParser(description='Exporta as submissões como indivíduos RDF.')
+    parser.add_argument('--db', default=DEFAULT_SUBMISSIONS_PATH, help='arquivo SQLite das submissões')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='nt')
+    parser.add_argument('--output', help='arquivo de saída (padrão: saída padrão)')
+    parser.add_argument('--class', dest='class_uri', help='exporta só as submissões desta classe')
+    parser.add_argument('--ontology', choices=registry.names(), help='ontologia dos formulários (padrão: a padrão do servidor)')
+    args = parser.parse_args(argv)
+
+    resolver = FieldResolver(registry.store(args.ontology).get())
+    submissions = SubmissionStore(args.db).iter_all(args.class_uri)
+    stats = {}
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for chunk in export_lines(submissions, resolver, args.format, stats):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+    print(f"{stats.get('submissions', 0)} submissões, {stats.get('triples', 0)} triplos, "
+          f"{stats.get('skipped_fields', 0)} campos não reconhecidos", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+import argparse
+import collections
+import csv
+import gc
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import o_parse_back_end as op
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+# Registros validados por tarefa (um bloco por vez em cada processo do pool)
+IMPORT_CHUNK_SIZE = 2000
+
+# Submissões gravadas por transação na importação pela linha de comando
+IMPORT_WRITE_BATCH_SIZE = 5000
+
+# Processos de validação do endpoint /submissions/import (o servidor já roda vários workers)
+IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', '1'))
+
+# Separador de valores nas células CSV de campos de seleção (o front-end permite escolher várias opções)
+MULTI_VALUE_SEPARATOR = '|'
+
+# Intervalo entre as linhas de progresso da linha de comando, em segundos
+PROGRESS_INTERVAL = 1.0
+
+
+# Traduz as colunas de um arquivo para as chaves do formulário da classe ("label da classe relacionada-URI da
+# propriedade", no idioma da importação). A coluna pode ter a própria chave (em qualquer idioma), o label da
+# classe relacionada (em qualquer idioma) ou a URI dela; campos dinâmicos de subclasse passam sem tradução.
+class ColumnMapper:
+    def __init__(self, snapshot, class_uri, language='pt', validator=None):
+        self.validator = validator if validator is not None else snapshot.validators().get(class_uri)
+        keys = {}
+        aliases = {}
+        self.multiple = set()
+        for field_language in op.SUPPORTED_LANGUAGES:
+            for field in snapshot.form_bundle(field_language).details(class_uri).payload:
+                identity = (field["property"], field["relatedClassUri"])
+                key = f'{field["relatedClass"]}-{field["property"]}'
+                if field_language == language:
+                    keys[identity] = key
+                    if "options" in field:
+                        self.multiple.add(key)
+                for name in (key, field["relatedClass"], field["relatedClassUri"]):
+                    aliases.setdefault(name, set()).add(identity)
+        # Nome de coluna → chaves possíveis no idioma da importação (mais de uma: coluna ambígua)
+        self.aliases = {name: sorted(keys[identity] for identity in identities) for name, identities in aliases.items()}
+        self._resolved = {}
+
+    # Chave do formulário de uma coluna; ValueError se a coluna é desconhecida ou ambígua
+    def resolve(self, column):
+        try:
+            return self._resolved[column]
+        except KeyError:
+            pass
+        name = column.strip()
+        candidates = self.aliases.get(name)
+        if candidates is None:
+            if not self.validator.is_dynamic_key(name):
+                raise ValueError(f"unknown column: {column!r}")
+            key = name
+        elif len(candidates) > 1:
+            raise ValueError(f"ambiguous column {column!r}: use one of {candidates}")
+        else:
+            key = candidates[0]
+        self._resolved[column] = key
+        return key
+
+    # Chaves de todas as colunas do cabeçalho; ValueError com todas as colunas que não puderam ser traduzidas
+    def map_columns(self, header):
+        keys, problems = [], []
+        for column in header:
+            try:
+                keys.append(self.resolve(column))
+            except ValueError as error:
+                problems.append(str(error))
+        if problems:
+            raise ValueError('; '.join(problems))
+        if len(set(keys)) != len(keys):
+            raise ValueError("several columns map to the same form field")
+        return keys
+
+
+# Registros (linha, dados) de um arquivo CSV com cabeçalho. Células vazias são omitidas e as de campos de
+# seleção aceitam vários valores separados por MULTI_VALUE_SEPARATOR. Um registro malformado (inclusive um
+# que o módulo csv recusa, como uma célula maior que csv.field_size_limit()) vem com a mensagem de erro no
+# lugar dos dados; a leitura continua na linha seguinte.
+def read_csv(stream, mapper):
+    reader = csv.reader(stream)
+    try:
+        header = next(reader, None)
+    except csv.Error as error:
+        raise ValueError(f'invalid CSV header: {error}')
+    if header is None:
+        return
+    keys = mapper.map_columns(header)
+    multiple = [key for key in keys if key in mapper.multiple]
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield reader.line_num, f'invalid CSV: {error}'
+            continue
+        if not any(row):
+            continue
+        if len(row) > len(keys):
+            yield reader.line_num, f'row has {len(row)} cells but the header has {len(keys)} columns'
+            continue
+        data = dict(zip(keys, row))
+        if '' in data.values():
+            data = {key: value for key, value in data.items() if value != ''}
+        for key in multiple:
+            if key in data:
+                data[key] = data[key].split(MULTI_VALUE_SEPARATOR)
+        yield reader.line_num, data
+
+
+# Registros (linha, dados) de um arquivo JSON Lines: um objeto por linha, com as chaves traduzidas como colunas
+def read_jsonl(stream, mapper):
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield line_number, f'invalid JSON: {error}'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, 'form data must be a JSON object'
+            continue
+        try:
+            yield line_number, {mapper.resolve(column): value for column, value in record.items()}
+        except ValueError as error:
+            yield line_number, str(error)
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl}
+
+
+# Valida um bloco de registros; retorna (dados válidos, [(linha, erros)] dos inválidos)
+def validate_chunk(validator, chunk):
+    valid, invalid = [], []
+    for line, data in chunk:
+        errors = {'': [data]} if isinstance(data, str) else validator.validate(data)
+        if errors:
+            invalid.append((line, errors))
+        else:
+            valid.append(data)
+    return valid, invalid
+
+
+# Validador de cada processo do pool (com fork, a ontologia já carregada no processo pai é herdada)
+_worker_validator = None
+
+
+def _init_worker(ontology, class_uri):
+    global _worker_validator
+    from ontology_store import registry
+    _worker_validator = registry.store(ontology).get().validators().get(class_uri)
+
+
+def _validate_in_worker(chunk):
+    return validate_chunk(_worker_validator, chunk)
+
+
+def _chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Importa os registros de uma classe: valida em blocos (em workers processos, se mais de um) e grava os válidos
+# em lote, na ordem do arquivo. on_error(linha, erros) recebe cada registro inválido e progress(stats) é chamado
+# a cada bloco. Retorna as contagens: linhas lidas, gravadas e inválidas.
+def import_records(records, store, validator, class_uri, ontology=None, workers=1, chunk_size=IMPORT_CHUNK_SIZE,
+                   on_error=None, progress=None, dry_run=False):
+    stats = {"rows": 0, "imported": 0, "invalid": 0}
+    start = time.perf_counter()
+
+    def collect(result):
+        valid, invalid = result
+        stats["rows"] += len(valid) + len(invalid)
+        stats["invalid"] += len(invalid)
+        if valid and not dry_run:
+            store.save_many(valid, class_uri)
+        stats["imported"] += len(valid)
+        if on_error is not None:
+            for line, errors in invalid:
+                on_error(line, errors)
+        if progress is not None:
+            progress(dict(stats, seconds=time.perf_counter() - start))
+
+    chunks = _chunks(records, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            collect(validate_chunk(validator, chunk))
+    else:
+        # No máximo dois blocos por processo em andamento: o arquivo é lido conforme a validação avança
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(ontology, class_uri)) as executor:
+            pending = collections.deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_validate_in_worker, chunk))
+                if len(pending) >= 2 * workers:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+    if not dry_run:
+        store.flush()
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+# Abre o arquivo de entrada como texto (o BOM do Excel é ignorado)
+def open_text(binary_stream):
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+
+
+# Linha de comando: importa um arquivo CSV ou JSONL de submissões de uma classe
+def main(argv=None):
+    from ontology_store import registry
+    from submission_store import SubmissionStore, DEFAULT_SUBMISSIONS_PATH
+
+    parser = argparse.ArgumentParser(description='Importa submissões de formulários em lote (CSV ou JSONL).')
+    parser.add_argument('input', help='arquivo CSV ou JSONL ("-" para a entrada padrão)')
+    parser.add_argument('--class', dest='class_uri', required=True, help='classe do formulário das submissões')
+    parser.add_argument('--format', choices=IMPORT_FORMATS, help='formato do arquivo (padrão: pela extensão)')
+    parser.add_argument('--lang', default='pt', choices=op.SUPPORTED_LANGUAGES, help='idioma das chaves gravadas')
+    parser.add_argument('--ontology', choices=registry.names(), help='ontologia dos formulários (padrão: a padrão do servidor)')
+    parser.add_argument('--db', default=DEFAULT_SUBMISSIONS_PATH, help='arquivo SQLite das submissões')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='processos de validação')
+    parser.add_argument('--errors', help='arquivo com os erros por linha (padrão: saída padrão)')
+    parser.add_argument('--dry-run', action='store_true', help='só valida, sem gravar')
+    args = parser.parse_args(argv)
+
+    import_format = args.format or ('jsonl' if args.input.endswith(('.jsonl', '.ndjson')) else 'csv')
+    snapshot = registry.store(args.ontology).get()
+    validator = snapshot.validators().get(args.class_uri)
+    if validator is None:
+        parser.error(f'classe sem formulário: {args.class_uri}')
+    mapper = ColumnMapper(snapshot, args.class_uri, args.lang, validator)
+    # A ontologia carregada não muda mais: fora das varreduras do coletor de lixo (e compartilhada com os
+    # processos do pool sem cópia), como em wsgi.py
+    gc.freeze()
+    store = SubmissionStore(args.db, batch_size=IMPORT_WRITE_BATCH_SIZE)
+
+    last_report = [0.0]
+
+    def progress(stats):
+        if stats["seconds"] - last_report[0] >= PROGRESS_INTERVAL:
+            last_report[0] = stats["seconds"]
+            print(f'{stats["rows"]} linhas, {stats["imported"]} gravadas, {stats["invalid"]} inválidas '
+                  f'({stats["rows"] / stats["seconds"]:.0f}/s)', file=sys.stderr)
+
+    source = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    out = open(args.errors, 'w', encoding='utf-8') if args.errors else sys.stdout
+    try:
+        def on_error(line, errors):
+            out.write(json.dumps({"row": line, "errors": errors}, ensure_ascii=False) + '\n')
+
+        records = READERS[import_format](open_text(source), mapper)
+        stats = import_records(records, store, validator, args.class_uri, args.ontology, args.workers,
+                               on_error=on_error, progress=progress, dry_run=args.dry_run)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        if args.errors:
+            out.close()
+        if source is not sys.stdin.buffer:
+            source.close()
+    print(f'{stats["rows"]} linhas em {stats["seconds"]:.2f}s '
+          f'({stats["rows"] / stats["seconds"] if stats["seconds"] else 0:.0f}/s): '
+          f'{stats["imported"]} {"válidas" if args.dry_run else "gravadas"}, {stats["invalid"]} inválidas',
+          file=sys.stderr)
+    return 1 if stats["invalid"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
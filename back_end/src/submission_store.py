@@ -0,0 +1,173 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+# Arquivo SQLite das submissões de formulários
+DEFAULT_SUBMISSIONS_PATH = os.environ.get('SUBMISSIONS_DB', 'submissions.sqlite3')
+
+# Quantidade máxima de submissões gravadas por transação
+WRITE_BATCH_SIZE = 500
+
+logger = logging.getLogger('aui.submissions')
+
+# Codificador reutilizado (json.dumps com opções cria um codificador novo a cada chamada)
+_encoder = json.JSONEncoder(ensure_ascii=False)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    class_uri TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submissions_class ON submissions (class_uri, seq);
+"""
+
+
+def _row_to_submission(row):
+    seq, submission_id, created_at, class_uri, data = row
+    return {
+        "seq": seq,
+        "id": submission_id,
+        "created_at": created_at,
+        "class": class_uri,
+        "data": json.loads(data),
+    }
+
+
+# Armazena submissões só por inserção (nunca sobrescreve), em SQLite no modo WAL.
+# As gravações entram em uma fila e uma thread as grava em lotes, uma transação (e um fsync) por lote.
+class SubmissionStore:
+    def __init__(self, path=DEFAULT_SUBMISSIONS_PATH, batch_size=WRITE_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_pid = None
+        self._writer_lock = threading.Lock()
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    # Conexão de leitura da thread atual
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return conn
+
+    # Inicia a thread de gravação (uma por processo, também depois de um fork)
+    def _ensure_writer(self):
+        if self._writer_pid == os.getpid() and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer_pid != os.getpid() or not self._writer.is_alive():
+                self._queue = queue.Queue()
+                self._writer = threading.Thread(target=self._write_loop, name='submission-writer', daemon=True)
+                self._writer.start()
+                self._writer_pid = os.getpid()
+                # As submissões já confirmadas ao cliente são gravadas antes de o processo terminar
+                # (gunicorn.conf.py também chama flush() em worker_exit)
+                atexit.register(self.flush)
+
+    # Cada item da fila é (registros de um save_many, evento avisado após a gravação ou None); itens são
+    # juntados até batch_size registros por transação
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            while size < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                size += len(batch[-1][0])
+            rows = [record for records, done in batch for record in records]
+            try:
+                with conn:
+                    conn.executemany(
+                        'INSERT INTO submissions (id, created_at, class_uri, data) VALUES (?, ?, ?, ?)', rows)
+            except Exception:
+                # A thread continua gravando os próximos lotes; os identificadores perdidos ficam no log
+                logger.exception('failed to write %d submissions: %s', len(rows), ' '.join(row[0] for row in rows))
+            finally:
+                for records, done in batch:
+                    if done is not None:
+                        done.set()
+                    self._queue.task_done()
+
+    # Enfileira uma submissão e retorna seu identificador; com wait=True espera a gravação em disco
+    def save(self, data, class_uri=None, wait=False):
+        return self.save_many([data], class_uri, wait)[0]
+
+    # Enfileira várias submissões da mesma classe de uma vez (um único item na fila de gravação)
+    def save_many(self, items, class_uri=None, wait=False):
+        self._ensure_writer()
+        ids = []
+        records = []
+        created_at = time.time()
+        # Bytes aleatórios de todos os identificadores (UUID4) lidos de uma vez, não um os.urandom por submissão
+        random_bytes = os.urandom(16 * len(items))
+        for i, data in enumerate(items):
+            submission_id = uuid.UUID(bytes=random_bytes[16 * i:16 * i + 16], version=4).hex
+            ids.append(submission_id)
+            records.append((submission_id, created_at, class_uri, _encoder.encode(data)))
+        done = threading.Event() if wait else None
+        self._queue.put((records, done))
+        if wait:
+            done.wait()
+        return ids
+
+    # Espera até que todas as submissões enfileiradas estejam gravadas
+    def flush(self):
+        if self._writer_pid == os.getpid() and self._writer.is_alive():
+            self._queue.join()
+
+    # Busca uma submissão pelo identificador (None se não existir)
+    def get(self, submission_id):
+        self.flush()
+        row = self._reader().execute(
+            'SELECT seq, id, created_at, class_uri, data FROM submissions WHERE id = ?', (submission_id,)
+        ).fetchone()
+        return _row_to_submission(row) if row else None
+
+    # Lista submissões em ordem de chegada, paginando pelo cursor "after" (seq da última já vista)
+    def list(self, limit=50, after=0, class_uri=None):
+        self.flush()
+        query = 'SELECT seq, id, created_at, class_uri, data FROM submissions WHERE seq > ?'
+        params = [after]
+        if class_uri:
+            query += ' AND class_uri = ?'
+            params.append(class_uri)
+        query += ' ORDER BY seq LIMIT ?'
+        params.append(limit)
+        return [_row_to_submission(row) for row in self._reader().execute(query, params)]
+
+    # Percorre todas as submissões em blocos, sem carregar tudo na memória
+    def iter_all(self, class_uri=None, chunk_size=1000):
+        after = 0
+        while True:
+            chunk = self.list(chunk_size, after, class_uri)
+            if not chunk:
+                return
+            yield from chunk
+            after = chunk[-1]["seq"]
+
+    def count(self):
+        self.flush()
+        return self._reader().execute('SELECT COUNT(*) FROM submissions').fetchone()[0]
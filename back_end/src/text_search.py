@@ -0,0 +1,124 @@
+import bisect
+import re
+import unicodedata
+
+
+# Normaliza texto para busca: sem acentos, minúsculo e com espaços simples
+def normalize(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+# Índice de prefixos sobre textos: encontra os itens cujo texto (ou qualquer palavra dele em diante)
+# começa com a consulta, com busca binária em uma lista ordenada
+class PrefixIndex:
+    def __init__(self, entries):
+        keys = []
+        for item_id, text in entries:
+            words = normalize(text).split(' ')
+            for position in range(len(words)):
+                keys.append((' '.join(words[position:]), item_id))
+        keys.sort()
+        self._keys = [key for key, item_id in keys]
+        self._ids = [item_id for key, item_id in keys]
+
+    # Identificadores dos itens que casam com a consulta, sem repetição
+    def search(self, query, limit=None):
+        query = normalize(query)
+        found = {}
+        position = bisect.bisect_left(self._keys, query)
+        while position < len(self._keys) and self._keys[position].startswith(query):
+            found.setdefault(self._ids[position], None)
+            if limit is not None and len(found) >= limit:
+                break
+            position += 1
+        return list(found)
+
+
+# Tamanho mínimo de uma palavra da consulta para a busca aproximada (palavras curtas casariam com quase tudo)
+FUZZY_MIN_LENGTH = 4
+
+
+# Palavras de um texto normalizado (sem pontuação)
+def words(text):
+    return re.findall(r'\w+', normalize(text))
+
+
+# Variantes de uma palavra sem uma das letras (vizinhança de deleção usada na busca aproximada)
+def deletions(word):
+    return {word[:position] + word[position + 1:] for position in range(len(word))}
+
+
+# Distância de edição entre duas palavras, contando a troca de duas letras vizinhas como um erro
+def edit_distance(a, b):
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before_previous[j - 2] + 1)
+        before_previous, previous = previous, current
+    return previous[-1]
+
+
+# Índice invertido de palavras: encontra os itens que contêm todas as palavras da consulta, cada uma como
+# palavra inteira, como início de palavra ou (a partir de FUZZY_MIN_LENGTH letras) com um erro de digitação
+class WordIndex:
+    # Custo de cada tipo de casamento de uma palavra da consulta (menor é melhor)
+    EXACT, PREFIX, FUZZY = 0, 1, 2
+
+    def __init__(self, entries):
+        postings = {}
+        for item_id, text in entries:
+            for word in dict.fromkeys(words(text)):
+                postings.setdefault(word, []).append(item_id)
+        self._words = sorted(postings)
+        self._postings = [postings[word] for word in self._words]
+
+        # Vizinhança de deleção dos prefixos de cada palavra: chave → posições em self._words.
+        # Um prefixo a um erro da consulta tem uma chave em comum com ela (a consulta ou uma de suas deleções).
+        self._fuzzy = {}
+        for position, word in enumerate(self._words):
+            for length in range(FUZZY_MIN_LENGTH - 1, len(word) + 1):
+                prefix = word[:length]
+                keys = deletions(prefix) | {prefix} if length >= FUZZY_MIN_LENGTH else (prefix,)
+                for key in keys:
+                    positions = self._fuzzy.setdefault(key, [])
+                    if not positions or positions[-1] != position:
+                        positions.append(position)
+
+    # Posições das palavras do índice que casam com uma palavra da consulta → custo do casamento
+    def _matches(self, word):
+        matches = {}
+        position = bisect.bisect_left(self._words, word)
+        while position < len(self._words) and self._words[position].startswith(word):
+            matches[position] = self.EXACT if self._words[position] == word else self.PREFIX
+            position += 1
+        if len(word) >= FUZZY_MIN_LENGTH:
+            candidates = set()
+            for key in deletions(word) | {word}:
+                candidates.update(self._fuzzy.get(key, ()))
+            for position in candidates.difference(matches):
+                candidate = self._words[position]
+                lengths = (length for length in (len(word) - 1, len(word), len(word) + 1) if length <= len(candidate))
+                if any(edit_distance(word, candidate[:length]) <= 1 for length in lengths):
+                    matches[position] = self.FUZZY
+        return matches
+
+    # Itens que contêm todas as palavras da consulta → custo total (soma dos custos de cada palavra)
+    def search(self, query):
+        result = None
+        # Palavras mais longas primeiro: costumam ser as mais seletivas
+        for word in sorted(set(words(query)), key=len, reverse=True):
+            costs = {}
+            for position, cost in self._matches(word).items():
+                for item_id in self._postings[position]:
+                    if (result is None or item_id in result) and cost < costs.get(item_id, cost + 1):
+                        costs[item_id] = cost
+            result = costs if result is None else {item_id: result[item_id] + cost for item_id, cost in costs.items()}
+            if not result:
+                break
+        return result or {}
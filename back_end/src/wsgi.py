@@ -0,0 +1,22 @@
+import gc
+import os
+
+from app import app
+from ontology_store import registry
+
+# Ontologias carregadas antes do fork (separadas por vírgula; padrão: só a ontologia padrão).
+# As demais são carregadas por cada worker no primeiro uso.
+PRELOAD_ONTOLOGIES = os.environ.get('PRELOAD_ONTOLOGIES', registry.default)
+
+# Entrada WSGI de produção (ex.: gunicorn -c gunicorn.conf.py wsgi:application).
+# A ontologia é carregada e os formulários compilados aqui, na importação: com preload_app o processo
+# mestre faz isso uma única vez antes do fork e os workers compartilham essas páginas (copy-on-write).
+for name in PRELOAD_ONTOLOGIES.split(','):
+    if name.strip():
+        registry.store(name.strip()).get().warm()
+
+# Move os objetos já criados para a geração permanente do coletor de lixo, para que as coletas nos
+# workers não toquem nessas páginas (o que as copiaria para cada processo)
+gc.freeze()
+
+application = app
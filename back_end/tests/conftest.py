@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+# O app abre o banco de submissões ao ser importado: nos testes, um arquivo temporário em vez do padrão
+os.environ.setdefault('SUBMISSIONS_DB', os.path.join(tempfile.mkdtemp(), 'submissions.sqlite3'))
+
+from ontology_store import ONTOLOGIES, registry  # noqa: E402
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+ALDEIAS_PATH = ONTOLOGIES['aldeias'][0]
+SESAI_PATH = ONTOLOGIES['sesai'][0]
+
+
+# Snapshot compartilhado da ontologia dos formulários (aldeias), carregado uma vez por sessão
+@pytest.fixture(scope='session')
+def aldeias():
+    return registry.store('aldeias').get()
+
+
+@pytest.fixture(scope='session')
+def client():
+    from app import app
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+# Submissão válida com todos os campos do formulário da classe (chaves no idioma pedido)
+def complete_submission(snapshot, class_uri, language='pt'):
+    data = {}
+    for field in snapshot.form_bundle(language).details(class_uri).payload:
+        data_type = (field.get("dataType") or [''])[0]
+        if "options" in field:
+            value = field["options"][0]["label"]
+        elif data_type == XSD + 'boolean':
+            value = 'true'
+        elif data_type == XSD + 'integer':
+            value = '3'
+        else:
+            value = 'texto'
+        data[f'{field["relatedClass"]}-{field["property"]}'] = value
+    return data
@@ -0,0 +1,19 @@
+import pytest
+
+ROOT = 'http://www.semanticweb.org/ontologias/SESAI/ontoAldeias_00000557'
+
+
+@pytest.mark.parametrize('body', [[], 'classes', 1, None])
+def test_batch_rejects_non_object_body(client, body):
+    response = client.post('/batch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_batch_response_varies_by_language_without_etag(client):
+    response = client.post('/batch', json={'classes': [ROOT]}, query_string={'lang': 'en'})
+    assert response.status_code == 200
+    assert response.get_json()['language'] == 'en'
+    assert ROOT in response.get_json()['results']
+    assert 'ETag' not in response.headers
+    assert {'Accept-Encoding', 'Accept-Language', 'Cookie'} <= set(response.vary)
@@ -0,0 +1,63 @@
+from rdflib import BNode, Graph, Namespace, OWL, RDF, RDFS
+
+import o_parse_back_end as op
+from class_hierarchy import ClassHierarchy
+from conftest import ALDEIAS_PATH
+
+EX = Namespace('http://example.org/')
+
+
+# root ← a, b ← d ← e (losango: d tem duas superclasses, e uma restrição anônima); root ← x ⇄ y ← z (ciclo)
+def sample_graph():
+    graph = Graph()
+    restriction = BNode()
+    graph.add((restriction, RDF.type, OWL.Restriction))
+    for child, parent in [(EX.a, EX.root), (EX.b, EX.root), (EX.d, EX.a), (EX.d, EX.b), (EX.d, restriction),
+                          (EX.e, EX.d), (EX.x, EX.root), (EX.x, EX.y), (EX.y, EX.x), (EX.z, EX.x)]:
+        graph.add((child, RDFS.subClassOf, parent))
+    return graph, restriction
+
+
+def test_diamond():
+    graph, restriction = sample_graph()
+    hierarchy = ClassHierarchy(graph)
+    assert hierarchy.parents_of(EX.d) == [EX.a, EX.b]
+    assert set(hierarchy.superclasses_of(EX.d)) == {EX.a, EX.b, restriction}
+    assert hierarchy.ancestors_of(EX.e) == {EX.d, EX.a, EX.b, EX.root}
+    assert hierarchy.descendants_of(EX.a) == {EX.d, EX.e}
+    assert hierarchy.descendants_of(EX.root) == {EX.a, EX.b, EX.d, EX.e, EX.x, EX.y, EX.z}
+    assert hierarchy.is_subclass_of(EX.e, EX.b)
+    assert not hierarchy.is_subclass_of(EX.a, EX.b)
+    assert restriction not in hierarchy.classes
+
+
+def test_cycle_terminates():
+    hierarchy = ClassHierarchy(sample_graph()[0])
+    assert hierarchy.ancestors_of(EX.x) == {EX.y, EX.root}
+    assert hierarchy.ancestors_of(EX.z) == {EX.x, EX.y, EX.root}
+    assert hierarchy.descendants_of(EX.x) == {EX.y, EX.z}
+    assert hierarchy.is_subclass_of(EX.x, EX.y) and hierarchy.is_subclass_of(EX.y, EX.x)
+    assert hierarchy.ancestors_of(EX.unknown) == frozenset()
+    assert hierarchy.descendants_of(EX.unknown) == frozenset()
+
+
+def test_topological_order_and_cycles():
+    hierarchy = ClassHierarchy(sample_graph()[0])
+    order = hierarchy.topological_order
+    # As classes do ciclo (e as que só descendem dele) ficam no final, em ordem
+    assert hierarchy.cycles == [EX.x, EX.y, EX.z]
+    assert order[-3:] == hierarchy.cycles
+    assert sorted(order) == sorted(hierarchy.classes)
+    position = {cls: index for index, cls in enumerate(order)}
+    for child, parents in hierarchy.parents.items():
+        if child not in hierarchy.cycles:
+            assert all(position[parent] < position[child] for parent in parents)
+    assert ClassHierarchy(sample_graph()[0]).topological_order == order
+
+
+def test_shipped_ontology_has_no_cycles(aldeias):
+    hierarchy = aldeias.hierarchy()
+    assert hierarchy.cycles == []
+    assert sorted(hierarchy.topological_order) == sorted(hierarchy.classes)
+    # A ordem segue a do arquivo: a mesma a cada leitura
+    assert ClassHierarchy(op.load_ontology(ALDEIAS_PATH)).topological_order == hierarchy.topological_order
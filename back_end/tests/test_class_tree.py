@@ -0,0 +1,94 @@
+import json
+import time
+
+import pytest
+from rdflib import Graph, Namespace, RDFS
+
+import prompt as pr
+from class_hierarchy import ClassHierarchy
+
+EX = Namespace('http://example.org/')
+
+
+def build_tree(graph, root, depth=None):
+    return pr.build_class_tree(graph, str(root), {}, {}, ClassHierarchy(graph), depth)
+
+
+# Camadas de duas classes, cada uma subclasse das duas da camada anterior: 2^layers caminhos até a última
+def diamond_graph(layers):
+    graph = Graph()
+    for layer in range(layers):
+        for child in (EX[f'c{layer + 1}a'], EX[f'c{layer + 1}b']):
+            for parent in (EX[f'c{layer}a'], EX[f'c{layer}b']):
+                graph.add((child, RDFS.subClassOf, parent))
+    graph.add((EX.c0a, RDFS.subClassOf, EX.root))
+    graph.add((EX.c0b, RDFS.subClassOf, EX.root))
+    return graph
+
+
+@pytest.mark.parametrize('depth', [None, 50])
+def test_diamonds_are_expanded_once(depth):
+    start = time.perf_counter()
+    tree = build_tree(diamond_graph(40), EX.root, depth)
+    assert len(json.dumps(tree)) < 100000
+    assert time.perf_counter() - start < 5
+    first, second = tree["subclasses"]
+    assert [node["uri"] for node in first["subclasses"]] == [str(EX.c1a), str(EX.c1b)]
+    # Sob a segunda superclasse, as subclasses já expandidas aparecem só como referência
+    assert second["subclasses"][0] == {"uri": str(EX.c1a), "label": str(EX.c1a), "leaf": False, "repeated": True}
+    node = first
+    for _ in range(40):
+        node = node["subclasses"][0]
+    assert node == {"uri": str(EX.c40a), "label": str(EX.c40a), "leaf": True}
+
+
+def test_depth_limit():
+    tree = build_tree(diamond_graph(3), EX.root, depth=1)
+    assert [node["leaf"] for node in tree["subclasses"]] == [False, False]
+    assert all("subclasses" not in node and "repeated" not in node for node in tree["subclasses"])
+
+
+def test_class_first_reached_deeper_is_expanded_again_higher():
+    graph = Graph()
+    graph.add((EX.a, RDFS.subClassOf, EX.root))
+    graph.add((EX.shared, RDFS.subClassOf, EX.a))
+    graph.add((EX.shared, RDFS.subClassOf, EX.root))
+    graph.add((EX.child, RDFS.subClassOf, EX.shared))
+    graph.add((EX.deep, RDFS.subClassOf, EX.child))
+    tree = build_tree(graph, EX.root, depth=3)
+    a, shared = tree["subclasses"]
+    # Em root → a → shared, o limite de profundidade corta child; direto na raiz, shared tem um nível a mais
+    assert a["subclasses"][0]["subclasses"][0] == {"uri": str(EX.child), "label": str(EX.child), "leaf": False}
+    assert shared["subclasses"][0]["subclasses"][0]["uri"] == str(EX.deep)
+
+
+def test_cycles_are_cut():
+    graph = Graph()
+    graph.add((EX.a, RDFS.subClassOf, EX.root))
+    graph.add((EX.b, RDFS.subClassOf, EX.a))
+    graph.add((EX.a, RDFS.subClassOf, EX.b))
+    tree = build_tree(graph, EX.root)
+    (a,) = tree["subclasses"]
+    (b,) = a["subclasses"]
+    assert b == {"uri": str(EX.b), "label": str(EX.b), "leaf": True}
+
+
+def test_get_class_tree(client, aldeias):
+    response = client.get('/get_class_tree', query_string={'depth': 1})
+    assert response.status_code == 200
+    tree = response.get_json()
+    assert tree["uri"] == aldeias.root_uri
+    assert tree["subclasses"] and all("subclasses" not in node for node in tree["subclasses"])
+
+
+def test_get_class_tree_unknown_root(caplog, client):
+    for root in ('foo bar', 'http://example.org/NaoExiste'):
+        response = client.get('/get_class_tree', query_string={'root': root})
+        assert response.status_code == 404
+        assert response.get_json() == {"error": f"unknown class: {root}"}
+    assert 'does not look like a valid URI' not in caplog.text
+
+
+def test_get_class_tree_invalid_depth(client):
+    assert client.get('/get_class_tree', query_string={'depth': 'x'}).status_code == 400
+    assert client.get('/get_class_tree', query_string={'depth': -1}).status_code == 400
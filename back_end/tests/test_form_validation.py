@@ -0,0 +1,126 @@
+import pytest
+
+from conftest import XSD, complete_submission
+from form_validation import FieldRule, cardinality_bounds
+
+CLASS_URI = 'http://www.semanticweb.org/ontologias/SESAI/ontoAldeias_00000499'
+
+
+def rule(data_type=None, cardinality=None, **restrictions):
+    field = {"dataType": [XSD + data_type] if data_type else [], "cardinality": cardinality,
+             "restrictions": {f'xsd:{name}': value for name, value in restrictions.items()}}
+    compiled = FieldRule()
+    compiled.add('campo', field)
+    return compiled
+
+
+@pytest.mark.parametrize('cardinality, bounds', [
+    ('some', (1, None)), ('only', (1, None)), ('exactly 2', (2, 2)), ('min 1', (1, None)),
+    ('max 1', (0, 1)), (None, (0, None)), ('value x', (0, None)),
+])
+def test_cardinality_bounds(cardinality, bounds):
+    assert cardinality_bounds(cardinality) == bounds
+
+
+def test_required_and_maximum_count():
+    assert rule(cardinality='some').validate({}) == ['is required']
+    assert rule(cardinality='some').validate({'campo': ''}) == ['is required']
+    assert rule(cardinality='some').validate({'campo': 'x'}) == []
+    assert rule(cardinality='max 1').validate({'campo': ['a', 'b']}) == ['accepts at most 1 value']
+    assert rule(cardinality='min 2').validate({'campo': ['a']}) == ['requires at least 2 values']
+
+
+@pytest.mark.parametrize('value, valid', [
+    ('true', True), ('false', True), ('1', True), ('0', True), (True, True), (False, True),
+    ('sim', False), ('True', False),
+])
+def test_boolean(value, valid):
+    assert (rule('boolean').validate({'campo': value}) == []) is valid
+
+
+@pytest.mark.parametrize('data_type, value, valid', [
+    ('date', '2024-02-29', True), ('date', '2023-02-29', False), ('date', '29-02-2024', False),
+    ('time', '08:30', True), ('time', '25:00', False),
+    ('dateTime', '2024-01-01T08:30:00', True), ('dateTime', '2024-01-01 x', False),
+    ('integer', '-3', True), ('integer', '3.5', False), ('integer', 3, True),
+    ('nonNegativeInteger', '-1', False), ('positiveInteger', '0', False),
+    ('decimal', '2.50', True), ('decimal', '1e3', False), ('double', 'nan', False),
+    ('string', 'qualquer texto', True),
+])
+def test_datatypes(data_type, value, valid):
+    assert (rule(data_type).validate({'campo': value}) == []) is valid
+
+
+def test_facets():
+    assert rule('string', maxLength='3').validate({'campo': 'abcd'}) == ['must have at most 3 characters']
+    assert rule('string', minLength='2').validate({'campo': 'a'}) == ['must have at least 2 characters']
+    assert rule('string', pattern='[A-Z]{2}').validate({'campo': 'SP'}) == []
+    assert rule('string', pattern='[A-Z]{2}').validate({'campo': 'sp'}) == ['must match [A-Z]{2}']
+    assert rule('integer', minInclusive='1', maxExclusive='10').validate({'campo': '10'}) == ['must be less than 10']
+    assert rule('integer', minInclusive='1').validate({'campo': ['0', '5']}) == ["'0' must be at least 1"]
+    # Faceta malformada é ignorada
+    assert rule('string', maxLength='muitos').validate({'campo': 'abcd'}) == []
+
+
+def test_non_scalar_value():
+    assert rule('string').validate({'campo': {'a': 1}}) == ['must be a string, a number, a boolean or a list of them']
+
+
+@pytest.fixture(scope='module')
+def validator(aldeias):
+    return aldeias.validators().get(CLASS_URI)
+
+
+def test_unknown_class(aldeias):
+    assert aldeias.validators().get('http://example.org/nao-existe') is None
+
+
+@pytest.mark.parametrize('language', ['pt', 'en'])
+def test_complete_submission_is_valid(aldeias, validator, language):
+    assert validator.validate(complete_submission(aldeias, CLASS_URI, language)) == {}
+
+
+def test_missing_required_field(aldeias, validator):
+    data = complete_submission(aldeias, CLASS_URI)
+    required = [field_rule.keys[0] for field_rule in validator.rules if field_rule.min_count]
+    assert required
+    del data[required[0]]
+    assert validator.validate(data) == {required[0]: ['is required']}
+
+
+def test_invalid_values(aldeias, validator):
+    data = complete_submission(aldeias, CLASS_URI)
+    boolean_key = next(key for key in data if key.startswith('Aldeia é atendida por AISAN?-'))
+    options_key = next(key for key in data if key.startswith('Terra indígena-'))
+    data[boolean_key] = 'talvez'
+    data[options_key] = 'não é uma opção'
+    assert validator.validate(data) == {
+        boolean_key: ['must be true or false'],
+        options_key: ["'não é uma opção' is not one of the options"],
+    }
+
+
+def test_unknown_and_dynamic_keys(aldeias, validator):
+    data = complete_submission(aldeias, CLASS_URI)
+    data['campo inventado'] = 'x'
+    data[f'{aldeias.root_uri}-Insira um(a) atividade'] = 'x'
+    data['http://example.org/Classe-x'] = 'x'
+    assert validator.validate(data) == {
+        'campo inventado': ['is not a field of this form'],
+        'http://example.org/Classe-x': ['is not a field of this form'],
+    }
+
+
+def test_save_form_data_validates_with_class(client, aldeias):
+    response = client.post('/save_form_data', query_string={'class': CLASS_URI}, json={'campo inventado': 'x'})
+    assert response.status_code == 422
+    assert 'campo inventado' in response.get_json()['fields']
+    data = complete_submission(aldeias, CLASS_URI)
+    response = client.post('/save_form_data', query_string={'class': CLASS_URI}, json=data)
+    assert response.status_code == 200
+
+
+def test_keys_with_spaces_do_not_build_invalid_uris(caplog, aldeias, validator):
+    unknown = {'campo com espaço-e outro - hífen': 'x', 'http://example.org/a b-c': 'x'}
+    assert set(validator.validate({**complete_submission(aldeias, CLASS_URI), **unknown})) == set(unknown)
+    assert 'does not look like a valid URI' not in caplog.text
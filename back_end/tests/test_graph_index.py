@@ -0,0 +1,44 @@
+import pytest
+from rdflib import OWL, RDF, URIRef
+
+import o_parse_back_end as op
+from conftest import ALDEIAS_PATH, SESAI_PATH
+from graph_index import IndexedGraph, check_parity
+from ontology_store import ONTOLOGIES, registry
+
+ONTOLOGY_PATHS = {'aldeias': ALDEIAS_PATH, 'sesai': SESAI_PATH}
+
+
+@pytest.mark.parametrize('name', sorted(ONTOLOGY_PATHS))
+def test_check_parity(name):
+    differences, outputs, _ = check_parity(ONTOLOGY_PATHS[name])
+    assert outputs
+    assert differences == []
+
+
+# Registra a ontologia duas vezes no registry do app: uma servida pelo grafo do rdflib e outra pelo grafo compilado
+@pytest.fixture(scope='module', params=sorted(ONTOLOGY_PATHS))
+def ontology(request):
+    name = request.param
+    path, root_uri = ONTOLOGIES[name]
+    names = {}
+    for kind, compile_graph in (('rdflib', lambda g: g), ('indexed', IndexedGraph)):
+        names[kind] = f'parity-{kind}-{name}'
+        registry.register(names[kind], path, root_uri, compile_graph=compile_graph)
+    graph = registry.store(names['rdflib']).get().graph
+    classes = sorted({str(cls) for cls in graph.subjects(RDF.type, OWL.Class) if isinstance(cls, URIRef)})
+    yield names, classes
+    for store_name in names.values():
+        registry.unregister(store_name)
+
+
+@pytest.mark.parametrize('language', op.SUPPORTED_LANGUAGES)
+@pytest.mark.parametrize('endpoint', ['/get_subclasses', '/get_class_details'])
+def test_endpoint_parity(client, ontology, endpoint, language):
+    names, classes = ontology
+    assert classes
+    for class_uri in classes:
+        responses = {kind: client.get(endpoint, query_string={'class': class_uri, 'lang': language, 'ontology': name})
+                     for kind, name in names.items()}
+        assert responses['indexed'].status_code == responses['rdflib'].status_code, class_uri
+        assert responses['indexed'].get_json() == responses['rdflib'].get_json(), class_uri
@@ -0,0 +1,109 @@
+import os
+import re
+import shutil
+
+import pytest
+
+import ontology_store
+from conftest import ALDEIAS_PATH
+import o_parse_back_end as op
+from ontology_store import OntologyStore
+
+SESAI = 'http://www.semanticweb.org/ontologias/SESAI/'
+
+with open(ALDEIAS_PATH, encoding='utf-8') as f:
+    SOURCE = f.read()
+
+RESTRICTION = re.compile(r'\n        <rdfs:subClassOf>\n            <owl:Restriction>.*?</owl:Restriction>\n'
+                         r'        </rdfs:subClassOf>', re.S)
+DOMAIN = f'\n        <rdfs:domain rdf:resource="{SESAI}ontoAldeias_00000535"/>'
+
+# Identificador de BNode gerado pelo parser (muda a cada leitura do arquivo)
+BNODE_ID = re.compile(r'N[0-9a-f]{32}')
+
+
+# Troca o valor da primeira faceta xsd:maxLength da data property com domínio ontoAldeias_00000535
+def edit_facet(text):
+    start = text.index(DOMAIN)
+    position = text.index('<xsd:maxLength>50</xsd:maxLength>', start)
+    return text[:position] + '<xsd:maxLength>60</xsd:maxLength>' + text[position + 33:]
+
+
+# Remove a primeira restrição da classe ontoAldeias_00000499 (uma folha: poucas classes são afetadas)
+def edit_restriction_removal(text):
+    start = text.index(f'<owl:Class rdf:about="{SESAI}ontoAldeias_00000499">')
+    match = RESTRICTION.search(text, start)
+    assert match.end() < text.index('</owl:Class>', start)
+    return text[:match.start()] + text[match.end():]
+
+
+def edit_subclass_edge(text):
+    opening = f'<owl:Class rdf:about="{SESAI}ontoAldeias_00000500">\n'
+    return text.replace(opening, opening + f'        <rdfs:subClassOf rdf:resource="{SESAI}ontoAldeias_00000499"/>\n', 1)
+
+
+EDITS = {
+    'facet': edit_facet,
+    'label': lambda text: text.replace('>Alagoas e Sergipe<', '>Alagoas/Sergipe<', 1),
+    # O label passa a ser o de outra classe: muda a entidade apontada por labels_to_uris
+    'label_collision': lambda text: text.replace('>Nome do município<', '>Terra indígena<', 1),
+    'restriction_removal': edit_restriction_removal,
+    'subclass_edge': edit_subclass_edge,
+    'domain_removal': lambda text: text.replace(DOMAIN, '', 1),
+}
+
+
+# Labels, opções e esquemas de formulário da versão, sem os labels dos BNodes: a recarga completa lê o
+# arquivo de novo e os BNodes recebem outros identificadores
+def outputs(snapshot):
+    result = {}
+    for language in op.SUPPORTED_LANGUAGES:
+        result[f'labels.{language}'] = [
+            {str(key): value for key, value in index.items() if not BNODE_ID.fullmatch(str(key))}
+            for index in snapshot.labels(language)
+        ]
+        result[f'options.{language}'] = snapshot.options(language).options_by_class
+        result[f'form_bundle.{language}'] = snapshot.form_bundle(language).to_dict()["classes"]
+    return result
+
+
+@pytest.fixture
+def ontology_copy(tmp_path):
+    path = str(tmp_path / 'Onto_aldeias.owl')
+    shutil.copyfile(ALDEIAS_PATH, path)
+    return path
+
+
+def write(path, text):
+    mtime = os.path.getmtime(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.utime(path, (mtime + 1, mtime + 1))
+
+
+@pytest.mark.parametrize('edit', sorted(EDITS))
+def test_incremental_reload_matches_full_reload(monkeypatch, ontology_copy, edit):
+    monkeypatch.setattr(ontology_store, 'INCREMENTAL_MIN_TRIPLES', 0)
+    edited = EDITS[edit](SOURCE)
+    assert edited != SOURCE
+
+    store = OntologyStore(ontology_copy)
+    store.get().warm()
+    write(ontology_copy, edited)
+    incremental = store.get()
+    assert incremental.reload["mode"] == "incremental"
+    assert incremental.reload["removed_triples"] + incremental.reload["added_triples"] > 0
+    actual = outputs(incremental.warm())
+
+    full = store.reload(full=True)
+    assert full.reload["mode"] == "full"
+    assert outputs(full.warm()) == actual
+
+
+def test_small_graphs_reload_in_full(ontology_copy):
+    store = OntologyStore(ontology_copy)
+    store.get().warm()
+    write(ontology_copy, EDITS['label'](SOURCE))
+    snapshot = store.get()
+    assert len(snapshot.graph) < ontology_store.INCREMENTAL_MIN_TRIPLES
+    assert snapshot.reload == {"mode": "full"}
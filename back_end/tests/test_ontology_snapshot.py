@@ -0,0 +1,57 @@
+import logging
+import pickle
+
+import pytest
+from rdflib import BNode
+
+import o_parse_back_end as op
+from conftest import SESAI_PATH
+from ontology_snapshot import SNAPSHOT_FORMAT, file_sha256, read_snapshot, write_snapshot
+
+
+# Triplos sem BNodes (os identificadores dos BNodes mudam a cada parse) e o total de triplos
+def _content(graph):
+    return len(graph), {triple for triple in graph if not any(isinstance(term, BNode) for term in triple)}
+
+
+@pytest.fixture(scope='module')
+def parsed():
+    return op.load_ontology(SESAI_PATH)
+
+
+def test_snapshot_round_trip(tmp_path, parsed):
+    snapshot_path = str(tmp_path / 'sesai.snapshot')
+    assert write_snapshot(SESAI_PATH, snapshot_path) == len(parsed)
+    graph = read_snapshot(snapshot_path, file_sha256(SESAI_PATH))
+    assert graph is not None
+    assert _content(graph) == _content(parsed)
+
+
+def test_stale_snapshot_is_ignored(tmp_path):
+    snapshot_path = str(tmp_path / 'sesai.snapshot')
+    write_snapshot(SESAI_PATH, snapshot_path)
+    assert read_snapshot(snapshot_path, 'outra-versao') is None
+
+
+@pytest.mark.parametrize('content', [
+    b'',
+    b'nao e um pickle',
+    pickle.dumps(['lista', 'em', 'vez', 'de', 'dict']),
+    # Formato e versão corretos, mas triplos com índices fora da tabela de termos
+    None,
+    # Pickle que referencia uma classe inexistente (ex.: gravado por outra versão do rdflib)
+    b'\x80\x04\x95\x1a\x00\x00\x00\x00\x00\x00\x00\x8c\x06rdflib\x94\x8c\x0bNaoExiste\x94\x93\x94.',
+])
+def test_unreadable_snapshot_falls_back_to_owl(tmp_path, caplog, parsed, content):
+    snapshot_path = str(tmp_path / 'sesai.snapshot')
+    version = file_sha256(SESAI_PATH)
+    if content is None:
+        content = pickle.dumps({'format': SNAPSHOT_FORMAT, 'source_sha256': version, 'terms': [], 'triples': [(0, 1, 2)]})
+    with open(snapshot_path, 'wb') as f:
+        f.write(content)
+
+    with caplog.at_level(logging.WARNING, logger='aui.ontology'):
+        assert read_snapshot(snapshot_path, version) is None
+        graph = op.load_ontology(SESAI_PATH, snapshot_path, version)
+    assert _content(graph) == _content(parsed)
+    assert any(snapshot_path in record.getMessage() for record in caplog.records)
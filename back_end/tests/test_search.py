@@ -0,0 +1,146 @@
+import pytest
+from rdflib import Graph, Literal, Namespace, OWL, RDF, RDFS
+
+import o_parse_back_end as op
+from search_index import OntologySearch
+from text_search import PrefixIndex, WordIndex, edit_distance, normalize
+
+EX = Namespace('http://example.org/')
+
+
+def test_normalize():
+    assert normalize('  Água   POTÁVEL\tçã ') == 'agua potavel ca'
+
+
+@pytest.mark.parametrize('a, b, distance', [
+    ('aldeia', 'aldeia', 0), ('aldeia', 'aldiea', 1), ('aldeia', 'aldeja', 1), ('aldeia', 'aldeiaa', 1),
+    ('aldeia', 'adeia', 1), ('aldeia', 'adleai', 2),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b) == distance
+
+
+def test_prefix_index():
+    index = PrefixIndex(enumerate(['Terra Indígena', 'Aldeia Indígena', 'Água']))
+    assert index.search('indig') == [0, 1]
+    assert index.search('AGUA') == [2]
+    assert index.search('terra ind') == [0]
+
+
+@pytest.fixture(scope='module')
+def word_index():
+    return WordIndex(enumerate(['Nome da aldeia', 'Água potável', 'Almoxarifado', 'ald']))
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('aldeia', {0: WordIndex.EXACT}),
+    ('ALDEIA', {0: WordIndex.EXACT}),
+    ('agua', {1: WordIndex.EXACT}),
+    ('ald', {0: WordIndex.PREFIX, 3: WordIndex.EXACT}),
+    ('almox', {2: WordIndex.PREFIX}),
+    ('aldiea', {0: WordIndex.FUZZY}),     # letras trocadas
+    ('aldeja', {0: WordIndex.FUZZY}),     # letra errada
+    ('adeia', {0: WordIndex.FUZZY}),      # letra faltando
+    ('potavell', {1: WordIndex.FUZZY}),   # letra sobrando
+    ('potav', {1: WordIndex.PREFIX}),
+    ('potev', {1: WordIndex.FUZZY}),      # prefixo com um erro
+    ('alx', {}),                          # curta demais para a busca aproximada
+    ('adleai', {}),                       # dois erros
+])
+def test_word_index_matches(word_index, query, expected):
+    assert word_index.search(query) == expected
+
+
+def test_word_index_requires_all_words(word_index):
+    assert word_index.search('nome aldeia') == {0: 0}
+    assert word_index.search('agua aldeia') == {}
+    assert word_index.search('da nome') == {0: 0}
+
+
+@pytest.fixture(scope='module')
+def search():
+    graph = Graph()
+
+    def entity(uri, entity_type, pt, en=None, definition=None):
+        graph.add((uri, RDF.type, entity_type))
+        graph.add((uri, RDFS.label, Literal(pt, lang='pt')))
+        if en:
+            graph.add((uri, RDFS.label, Literal(en, lang='en')))
+        if definition:
+            graph.add((uri, op.DEFINITION_URI, Literal(definition, lang='pt')))
+
+    entity(EX.aguaPotavel, OWL.Class, 'Água potável', 'Drinking water')
+    entity(EX.tratamento, OWL.Class, 'Tratamento de água', definition='Processo que torna a água potável')
+    entity(EX.aguape, OWL.Class, 'Aguapé')
+    entity(EX.agua, OWL.NamedIndividual, 'Água', 'Water')
+    entity(EX.nomeAldeia, OWL.DatatypeProperty, 'Nome da aldeia')
+    entity(EX.localidade, OWL.Class, 'Localidade', definition='Lugar onde fica uma água')
+    return OntologySearch(graph)
+
+
+def uris(results):
+    return [result["uri"].rpartition('/')[2] for result in results]
+
+
+def test_ranking(search):
+    # Label igual à consulta, label que começa com ela, prefixo de palavra, label que a contém e definição
+    assert uris(search.search('agua')) == ['agua', 'aguaPotavel', 'aguape', 'tratamento', 'localidade']
+
+
+def test_phrase_and_accents(search):
+    assert uris(search.search('ÁGUA POTÁVEL')) == ['aguaPotavel', 'tratamento']
+    results = search.search('agua potavel')
+    assert [result["match"] for result in results] == ['label', 'definition']
+
+
+def test_typo(search):
+    assert uris(search.search('aldiea')) == ['nomeAldeia']
+    assert uris(search.search('tratamneto')) == ['tratamento']
+
+
+def test_language_and_limit(search):
+    results = search.search('water', language='en')
+    assert uris(results) == ['agua', 'aguaPotavel']
+    assert results[0]["label"] == 'Water'
+    assert search.search('water', language='pt')[0]["label"] == 'Água'
+    assert len(search.search('agua', limit=2)) == 2
+
+
+def test_kind_filter(search):
+    assert uris(search.search('agua', kinds=['individual'])) == ['agua']
+    assert uris(search.search('agua', kinds=['class'])) == ['aguaPotavel', 'aguape', 'tratamento', 'localidade']
+    assert uris(search.search('aldeia', kinds=['data_property', 'object_property'])) == ['nomeAldeia']
+    assert search.search('aldeia', kinds=['individual']) == []
+
+
+def test_no_match(search):
+    assert search.search('xyz') == []
+    assert search.search('!!') == []
+
+
+@pytest.mark.parametrize('params', [{}, {'q': ''}, {'q': '   '}])
+def test_search_endpoint_requires_query(client, params):
+    response = client.get('/search', query_string=params)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "q parameter is required"}
+
+
+@pytest.mark.parametrize('params', [{'limit': 'x'}, {'limit': 0}, {'limit': 51}, {'kind': 'nada'}])
+def test_search_endpoint_invalid_parameters(client, params):
+    assert client.get('/search', query_string={'q': 'aldeia', **params}).status_code == 400
+
+
+def test_search_endpoint_short_queries(client):
+    response = client.get('/search', query_string={'q': '!!'})
+    assert response.status_code == 200
+    assert response.get_json() == {"query": '!!', "results": []}
+    results = client.get('/search', query_string={'q': 'a', 'limit': 5}).get_json()["results"]
+    assert 0 < len(results) <= 5
+
+
+def test_search_endpoint(client):
+    response = client.get('/search', query_string={'q': 'aldeia', 'kind': 'class', 'limit': 50})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert results and all(result["kind"] == 'class' for result in results)
+    assert 'Accept-Language' in response.vary
@@ -0,0 +1,63 @@
+import pytest
+from rdflib import Graph, Literal, RDF, URIRef
+
+from submission_export import SUBMISSION_NS, FieldResolver, export_lines
+
+CLASS_URI = 'http://www.semanticweb.org/ontologias/SESAI/ontoAldeias_00000499'
+PROPERTY = URIRef('http://www.semanticweb.org/ontologias/SESAI/ontoAldeias_00000548')
+
+
+@pytest.fixture(scope='module')
+def resolver(aldeias):
+    return FieldResolver(aldeias)
+
+
+def export_graph(resolver, data, export_format):
+    submission = {"id": "0123abcd", "created_at": 1.5, "class": CLASS_URI, "data": data}
+    graph = Graph()
+    graph.parse(data=''.join(export_lines([submission], resolver, export_format)), format=export_format)
+    return graph, SUBMISSION_NS["0123abcd"]
+
+
+@pytest.mark.parametrize('export_format', ['nt', 'ttl'])
+def test_list_items_get_their_own_nodes(resolver, export_format):
+    graph, subject = export_graph(resolver, {
+        f'Nome do município-{PROPERTY}': ['Aldeia A', 'Aldeia B'],
+        f'Número de domicílios-{PROPERTY}': '3',
+    }, export_format)
+    nodes = list(graph.objects(subject, PROPERTY))
+    assert len(nodes) == 3
+    values = sorted(str(graph.value(node, RDF.value)) for node in nodes)
+    assert values == ['3', 'Aldeia A', 'Aldeia B']
+    for node in nodes:
+        assert len(list(graph.objects(node, RDF.value))) == 1
+        assert len(list(graph.objects(node, RDF.type))) == 1
+
+
+def test_typed_scalar_value(resolver):
+    graph, subject = export_graph(resolver, {f'Número de domicílios-{PROPERTY}': '3'}, 'nt')
+    (node,) = graph.objects(subject, PROPERTY)
+    assert node == URIRef(f'{subject}/0')
+    assert graph.value(node, RDF.value) == Literal(3)
+
+
+def test_dynamic_and_unknown_keys(caplog, aldeias, resolver):
+    subclass = aldeias.root_uri
+    assert resolver.resolve_key(f'{subclass}-Insira um(a) atividade') == (None, URIRef(subclass), 'Insira um(a) atividade')
+    assert resolver.resolve_key('campo com espaço-e outro - hífen') is None
+    assert resolver.resolve_key('rótulo-http://example.org/não é propriedade') is None
+    assert 'does not look like a valid URI' not in caplog.text
+
+
+@pytest.mark.parametrize('language', ['pt', 'en'])
+def test_option_labels_link_to_individuals(aldeias, resolver, language):
+    field = next(field for field in aldeias.form_bundle(language).details(CLASS_URI).payload
+                 if field["relatedClassUri"].endswith('ontoAldeias_00000463'))
+    first, second = field["options"][:2]
+    # Como o DynamicForm envia: a chave do campo e o label da opção escolhida
+    key = f'{field["relatedClass"]}-{field["property"]}'
+    graph, subject = export_graph(resolver, {key: first["label"], f'Nome do município-{PROPERTY}': 'Recife'}, 'nt')
+    assert URIRef(first["uri"]) in set(graph.objects(subject, PROPERTY))
+
+    graph, subject = export_graph(resolver, {key: [first["label"], second["uri"]]}, 'ttl')
+    assert set(graph.objects(subject, PROPERTY)) == {URIRef(first["uri"]), URIRef(second["uri"])}
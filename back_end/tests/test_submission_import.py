@@ -0,0 +1,146 @@
+import io
+import types
+
+import pytest
+
+from conftest import complete_submission
+from submission_import import ColumnMapper, import_records, read_csv, read_jsonl
+from submission_store import SubmissionStore
+
+CLASS_URI = 'http://www.semanticweb.org/ontologias/SESAI/ontoAldeias_00000499'
+SESAI = 'http://www.semanticweb.org/ontologias/SESAI/'
+PROPERTY = SESAI + 'ontoAldeias_00000548'
+MUNICIPIO = f'Nome do município-{PROPERTY}'
+TERRA = f'Terra indígena-{PROPERTY}'
+
+
+@pytest.fixture(scope='module')
+def mapper(aldeias):
+    return ColumnMapper(aldeias, CLASS_URI)
+
+
+# Snapshot mínimo com dois campos de propriedades diferentes sobre a mesma classe relacionada
+def ambiguous_snapshot():
+    payload = [
+        {"property": 'http://example.org/p1', "relatedClass": 'Nome', "relatedClassUri": 'http://example.org/Nome'},
+        {"property": 'http://example.org/p2', "relatedClass": 'Nome', "relatedClassUri": 'http://example.org/Nome'},
+    ]
+    bundle = types.SimpleNamespace(details=lambda class_uri: types.SimpleNamespace(payload=payload))
+    return types.SimpleNamespace(form_bundle=lambda language: bundle)
+
+
+def test_columns_by_key_label_and_uri(mapper):
+    assert mapper.resolve(MUNICIPIO) == MUNICIPIO
+    assert mapper.resolve(' Nome do município ') == MUNICIPIO
+    assert mapper.resolve(SESAI + 'ontoAldeias_00000462') == MUNICIPIO
+    assert mapper.map_columns(['Terra indígena', 'Nome do município']) == [TERRA, MUNICIPIO]
+
+
+def test_dynamic_column(aldeias, mapper):
+    key = f'{aldeias.root_uri}-Insira um(a) atividade'
+    assert mapper.resolve(key) == key
+
+
+def test_unknown_columns(mapper):
+    with pytest.raises(ValueError, match="unknown column: 'não existe'"):
+        mapper.resolve('não existe')
+    with pytest.raises(ValueError) as error:
+        mapper.map_columns(['Nome do município', 'coluna a', 'coluna b'])
+    assert "'coluna a'" in str(error.value) and "'coluna b'" in str(error.value)
+
+
+def test_duplicate_columns(mapper):
+    with pytest.raises(ValueError, match='same form field'):
+        mapper.map_columns(['Nome do município', MUNICIPIO])
+
+
+def test_ambiguous_column():
+    mapper = ColumnMapper(ambiguous_snapshot(), 'http://example.org/C', validator=object())
+    assert mapper.resolve('Nome-http://example.org/p2') == 'Nome-http://example.org/p2'
+    with pytest.raises(ValueError, match='ambiguous column'):
+        mapper.resolve('Nome')
+    with pytest.raises(ValueError, match='ambiguous column'):
+        mapper.resolve('http://example.org/Nome')
+
+
+def test_read_csv(mapper):
+    text = ('Nome do município,Terra indígena,população\n'
+            'Recife,Córrego João Pereira|Temembé de Almofala,10\n'
+            '\n'
+            ',Córrego João Pereira,\n'
+            'Olinda,,5,extra\n')
+    records = list(read_csv(io.StringIO(text), mapper))
+    population = mapper.resolve('população')
+    assert records == [
+        (2, {MUNICIPIO: 'Recife', TERRA: ['Córrego João Pereira', 'Temembé de Almofala'], population: '10'}),
+        (4, {TERRA: ['Córrego João Pereira']}),
+        (5, 'row has 4 cells but the header has 3 columns'),
+    ]
+
+
+def test_read_csv_empty_file(mapper):
+    assert list(read_csv(io.StringIO(''), mapper)) == []
+
+
+def test_read_jsonl(mapper):
+    text = '{"Nome do município": "Recife"}\n\n[1]\n{x\n{"coluna": 1}\n'
+    records = list(read_jsonl(io.StringIO(text), mapper))
+    assert records[0] == (1, {MUNICIPIO: 'Recife'})
+    assert records[1] == (3, 'form data must be a JSON object')
+    assert records[2][0] == 4 and records[2][1].startswith('invalid JSON')
+    assert records[3] == (5, "unknown column: 'coluna'")
+
+
+# Registros do arquivo: válidos nas linhas pares, um valor inválido nas ímpares
+def sample_records(snapshot, rows):
+    valid = complete_submission(snapshot, CLASS_URI)
+    number_key = next(key for key in valid if key.startswith('Número de domicílios-'))
+    return [(line, dict(valid, **{number_key: 'muitos'}) if line % 2 else dict(valid, **{MUNICIPIO: str(line)}))
+            for line in range(2, rows + 2)]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_import_records(tmp_path, aldeias, workers):
+    store = SubmissionStore(str(tmp_path / 'submissions.sqlite3'))
+    validator = aldeias.validators().get(CLASS_URI)
+    errors, progress = [], []
+    stats = import_records(sample_records(aldeias, 25), store, validator, CLASS_URI, 'aldeias', workers,
+                           chunk_size=4, on_error=lambda line, e: errors.append(line), progress=progress.append)
+
+    assert (stats["rows"], stats["imported"], stats["invalid"]) == (25, 13, 12)
+    assert errors == list(range(3, 27, 2))
+    assert progress[-1]["rows"] == 25 and len(progress) == 7
+    saved = list(store.iter_all(CLASS_URI))
+    # Gravados na ordem do arquivo
+    assert [s['data'][MUNICIPIO] for s in saved] == [str(line) for line in range(2, 27, 2)]
+
+
+def test_import_records_dry_run(tmp_path, aldeias):
+    store = SubmissionStore(str(tmp_path / 'submissions.sqlite3'))
+    validator = aldeias.validators().get(CLASS_URI)
+    stats = import_records(sample_records(aldeias, 6), store, validator, CLASS_URI, dry_run=True)
+    assert (stats["rows"], stats["imported"], stats["invalid"]) == (6, 3, 3)
+    assert store.count() == 0
+
+
+def test_read_csv_reports_rows_the_csv_module_rejects(mapper):
+    text = f'Nome do município\nRecife\n{"x" * 200000}\nOlinda\n'
+    records = list(read_csv(io.StringIO(text), mapper))
+    assert records == [
+        (2, {MUNICIPIO: 'Recife'}),
+        (3, 'invalid CSV: field larger than field limit (131072)'),
+        (4, {MUNICIPIO: 'Olinda'}),
+    ]
+
+
+def test_import_endpoint_reports_oversized_cells(client, aldeias):
+    valid = complete_submission(aldeias, CLASS_URI)
+    header = ','.join(f'"{key}"' for key in valid)
+    row = ','.join(f'"{value}"' for value in valid.values())
+    oversized = ','.join(['"' + 'x' * 200000 + '"'] + [f'"{value}"' for value in list(valid.values())[1:]])
+    body = '\n'.join([header, row, oversized, row]) + '\n'
+    response = client.post('/submissions/import', query_string={'class': CLASS_URI}, data=body.encode('utf-8'))
+    assert response.status_code == 200
+    result = response.get_json()
+    assert (result["rows"], result["imported"], result["invalid"]) == (3, 2, 1)
+    assert result["errors"] == [{"row": 3, "errors": {"": ['invalid CSV: field larger than field limit (131072)']}}]
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from submission_store import SubmissionStore
+
+CLASS_A = 'http://example.org/A'
+CLASS_B = 'http://example.org/B'
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SubmissionStore(str(tmp_path / 'submissions.sqlite3'), batch_size=7)
+
+
+def test_save_and_get(store):
+    submission_id = store.save({'campo': 'ação', 'lista': [1, 2]}, CLASS_A)
+    submission = store.get(submission_id)
+    assert submission['id'] == submission_id
+    assert submission['class'] == CLASS_A
+    assert submission['data'] == {'campo': 'ação', 'lista': [1, 2]}
+    assert submission['created_at'] > 0
+    assert store.get('nao-existe') is None
+
+
+def test_save_wait_is_visible_to_a_new_store(store):
+    submission_id = store.save({'campo': 'x'}, wait=True)
+    assert SubmissionStore(store.path).get(submission_id)['data'] == {'campo': 'x'}
+
+
+def test_list_pages_by_cursor_and_class(store):
+    ids = [store.save({'n': n}, CLASS_A if n % 2 else CLASS_B) for n in range(10)]
+    ids += store.save_many([{'n': n} for n in range(10, 25)], CLASS_A)
+    assert len(set(ids)) == 25
+
+    first = store.list(limit=10)
+    assert [s['id'] for s in first] == ids[:10]
+    rest = store.list(limit=100, after=first[-1]['seq'])
+    assert [s['id'] for s in rest] == ids[10:]
+
+    only_a = store.list(limit=100, class_uri=CLASS_A)
+    assert [s['data']['n'] for s in only_a] == [n for n in range(25) if n % 2 or n >= 10]
+    assert store.list(limit=100, after=only_a[-1]['seq'], class_uri=CLASS_A) == []
+
+
+def test_iter_all_and_count(store):
+    store.save_many([{'n': n} for n in range(30)], CLASS_A)
+    store.save_many([{'n': n} for n in range(30, 35)], CLASS_B)
+    assert [s['data']['n'] for s in store.iter_all(chunk_size=4)] == list(range(35))
+    assert [s['data']['n'] for s in store.iter_all(CLASS_B, chunk_size=2)] == list(range(30, 35))
+    assert store.count() == 35
+
+
+def test_empty_store(store):
+    assert store.list() == []
+    assert list(store.iter_all()) == []
+    assert store.count() == 0
+
+
+def test_concurrent_saves(store):
+    threads_count, per_thread = 8, 50
+    saved = [[] for _ in range(threads_count)]
+    start = threading.Barrier(threads_count)
+
+    def worker(index):
+        start.wait()
+        for n in range(per_thread):
+            saved[index].append(store.save({'thread': index, 'n': n}, CLASS_A))
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.count() == threads_count * per_thread
+    submissions = list(store.iter_all())
+    assert {s['id'] for s in submissions} == {submission_id for ids in saved for submission_id in ids}
+    # A ordem de chegada de cada thread é preservada
+    for index in range(threads_count):
+        assert [s['data']['n'] for s in submissions if s['data']['thread'] == index] == list(range(per_thread))
+
+
+def test_write_error_is_logged_and_writer_keeps_running(caplog, store):
+    with sqlite3.connect(store.path) as conn:
+        conn.execute('ALTER TABLE submissions RENAME TO submissions_old')
+    lost = store.save({'n': 1})
+    store.flush()
+    assert 'failed to write 1 submissions' in caplog.text and lost in caplog.text
+
+    with sqlite3.connect(store.path) as conn:
+        conn.execute('ALTER TABLE submissions_old RENAME TO submissions')
+    saved = store.save({'n': 2})
+    assert store.get(saved)['data'] == {'n': 2}
+    assert store.get(lost) is None
+
+
+def test_queued_submissions_are_written_at_exit(tmp_path):
+    path = str(tmp_path / 'submissions.sqlite3')
+    script = ('import sys; from submission_store import SubmissionStore; '
+              'SubmissionStore(sys.argv[1]).save_many([{"n": n} for n in range(2000)])')
+    subprocess.run([sys.executable, '-c', script, path], cwd=SRC_DIR, check=True)
+    assert SubmissionStore(path).count() == 2000
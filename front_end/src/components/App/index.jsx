@@ -19,6 +19,7 @@ export const App = ({ selectedDocumentUri, formTitle = '' }) => {
 
   const [previousActivityLabel, setPreviousActivityLabel] = useState(''); // Estado para armazenar o label da subclasse selecionada
   const [formData, setFormData] = useState(null);
+  const [formClass, setFormClass] = useState(null); // Classe do formulário exibido (enviada com a submissão)
   const [formLoading, setFormLoading] = useState(false);
   const [error, setError] = useState(null);
   const [language, setLanguage] = useState('pt'); // Estado que controla o idioma
@@ -37,7 +38,7 @@ export const App = ({ selectedDocumentUri, formTitle = '' }) => {
     }
   };
 
-  // Função para alterar o idioma
+  // Função para alterar o idioma (enviado em cada requisição pelo parâmetro lang)
   const changeLanguage = async (newLanguage) => {
     try {
       const response = await fetch(`http://localhost:5000/set_language`, {
@@ -47,7 +48,7 @@ export const App = ({ selectedDocumentUri, formTitle = '' }) => {
       });
       if (!response.ok) throw new Error('Erro ao alterar idioma');
       setLanguage(newLanguage);
-      fetchSubclasses(classHierarchy[0].uri, 0); // Atualizar as subclasses após a troca de idioma
+      fetchSubclasses(classHierarchy[0].uri, 0, newLanguage); // Atualizar as subclasses após a troca de idioma
     } catch (err) {
       console.error(err);
       setError(err.message);
@@ -55,7 +56,7 @@ export const App = ({ selectedDocumentUri, formTitle = '' }) => {
   };
 
   // Função para buscar subclasses
-  const fetchSubclasses = async (uri, levelIndex) => {
+  const fetchSubclasses = async (uri, levelIndex, lang = language) => {
     try {
       setError(null);
       const updatedHierarchy = [...classHierarchy];
@@ -73,7 +74,7 @@ export const App = ({ selectedDocumentUri, formTitle = '' }) => {
       updatedHierarchy[levelIndex].loading = true;
       setClassHierarchy(updatedHierarchy);
 
-      const response = await fetch(`http://localhost:5000/get_subclasses?class=${encodeURIComponent(uri)}`);
+      const response = await fetch(`http://localhost:5000/get_subclasses?class=${encodeURIComponent(uri)}&lang=${lang}`);
       if (!response.ok) throw new Error('Erro ao carregar subclasses');
       const data = await response.json();
 
@@ -85,7 +86,7 @@ export const App = ({ selectedDocumentUri, formTitle = '' }) => {
         setClassHierarchy(updatedHierarchy.slice(0, levelIndex + 1));
         setFormData(null);
       } else {
-        fetchFormData(uri);
+        fetchFormData(uri, lang);
       }
     } catch (err) {
       console.error(err);
@@ -113,15 +114,16 @@ export const App = ({ selectedDocumentUri, formTitle = '' }) => {
   };
 
   // Função para buscar dados do formulário
-  const fetchFormData = async (uri) => {
+  const fetchFormData = async (uri, lang = language) => {
     try {
       setFormLoading(true);
       setError(null);
       myRef.current?.scrollIntoView({ behavior: 'smooth', block: 'start' });
-      const response = await fetch(`http://localhost:5000/get_class_details?class=${encodeURIComponent(uri)}`);
+      const response = await fetch(`http://localhost:5000/get_class_details?class=${encodeURIComponent(uri)}&lang=${lang}`);
       if (!response.ok) throw new Error('Erro ao carregar dados do formulário');
       const data = await response.json();
       setFormData(data);
+      setFormClass(uri);
       setFormLoading(false);
     } catch (err) {
       console.error(err);
@@ -193,8 +195,8 @@ export const App = ({ selectedDocumentUri, formTitle = '' }) => {
             {formLoading && <div className="br-card"><div className="card-content">{language === 'pt' ? 'Carregando formulário...' : 'Loading form...'}</div></div>}
             {formData && !formLoading && (
               language === 'pt'
-                ? <DynamicForm formData={formData} />
-                : <DynamicForm formData={formData} />
+                ? <DynamicForm formData={formData} classUri={formClass} />
+                : <DynamicForm formData={formData} classUri={formClass} />
             )}
           </div>
         </div>
@@ -9,7 +9,7 @@ const capitalize = (text) => {
   return text.charAt(0).toUpperCase() + text.slice(1);
 };
 
-const DynamicForm = ({ formData }) => {
+const DynamicForm = ({ formData, classUri }) => {
   const [formState, setFormState] = useState({});
   const [errors, setErrors] = useState({});
   const [dynamicFields, setDynamicFields] = useState([]);
@@ -181,7 +181,8 @@ const DynamicForm = ({ formData }) => {
 
     if (Object.keys(newErrors).length === 0) {
       try {
-        const response = await fetch('http://127.0.0.1:5000/save_form_data', {
+        // A classe do formulário permite ao servidor validar a submissão contra a ontologia
+        const response = await fetch(`http://127.0.0.1:5000/save_form_data?class=${encodeURIComponent(classUri)}`, {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
@@ -192,6 +193,15 @@ const DynamicForm = ({ formData }) => {
         if (response.ok) {
           console.log('Formulário enviado com sucesso!');
           downloadJSON(validFormState, 'form_data.json');
+        } else if (response.status === 422) {
+          // Erros de validação do servidor, por campo
+          const data = await response.json();
+          const serverErrors = {};
+          Object.entries(data.fields || {}).forEach(([key, messages]) => {
+            serverErrors[key] = messages.join('; ');
+          });
+          setErrors(serverErrors);
+          console.log('Erros no formulário:', serverErrors);
         } else {
           console.error('Erro ao enviar o formulário');
         }